@@ -6,9 +6,17 @@ from app.logger.logger import log
 from importlib import import_module
 from fastapi import FastAPI, Depends
 from app.ontotrans_api import core
-from app.ontotrans_api.routers import databases, namespaces
+from app.ontotrans_api.routers import databases, jobs, metrics, namespaces, profiling, queries
 from pydantic import Field
 from app.config.ontoRECSettings import OntoRECSetting
+from app.metrics.collectors import register_collectors
+from app.metrics.metrics import MetricsMiddleware, metrics as metrics_registry
+from app.metrics.profiling import ProfilingMiddleware
+from app.triplestore.databaseRegistry import database_registry
+from app.triplestore.emmo import emmo_snapshot
+from app.triplestore.executor import backend_executor
+from app.triplestore.jobs import job_manager
+from app.triplestore.replicas import replica_manager
 from typing import TYPE_CHECKING
 
 
@@ -45,14 +53,37 @@ def create_app():
     """
     Create the FastAPI app
     """
-    log.info("TEST INFO")
-    log.debug("TEST DEBUG")
-    log.warning("TEST WARNING")
-    log.error("TEST ERROR")
     app = FastAPI(dependencies=get_auth_deps())
     app.include_router(core.router, prefix = __prefix__)
     app.include_router(databases.router, prefix = __prefix__)
     app.include_router(namespaces.router, prefix = __prefix__)
+    app.include_router(queries.router, prefix = __prefix__)
+    app.include_router(jobs.router, prefix = __prefix__)
 
+    if app_settings.PROFILING_ENABLED:
+        app.include_router(profiling.router, prefix = __prefix__)
+        app.add_middleware(ProfilingMiddleware)
+
+    if app_settings.METRICS_ENABLED:
+        register_collectors(metrics_registry)
+        app.add_middleware(MetricsMiddleware, databases=database_registry)
+        # Mounted at the root, outside of the versioned API, where Prometheus scrapes by default
+        app.include_router(metrics.router)
+
+    @app.on_event("startup")
+    async def build_snapshots():
+        try:
+            await backend_executor.run(emmo_snapshot.path)
+        except Exception as err:
+            log.warning("Cannot build EMMO snapshot at startup: {}".format(err))
+
+    @app.on_event("startup")
+    async def load_replicas():
+        for db_name in replica_manager.databases:
+            replica_manager.schedule(db_name)
+
+    @app.on_event("shutdown")
+    async def cancel_jobs():
+        await job_manager.close()
 
     return app
@@ -14,6 +14,352 @@ class OntoRECSetting(BaseSettings):
         "", description="List of FastAPI dependencies for authentication features."
     )
 
+    CONNECTION_POOL_SIZE: int = Field(
+        32,
+        description="""
+        Maximum number of per-database triplestore connections kept open.
+        The least recently used connection is dropped when the limit is reached, and
+        closed once the requests still using it are done.
+        """
+    )
+
+    CONNECTION_IDLE_TIMEOUT: float = Field(
+        300.0,
+        description="""
+        Seconds after which an unused triplestore connection is closed.
+        """
+    )
+
+    CONNECTION_HEALTH_CHECK_INTERVAL: float = Field(
+        60.0,
+        description="""
+        Seconds after which a pooled connection is checked before being reused.
+        """
+    )
+
+    EXECUTOR_MAX_WORKERS: int = Field(
+        16,
+        description="""
+        Number of worker threads running blocking triplestore calls.
+        """
+    )
+
+    EXECUTOR_MAX_QUEUE: int = Field(
+        64,
+        description="""
+        Maximum number of requests waiting for a worker thread.
+        Requests beyond this limit are rejected with 503 Service Unavailable.
+        """
+    )
+
+    EXECUTOR_ROUTE_CONCURRENCY: int = Field(
+        8,
+        description="""
+        Default maximum number of concurrent backend requests for a single route.
+        """
+    )
+
+    EXECUTOR_ROUTE_LIMITS: str = Field(
+        "",
+        description="""
+        Per-route overrides of EXECUTOR_ROUTE_CONCURRENCY, as a list of
+        route_name=limit pairs separated by |, e.g. "execute_query=4|get_database_data=2".
+        """
+    )
+
+    STREAM_PAGE_SIZE: int = Field(
+        10000,
+        gt=0,
+        description="""
+        Number of triples fetched from the triplestore per page when streaming database content.
+        """
+    )
+
+    SNAPSHOT_DIR: str = Field(
+        "",
+        description="""
+        Directory where pre-parsed snapshots of the bundled ontologies are cached.
+        Defaults to an "ontorec" folder in the system temporary directory.
+        """
+    )
+
+    EMMO_TEMPLATE_DATABASE: str = Field(
+        "emmo-template",
+        description="""
+        Name of the template, kept up to date by the service, holding the bundled EMMO ontology.
+        New databases can be created as a copy of it with the "template" parameter.
+        """
+    )
+
+    INSERT_BATCH_SIZE: int = Field(
+        10000,
+        description="""
+        Number of triples sent to the triplestore per batch when adding triples.
+        """
+    )
+
+    DELETE_BATCH_SIZE: int = Field(
+        1000,
+        description="""
+        Number of triples removed per SPARQL update when deleting triples.
+        """
+    )
+
+    UPLOAD_CHUNK_SIZE: int = Field(
+        8 * 1024 * 1024,
+        description="""
+        Size in bytes of the chunks sent to the triplestore when uploading N-Triples or N-Quads files.
+        """
+    )
+
+    UPLOAD_PARALLELISM: int = Field(
+        4,
+        description="""
+        Number of chunks of a non-atomic N-Triples or N-Quads upload loaded concurrently.
+        """
+    )
+
+    JOB_MAX_RUNNING: int = Field(
+        4,
+        description="""
+        Maximum number of background import jobs running at the same time.
+        """
+    )
+
+    JOB_MAX_PENDING: int = Field(
+        32,
+        description="""
+        Maximum number of background import jobs waiting to run; further submissions are rejected.
+        """
+    )
+
+    JOB_DATABASE_CONCURRENCY: int = Field(
+        1,
+        description="""
+        Maximum number of background import jobs running at the same time on the same database.
+        """
+    )
+
+    JOB_RETENTION: float = Field(
+        3600.0,
+        description="""
+        Seconds for which the status of a finished job is kept.
+        """
+    )
+
+    QUERY_CACHE_SIZE: int = Field(
+        64 * 1024 * 1024,
+        description="""
+        Size in bytes of the in-process cache of query results, 0 to disable it.
+        Each worker has its own cache and only sees its own writes before entries expire;
+        use QUERY_CACHE_REDIS_URL to share the cache among several workers.
+        """
+    )
+
+    QUERY_CACHE_TTL: float = Field(
+        300.0,
+        description="""
+        Seconds for which a query result is cached.
+        """
+    )
+
+    QUERY_CACHE_REDIS_URL: str = Field(
+        "",
+        description="""
+        URL of a Redis instance holding the query cache, e.g. "redis://redis:6379/0".
+        When set, it replaces the in-process cache.
+        """
+    )
+
+    NAMESPACE_CACHE_TTL: float = Field(
+        30.0,
+        description="""
+        Seconds for which the namespaces of a database are cached. Changes made through
+        the service are applied to the cache at once; this bounds how long other changes go unseen.
+        """
+    )
+
+    DATABASE_REGISTRY_TTL: float = Field(
+        60.0,
+        description="""
+        Seconds for which the list of databases is cached. Databases created or deleted
+        through the service are recorded at once.
+        """
+    )
+
+    DATABASE_REGISTRY_MISS_INTERVAL: float = Field(
+        1.0,
+        description="""
+        Minimum number of seconds between two listings of the databases triggered by
+        requests to unknown databases, which are otherwise answered with 404 from the cache.
+        """
+    )
+
+    N3_CACHE_SIZE: int = Field(
+        100000,
+        description="""
+        Maximum number of IRIs whose N3 form is memoised when converting query results.
+        """
+    )
+
+    QUERY_TIMEOUT: float = Field(
+        60.0,
+        description="""
+        Default number of seconds after which a query is cancelled and answered with
+        504 Gateway Timeout. 0 disables the timeout.
+        """
+    )
+
+    QUERY_MAX_TIMEOUT: float = Field(
+        300.0,
+        description="""
+        Upper bound of the timeout a client may request for a single query.
+        """
+    )
+
+    QUERY_MAX_ROWS: int = Field(
+        1000000,
+        description="""
+        Maximum number of rows returned by a query. 0 disables the limit.
+        """
+    )
+
+    QUERY_MAX_BYTES: int = Field(
+        256 * 1024 * 1024,
+        description="""
+        Maximum size in bytes of the results of a query. 0 disables the limit.
+        Results in JSON, CSV or TSV are read up to this size before being sent, and are
+        only streamed as received when the limit is disabled.
+        """
+    )
+
+    QUERY_TRUNCATE: bool = Field(
+        True,
+        description="""
+        Whether results over QUERY_MAX_ROWS or QUERY_MAX_BYTES are truncated and flagged
+        with the X-Result-Truncated header, rather than rejected with 413 Payload Too Large.
+        """
+    )
+
+    QUERY_BATCH_MAX_SIZE: int = Field(
+        100,
+        description="""
+        Maximum number of queries in a single batch request.
+        """
+    )
+
+    QUERY_BATCH_CONCURRENCY: int = Field(
+        4,
+        description="""
+        Maximum number of queries of a batch running at once.
+        """
+    )
+
+    PREPARED_QUERIES_PER_DATABASE: int = Field(
+        256,
+        description="""
+        Maximum number of prepared queries registered for a single database.
+        """
+    )
+
+    CHANGE_LOG_MAX_TRIPLES: int = Field(
+        1000000,
+        description="""
+        Maximum number of changed triples retained per database for GET /databases/{db_name}/changes.
+        Older changes are dropped first; clients behind them get 410 Gone and download the database again.
+        """
+    )
+
+    ETAG_MAX_AGE: float = Field(
+        300.0,
+        description="""
+        Seconds after which the ETags of the read endpoints change even if the database
+        did not change through the service, so that other writes are eventually noticed.
+        0 keeps the tags until the next change through the service.
+        Each worker tracks the revisions behind the tags of its own writes only; with several
+        workers, a client may get 304 Not Modified for up to this long after a write made
+        through another worker. Keep it short with several workers, and use 0 only with one.
+        """
+    )
+
+    METRICS_ENABLED: bool = Field(
+        True,
+        description="""
+        Whether requests are measured and the metrics exposed at /metrics in the Prometheus text format.
+        """
+    )
+
+    PROFILING_ENABLED: bool = Field(
+        False,
+        description="""
+        Whether requests sent with the X-Profile header are profiled with cProfile.
+        The profile id is returned in the X-Profile-Id header and the report served at /profiles/{profile_id}.
+        The profiling routes, /profiles/{profile_id} and /slow-queries, are only served when enabled.
+        """
+    )
+
+    PROFILING_TOKEN: str = Field(
+        "",
+        description="""
+        Secret the X-Profile header must carry for a request to be profiled, and for the
+        profiling routes to answer. Empty lets any client allowed by the authentication
+        dependencies profile its requests and read the profiles and slow queries.
+        """
+    )
+
+    PROFILING_DIR: str = Field(
+        "",
+        description="""
+        Directory where the profiles are stored, in the pstats format. Empty uses a directory in the system temporary directory.
+        """
+    )
+
+    PROFILING_KEEP: int = Field(
+        100,
+        description="""
+        Number of most recent profiles kept in PROFILING_DIR.
+        """
+    )
+
+    SLOW_QUERY_THRESHOLD: float = Field(
+        5.0,
+        description="""
+        Backend time in seconds from which queries are logged as slow, with their text,
+        database, reasoning flag and number of rows. 0 disables the slow query log.
+        """
+    )
+
+    SLOW_QUERY_LOG_SIZE: int = Field(
+        100,
+        description="""
+        Number of most recent slow queries kept in memory and served at /slow-queries
+        when PROFILING_ENABLED is set.
+        """
+    )
+
+    REPLICA_DATABASES: str = Field(
+        "",
+        description="""
+        Databases kept as read replicas in the service process, separated by |, e.g. "emmo|reference".
+        Their queries without reasoning and their dumps are answered by the replica once loaded.
+        """
+    )
+
+    REPLICA_STORE: str = Field(
+        "default",
+        description="""
+        rdflib store plugin holding the replicas, e.g. "Oxigraph" when the oxrdflib package is installed.
+        """
+    )
+
+    REPLICA_REFRESH_INTERVAL: float = Field(
+        300.0,
+        description="""
+        Seconds after which a replica is reloaded from the triplestore, to pick up the writes
+        made outside the service. 0 disables the reloads.
+        """
+    )
+
 
     class Config:
         env_prefix = "ONTOREC_"
\ No newline at end of file
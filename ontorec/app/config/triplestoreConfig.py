@@ -22,6 +22,41 @@ class TriplestoreConfig(BaseSettings):
         The underlying technology (triplestore) used by OntoKB.
         Current supported ones comprises:
         * stardog
+        * rdflib: databases held in memory by the service, lost on restart
+        * oxigraph: as rdflib, with the Oxigraph store of the oxrdflib package
+        * sparql: datasets of a SPARQL 1.1 endpoint, e.g. Apache Jena Fuseki
+        """
+    )
+    SPARQL_QUERY_PATH: str = Field(
+        '/{database}/query',
+        description="""
+        Path of the query endpoint of a dataset with the sparql backend.
+        """
+    )
+    SPARQL_UPDATE_PATH: str = Field(
+        '/{database}/update',
+        description="""
+        Path of the update endpoint of a dataset with the sparql backend.
+        """
+    )
+    SPARQL_DATA_PATH: str = Field(
+        '/{database}/data',
+        description="""
+        Path of the graph store protocol endpoint of a dataset with the sparql backend,
+        used to upload files. Empty sends them as SPARQL updates.
+        """
+    )
+    SPARQL_ADMIN_PATH: str = Field(
+        '/$/datasets',
+        description="""
+        Path of the Fuseki administration endpoint listing, creating and removing
+        datasets with the sparql backend. Empty leaves the datasets to be managed elsewhere.
+        """
+    )
+    SPARQL_DATASET_TYPE: str = Field(
+        'tdb2',
+        description="""
+        Type of the datasets created with the sparql backend: tdb2 (persistent) or mem.
         """
     )
 
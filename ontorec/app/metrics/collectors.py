@@ -0,0 +1,32 @@
+"""
+    Gauges reading the state of the pools and caches when metrics are scraped
+"""
+
+from app.metrics.metrics import MetricsRegistry
+from app.triplestore.changeLog import change_log
+from app.triplestore.connectionManager import connection_manager
+from app.triplestore.databaseRegistry import database_registry
+from app.triplestore.executor import backend_executor
+from app.triplestore.jobs import PENDING, RUNNING, job_manager
+from app.triplestore.namespaceCache import namespace_cache
+from app.triplestore.preparedQueries import prepared_queries
+from app.triplestore.queryCache import query_cache
+from app.triplestore.replicas import replica_manager
+
+
+def register_collectors(metrics: MetricsRegistry) -> None:
+    metrics.gauge("ontorec_executor_in_flight", "Requests holding a backend slot", lambda: {(): backend_executor.in_flight})
+    metrics.gauge("ontorec_executor_capacity", "Backend slots: worker threads and queue", lambda: {("workers",): backend_executor.max_workers, ("queue",): backend_executor.max_queue}, ("kind",))
+    metrics.gauge("ontorec_connection_pool_size", "Open triplestore connections", lambda: {(): len(connection_manager)})
+    metrics.gauge("ontorec_connection_pool_capacity", "Maximum number of open triplestore connections", lambda: {(): connection_manager.max_size})
+    metrics.gauge("ontorec_jobs", "Background jobs by state", lambda: {(state,): sum(1 for job in job_manager.list() if job.state == state) for state in (PENDING, RUNNING)}, ("state",))
+    metrics.gauge("ontorec_query_cache_hits_total", "Query cache hits", lambda: {(): query_cache.hits}, kind="counter")
+    metrics.gauge("ontorec_query_cache_misses_total", "Query cache misses", lambda: {(): query_cache.misses}, kind="counter")
+    metrics.gauge("ontorec_query_cache_bytes", "Size of the in-process query cache", lambda: {(): getattr(query_cache.backend, "size", 0)})
+    metrics.gauge("ontorec_namespace_cache_entries", "Databases whose namespaces are cached", lambda: {(): len(namespace_cache)})
+    metrics.gauge("ontorec_databases", "Databases listed by the registry", lambda: {(): len(database_registry)})
+    metrics.gauge("ontorec_prepared_query_calls_total", "Executions of prepared queries", lambda: {(db_name, prepared.name): prepared.calls for (db_name, prepared) in prepared_queries.items()}, ("database", "query"), kind="counter")
+    metrics.gauge("ontorec_prepared_query_errors_total", "Failed executions of prepared queries", lambda: {(db_name, prepared.name): prepared.errors for (db_name, prepared) in prepared_queries.items()}, ("database", "query"), kind="counter")
+    metrics.gauge("ontorec_prepared_query_seconds_total", "Time spent executing prepared queries", lambda: {(db_name, prepared.name): prepared.seconds for (db_name, prepared) in prepared_queries.items()}, ("database", "query"), kind="counter")
+    metrics.gauge("ontorec_replica_triples", "Triples held by the loaded replicas", lambda: {(replica.db_name,): len(replica) for replica in replica_manager.replicas()}, ("database",))
+    metrics.gauge("ontorec_replica_revision_lag", "Revisions of the change log not yet replayed on the replicas", lambda: {(replica.db_name,): change_log.revision(replica.db_name) - replica.revision for replica in replica_manager.replicas()}, ("database",))
@@ -0,0 +1,219 @@
+"""
+    In-process metrics exposed in the Prometheus text format
+"""
+
+import bisect
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Container, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Starlette appends the charset to text media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+# Database label of the requests to databases that are not known to exist
+OTHER_DATABASE = "other"
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, LabelValues, float]
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for value in values)
+    return "{" + ",".join('{}="{}"'.format(name, value) for (name, value) in zip(names, escaped)) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """
+        Named metric with a fixed list of label names
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[Sample]:
+        return []
+
+    def render(self) -> List[str]:
+        lines = ["# HELP {} {}".format(self.name, self.description), "# TYPE {} {}".format(self.name, self.kind)]
+        for (name, values, value) in self.samples():
+            label_names = self.labels + (("le",) if len(values) > len(self.labels) else ())
+            lines.append("{}{} {}".format(name, format_labels(label_names, values), format_value(value)))
+        return lines
+
+
+class Counter(Metric):
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        return [(self.name, labels, value) for (labels, value) in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            counts, total = self._values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        counts, _ = self._values.get(labels, ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self) -> Iterable[Sample]:
+        samples = []
+        for (labels, (counts, total)) in sorted(self._values.items()):
+            cumulative = 0
+            for (bound, count) in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((self.name + "_bucket", labels + (format_value(bound),), cumulative))
+            samples.append((self.name + "_count", labels, cumulative))
+            samples.append((self.name + "_sum", labels, total[0]))
+        return samples
+
+
+class Gauge(Metric):
+    """
+        Metric read from `collect` when rendered, as a mapping of label values
+        to values; used for the state of the pools and caches
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, collect: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = (), kind: Optional[str] = None):
+        super().__init__(name, description, labels)
+        self._collect = collect
+        if kind is not None:
+            self.kind = kind
+
+    def samples(self) -> Iterable[Sample]:
+        return [(self.name, labels, value) for (labels, value) in sorted(self._collect().items())]
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics: "Dict[str, Metric]" = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, description, labels)) # type: ignore
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, labels, buckets)) # type: ignore
+
+    def gauge(self, name: str, description: str, collect: Callable[[], Dict[LabelValues, float]], labels: Sequence[str] = (), kind: Optional[str] = None) -> Gauge:
+        return self.register(Gauge(name, description, collect, labels, kind)) # type: ignore
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as err:
+                lines.append("# {} unavailable: {}".format(metric.name, err))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter("ontorec_http_requests_total", "HTTP requests by route, database and status", ("route", "method", "database", "status"))
+http_request_seconds = metrics.histogram("ontorec_http_request_duration_seconds", "Time to answer HTTP requests, body included", ("route", "method", "database"))
+http_response_bytes = metrics.histogram("ontorec_http_response_bytes", "Size of the HTTP response bodies", ("route", "database"), SIZE_BUCKETS)
+phase_seconds = metrics.histogram("ontorec_phase_duration_seconds", "Time spent in each phase of a request: backend calls, N3 conversion, serialization", ("route", "phase"))
+result_rows = metrics.histogram("ontorec_query_result_rows", "Number of rows returned by queries", ("route",), SIZE_BUCKETS)
+
+
+def route_name(scope: dict) -> str:
+    """
+        Name of the endpoint a request was routed to, as a bounded label value
+    """
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched")
+
+
+class MetricsMiddleware:
+    """
+        ASGI middleware counting requests and timing them until their body is sent.
+
+        Requests are labelled with their database only if it is one of `databases`,
+        and with "other" otherwise, so that names sent by clients for databases that
+        do not exist cannot add series without bound.
+    """
+
+    def __init__(self, app, databases: Container[str] = ()):
+        self.app = app
+        self.databases = databases
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_and_measure(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            route = route_name(scope)
+            database = scope.get("path_params", {}).get("db_name", "")
+            if database and database not in self.databases:
+                database = OTHER_DATABASE
+            http_requests.inc(route, scope["method"], database, str(response["status"]))
+            http_request_seconds.observe(time.perf_counter() - started, route, scope["method"], database)
+            http_response_bytes.observe(response["bytes"], route, database)
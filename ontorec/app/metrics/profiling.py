@@ -0,0 +1,186 @@
+"""
+    Opt-in profiling of single requests
+"""
+
+import contextvars
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import tempfile
+import threading
+import uuid
+
+from typing import Any, Callable, List, Optional, TypeVar
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+
+app_settings = OntoRECSetting()
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_SUFFIX = ".prof"
+
+T = TypeVar("T")
+
+
+class RequestProfile:
+    """
+        cProfile statistics of one request: the event loop thread while the
+        request runs, and every call the request makes in the worker pool.
+
+        The event loop also runs the other requests in flight, whose coroutine
+        steps appear in the profile as well; worker threads only profile the
+        calls of this request.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self._profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+            Call `func` under a profiler of the current thread
+        """
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active in this interpreter
+            return func(*args, **kwargs)
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._profilers.append(profiler)
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self._profilers.append(profiler)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profilers = list(self._profilers)
+        if not profilers:
+            return None
+
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+
+current_profile: "contextvars.ContextVar[Optional[RequestProfile]]" = contextvars.ContextVar("current_profile", default=None)
+
+
+def profiling_requested(header: Optional[str]) -> bool:
+    """
+        Tell if a request asked for profiling and is allowed to: profiling must be
+        enabled, and the header must carry PROFILING_TOKEN when one is set
+    """
+    if not app_settings.PROFILING_ENABLED or header is None:
+        return False
+    if app_settings.PROFILING_TOKEN:
+        return hmac.compare_digest(header.encode(), app_settings.PROFILING_TOKEN.encode())
+    return True
+
+
+def profile_directory() -> str:
+    return app_settings.PROFILING_DIR or os.path.join(tempfile.gettempdir(), "ontorec-profiles")
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """
+        Path of a stored profile, or None if `profile_id` is not a stored profile
+    """
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(profile_directory(), profile_id + PROFILE_SUFFIX)
+    return path if os.path.isfile(path) else None
+
+
+def save_profile(profile: RequestProfile) -> Optional[str]:
+    """
+        Store the statistics of a profile, keeping the PROFILING_KEEP most recent ones
+    """
+    stats = profile.stats()
+    if stats is None:
+        return None
+
+    directory = profile_directory()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile.id + PROFILE_SUFFIX)
+    stats.dump_stats(path)
+
+    stored = sorted((entry for entry in os.scandir(directory) if entry.name.endswith(PROFILE_SUFFIX)), key=lambda entry: entry.stat().st_mtime)
+    for entry in stored[:max(len(stored) - app_settings.PROFILING_KEEP, 0)]:
+        try:
+            os.remove(entry.path)
+        except OSError as err:
+            log.warning("Cannot remove profile {}: {}".format(entry.path, err))
+
+    return path
+
+
+def profile_report(path: str, sort: str = "cumulative", limit: int = 50) -> str:
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+        ASGI middleware profiling the requests sent with the X-Profile header.
+
+        One request is profiled at a time; the others run unprofiled. The id of
+        the profile is returned in the X-Profile-Id header, and the report can be
+        fetched at /profiles/{profile_id} once the response is complete.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        header = headers.get(PROFILE_HEADER.encode())
+        if not profiling_requested(header.decode("latin-1") if header is not None else None) or not self._lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(PROFILE_ID_HEADER.encode(), profile.id.encode())]
+            await send(message)
+
+        token = current_profile.set(profile)
+        profiler = cProfile.Profile()
+        try:
+            try:
+                profiler.enable()
+            except ValueError:
+                profiler = None
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profile.add(profiler)
+            current_profile.reset(token)
+            self._lock.release()
+            try:
+                save_profile(profile)
+            except Exception as err:
+                log.error("Cannot store profile {}: {}".format(profile.id, err))
@@ -0,0 +1,66 @@
+"""
+    Log of the queries slower than a threshold on the backend
+"""
+
+import threading
+import time
+
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+
+app_settings = OntoRECSetting()
+
+# Characters of the query text written to the service log
+LOGGED_QUERY_LENGTH = 1000
+
+
+class SlowQueryLog:
+    """
+        The `size` most recent queries whose backend time reached `threshold`
+        seconds; a threshold of 0 disables the log
+    """
+
+    def __init__(self, threshold: float, size: int):
+        self.threshold = threshold
+        self._entries: Deque[Dict] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, db_name: str, query: str, reasoning: bool, seconds: float, rows: Optional[int], route: str = "", timed_out: bool = False) -> bool:
+        """
+            Record a query if it is slow, and tell if it was.
+            `rows` is None when unknown, e.g. for the queries which timed out
+            and the results passed through in a standard format.
+        """
+        if self.threshold <= 0 or seconds < self.threshold:
+            return False
+
+        outcome = "timed out" if timed_out else "rows unknown" if rows is None else "{} rows".format(rows)
+        log.warning("Slow query on database {} ({}): {:.3f}s on the backend, {}, reasoning {}: {}".format(
+            db_name, route, seconds, outcome, reasoning, " ".join(query.split())[:LOGGED_QUERY_LENGTH]))
+
+        with self._lock:
+            self._entries.append({
+                "time": time.time(),
+                "database": db_name,
+                "route": route,
+                "query": query,
+                "reasoning": reasoning,
+                "seconds": seconds,
+                "rows": rows,
+                "timed_out": timed_out,
+            })
+        return True
+
+    def entries(self, db_name: str = "") -> List[Dict]:
+        """
+            Recorded queries, most recent first, optionally of one database only
+        """
+        with self._lock:
+            entries = list(self._entries)
+        return [entry for entry in reversed(entries) if not db_name or entry["database"] == db_name]
+
+
+slow_queries = SlowQueryLog(app_settings.SLOW_QUERY_THRESHOLD, app_settings.SLOW_QUERY_LOG_SIZE)
@@ -3,6 +3,8 @@
 """
 from fastapi import APIRouter
 
+from app.triplestore.backends import triplestore_backend
+
 router = APIRouter()
 
 @router.get("/")
@@ -12,3 +14,9 @@ async def home():
     """
     return {"msg": "OntoREC v0.1"}
 
+@router.get("/backend")
+async def backend():
+    """
+    Triplestore backend of the service and its capabilities
+    """
+    return {"name": triplestore_backend.name, "capabilities": triplestore_backend.capabilities()}
@@ -2,33 +2,63 @@
     Router for operations with databases
 """
 
+import asyncio
+import gzip
+import itertools
+import json
 import os
+import shutil
+import tempfile
+import time
 
 from app.logger.logger import log
-from pathlib import Path
-from typing import List, Optional, Union, Tuple
-from fastapi import File, UploadFile, Response
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
-
-from pydantic import BaseModel
-
-from tripper import Literal
-from tripper import Triplestore
-from stardog.exceptions import StardogException # type: ignore
-
-from app.config.triplestoreConfig import TriplestoreConfig
-from app.config.ontokbCredentials import OntoKBCredentials
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Union, Tuple
+from fastapi import File, UploadFile, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+
+
+from app.config.ontoRECSettings import OntoRECSetting
+from app.metrics.metrics import phase_seconds, result_rows, route_name
+from app.metrics.slowQueries import slow_queries
+from app.triplestore.backends import triplestore_backend
+from app.triplestore.changeLog import ADD, REMOVE, RESET, ChangeLogGap, change_log
+from app.triplestore.connectionManager import connection_manager
+from app.triplestore.databaseRegistry import create_database as create_backend_database, database_registry, existing_database, remove_database
+from app.triplestore.emmo import load_emmo
+from app.triplestore.etags import check_etag, content_etag, database_etag, etag_period, request_variant
+from app.triplestore.loader import TripleWriter, count_statements, database_size, iter_line_chunks, load_chunk
+from app.triplestore.executor import backend_executor, backend_slot
+from app.triplestore.jobs import ImportJob, JobQueueFull, job_manager
+from app.triplestore.namespaceCache import namespace_cache
+from app.triplestore.preparedQueries import prepared_queries
+from app.triplestore.queryCache import query_cache
+from app.triplestore.replicas import read_triplestore, replica_manager
+from app.triplestore.queryGuard import ClientDisconnected, QueryLimits, QueryTimeout, ResultTooLarge, limit_query, run_query, tagged_query
+from app.triplestore.templates import TemplateNotFound, template_registry
+from app.triplestore.terms import n3_converter
+from app.triplestore.serialization import RESULT_FORMATS, SERIALIZATION_FORMATS, compress_chunks, export_chunks, get_serialization_format, negotiate_encoding, negotiate_result_format, query_result_chunks, triples_pages, upload_format
+from app.ontotrans_api.routers.jobs import JobStatus, job_status
 from SPARQLWrapper.SPARQLExceptions import QueryBadFormed
 
 N3Triple = Tuple[str, str, str]
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Status logged when the client goes away before the response, as in nginx
+CLIENT_CLOSED_REQUEST = 499
+
 router = APIRouter(
-    tags = ["Databases"]
+    tags = ["Databases"],
+    dependencies = [Depends(backend_slot)]
 )
 
-triplestore_config = TriplestoreConfig()
-ontokbcredentials_config = OntoKBCredentials()
+app_settings = OntoRECSetting()
 
 #
 # GET /databases
@@ -40,19 +70,23 @@ class Databases(BaseModel):
 
 ### Route
 @router.get("/databases", response_model=Databases, status_code = status.HTTP_200_OK)
-async def get_databases():
+async def get_databases(request: Request, response: Response):
     """
         Retrieve the list of databases
+
+        The response is tagged with an ETag of the list; a request with a matching
+        If-None-Match header is answered with 304 Not Modified.
     """
     databases = []
 
     try:
-        databases = Triplestore.list_databases("stardog", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
+        databases = await backend_executor.run(database_registry.names)
 
     except Exception as err:
         log.error("Exception occurred in /databases: {}".format(err))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
 
+    check_etag(request, response, content_etag(etag_period(), request_variant(request), *databases))
     return Databases(dbs = databases)
 
 #
@@ -64,62 +98,128 @@ class OntologyData(BaseModel):
     triples: List[N3Triple] = []
 
 ### Route
-@router.get("/databases/{db_name}", response_model=OntologyData, status_code = status.HTTP_200_OK, responses={500: {}})
-async def get_database_data(db_name: str):
+@router.get("/databases/{db_name}", response_model=OntologyData, status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}, 500: {}})
+async def get_database_data(db_name: str, request: Request, limit: Optional[int] = Query(None, ge=0), offset: int = Query(0, ge=0), stream: bool = False, etag: str = Depends(database_etag)):
     """
         Retrieve all data from a specific database
+
+        With `stream=true`, or when `application/x-ndjson` is accepted, triples are
+        read from a single cursor and streamed page by page as they arrive, either as
+        one JSON array per line or as a chunked `{"triples": [...]}` document.
+        `limit` and `offset` restrict the returned triples in both modes, taken in a
+        stable order so that successive windows neither skip nor repeat triples.
+        Databases listed in REPLICA_DATABASES are read from their in-process replica once loaded.
+        The response is tagged with an ETag of the revision of the database; a request
+        with a matching If-None-Match header is answered with 304 Not Modified.
     """
     triples = []
+    ndjson = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
 
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        db_content = triplestore.triples((None, None, None)) # type: ignore
+        triplestore = await read_triplestore(db_name)
 
-        for triple in db_content:
-            converted_triple = convert_triple_to_N3(triple) # type: ignore
-            triples.append(converted_triple)
+        if stream or ndjson:
+            pages = backend_executor.iterate(iter_triples_pages(triplestore, limit, offset, app_settings.STREAM_PAGE_SIZE))
+            first_page = await pages.__anext__()
+            if ndjson:
+                return StreamingResponse(encode_ndjson(first_page, pages), media_type=NDJSON_MEDIA_TYPE, headers={"ETag": etag})
+            return StreamingResponse(encode_ontology_data(first_page, pages), media_type="application/json", headers={"ETag": etag})
+
+        if limit is not None or offset:
+            triples = await backend_executor.run(lambda: n3_converter.rows(select_triples(triplestore, limit, offset)))
+        else:
+            with phase_seconds.time("get_database_data", "backend"):
+                results = await backend_executor.run(lambda: list(triplestore.triples((None, None, None)))) # type: ignore
+            with phase_seconds.time("get_database_data", "conversion"):
+                triples = await backend_executor.run(n3_converter.rows, results)
 
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /databases/{}: {}".format(db_name,err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
     
     except Exception as err:
         log.error("Exception occurred in /databases/{}: {}".format(db_name,err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
 
     return OntologyData(triples = triples) # type: ignore
 
 #
-# GET /databases/{db_name}/serialization
+# GET /databases/{db_name}/changes
 #
 
-### Model
-class SerializedContent(BaseModel):
-    content: str = ""
+### Route
+@router.get("/databases/{db_name}/changes", status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}, 410: {}})
+async def get_database_changes(db_name: str, since: int = Query(0, ge=0), epoch: Optional[str] = None, etag: str = Depends(database_etag)):
+    """
+        Stream the changes made to a database after revision `since`, one JSON
+        object per line, oldest first
+
+        The current revision and the epoch of the change log are returned in the
+        `X-Revision` and `X-Change-Log-Epoch` headers. When the changes cannot be
+        replayed, because they are no longer retained, were file imports or belong
+        to another `epoch` of the log, the answer is 410 and the database should be
+        downloaded again before following the changes from the current revision.
+    """
+    headers = {"X-Revision": str(change_log.revision(db_name)), "X-Change-Log-Epoch": change_log.epoch, "ETag": etag}
+
+    try:
+        if epoch is not None and epoch != change_log.epoch:
+            raise ChangeLogGap("Epoch {} is over, the change log restarted".format(epoch))
+        changes = change_log.since(db_name, since)
+
+    except ChangeLogGap as err:
+        log.warning("Exception occurred in /databases/{}/changes: {}".format(db_name,err))
+        return JSONResponse(status_code=status.HTTP_410_GONE, content={"detail": "{}".format(err)}, headers=headers)
+
+    return StreamingResponse((json.dumps(change.as_dict()) + "\n" for change in changes), media_type=NDJSON_MEDIA_TYPE, headers=headers)
 
-@router.get("/databases/{db_name}/serialization", response_model=SerializedContent, status_code = status.HTTP_200_OK)
-async def serialize_database(db_name:str, format: str = "turtle"):
+#
+# GET /databases/{db_name}/serialization
+#
+
+### Route
+@router.get("/databases/{db_name}/serialization", status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={200: {"content": {serialization_format.media_type: {} for serialization_format in SERIALIZATION_FORMATS.values()}}, 406: {}})
+async def serialize_database(db_name:str, request: Request, format: str = "turtle", etag: str = Depends(database_etag)):
     """
         Serialize database in a specific format
+
+        Supported formats are turtle, ntriples, nquads, xml (RDF/XML) and json-ld.
+        The serialization is streamed as raw body with the format media type,
+        compressed with gzip or zstd when accepted by the client.
+        It is tagged with an ETag of the revision of the database; a request with
+        a matching If-None-Match header is answered with 304 Not Modified.
     """
 
-    if format != "turtle":
+    serialization_format = get_serialization_format(format)
+    if serialization_format is None:
         return JSONResponse(status_code=status.HTTP_406_NOT_ACCEPTABLE, content={"detail": "{} format not supported".format(format)})
 
-    serialized_content = ""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
     try:   
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        serialized_content = triplestore.serialize(format="turtle")
-
-    except StardogException as err:
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        chunks = backend_executor.iterate(compress_chunks(export_chunks(
+            db_name,
+            serialization_format,
+            lambda rdflib_format: triplestore.serialize(format=rdflib_format),
+            lambda: triples_pages(triplestore, app_settings.STREAM_PAGE_SIZE),
+        ), encoding))
+        first_chunk = await first_item(chunks, b"")
+
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /databases/{}/serialization: {}".format(db_name,err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
 
     except Exception as err:
         log.error("Exception occurred in /databases/{}/serialization: {}".format(db_name,err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
 
-    return SerializedContent(content=serialized_content)
+    headers = {"Vary": "Accept-Encoding", "ETag": etag}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    return StreamingResponse(prepend(first_chunk, chunks), media_type=serialization_format.media_type, headers=headers)
 
 #
 # POST /databases/{db_name}/query
@@ -129,44 +229,103 @@ async def serialize_database(db_name:str, format: str = "turtle"):
 class QueryBody(BaseModel):
     query: str
     reasoning: Optional[bool] = False
+    timeout: Optional[float] = Field(None, gt=0)
+    max_rows: Optional[int] = Field(None, gt=0)
+    truncate: Optional[bool] = None
 
 ### Route
-@router.post("/databases/{db_name}/query", status_code = status.HTTP_200_OK, responses={400: {}, 500: {}})
-async def execute_query(db_name: str, queryModel: QueryBody):
+@router.post("/databases/{db_name}/query", status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={200: {"content": {media_type: {} for media_type in RESULT_FORMATS}}, 400: {}, 406: {}, 413: {}, 500: {}, 504: {}})
+async def execute_query(db_name: str, queryModel: QueryBody, request: Request, response: Response):
     """
         Execute a general query on a specific database
+
+        The results of read queries are cached until the next write to the database.
+        Queries without reasoning on databases listed in REPLICA_DATABASES are answered
+        by their in-process replica once loaded.
+        When `application/sparql-results+json`, `text/csv` or `text/tab-separated-values`
+        is accepted, the results are instead streamed as received from the triplestore
+        in that format, without being converted to N3. CONSTRUCT and DESCRIBE results,
+        and ASK results as CSV or TSV, cannot be returned in these formats, nor can
+        reasoning be used with them on backends without reasoning (406).
+
+        The query is cancelled after `timeout` seconds, or when the client disconnects.
+        Results beyond `max_rows` rows or the configured size are truncated and flagged
+        with the `X-Result-Truncated` header, or rejected with 413 if `truncate` is false.
+        With a configured size, results in the formats above are read up to that size
+        before being sent; truncated CSV and TSV results keep whole rows, while truncated
+        JSON results are not a complete document.
     """
 
+    limits = QueryLimits(queryModel.timeout, queryModel.max_rows, queryModel.truncate)
+    result_media_type = negotiate_result_format(request.headers.get("accept", ""))
+
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        results = triplestore.query(queryModel.query, reasoning=queryModel.reasoning)
+        if result_media_type is not None:
+            return await query_results_response(db_name, queryModel, request, limits, result_media_type)
 
-        triples = []
-        for triple in results:
-            converted_tuple = ()
-            for el in triple:
-                converted_tuple = converted_tuple + (convert_value_to_N3(el),)
-            triples.append(converted_tuple)
+        triples = await query_rows(db_name, queryModel, request, limits)
 
-    except QueryBadFormed as err:
-        log.error("Exception occurred in /databases/{}/query: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted")
+    except ClientDisconnected:
+        log.info("Client disconnected, query on database {} cancelled".format(db_name))
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
 
-    except StardogException as err:
-        if err.stardog_code == "0D0DU2":
-            log.error("Exception occurred in /databases/{}/query: {}".format(db_name,err))
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
-        
-        elif err.stardog_code == "QE0PE2":
-            log.error("Exception occurred in /databases/{}/query: {}".format(db_name,err))
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bad query")
+    except Exception as err:
+        raise query_exception(db_name, err)
 
+    return limited_rows(limits, triples, response)
 
-    except Exception as err:
-        log.error("Exception occurred in /databases/{}: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
+#
+# POST /databases/{db_name}/query/batch
+#
+
+## Model
+class QueryBatchResult(BaseModel):
+    status: int
+    results: Optional[List[List[Optional[str]]]] = None
+    truncated: bool = False
+    detail: Optional[str] = None
+
+### Route
+@router.post("/databases/{db_name}/query/batch", status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={200: {"model": List[QueryBatchResult]}, 413: {}})
+async def execute_query_batch(db_name: str, queries: List[QueryBody], request: Request):
+    """
+        Execute several queries on a specific database in one request
+
+        The queries run concurrently, at most QUERY_BATCH_CONCURRENCY at once, with the
+        same limits as single queries. The results come in the order of the queries,
+        each with the status a single query would have been answered with.
+    """
+
+    if len(queries) > app_settings.QUERY_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="At most {} queries per batch".format(app_settings.QUERY_BATCH_MAX_SIZE))
+
+    semaphore = asyncio.Semaphore(app_settings.QUERY_BATCH_CONCURRENCY)
+
+    async def execute(queryModel: QueryBody) -> dict:
+        limits = QueryLimits(queryModel.timeout, queryModel.max_rows, queryModel.truncate)
+        try:
+            async with semaphore:
+                rows = await query_rows(db_name, queryModel, request, limits)
+            rows, truncated = limits.limit_rows(rows)
+
+        except ResultTooLarge as err:
+            return {"status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "results": None, "truncated": False, "detail": "Query results too large: {}".format(err)}
+
+        except ClientDisconnected:
+            raise
+
+        except Exception as err:
+            http_error = query_exception(db_name, err)
+            return {"status": http_error.status_code, "results": None, "truncated": False, "detail": http_error.detail}
+
+        return {"status": status.HTTP_200_OK, "results": rows, "truncated": truncated, "detail": None}
+
+    try:
+        return await asyncio.gather(*[execute(queryModel) for queryModel in queries])
 
-    return triples # type: ignore
+    except ClientDisconnected:
+        log.info("Client disconnected, query batch on database {} cancelled".format(db_name))
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
 
 
 #
@@ -178,27 +337,53 @@ class DatabaseGenericResponse(BaseModel):
     response: str = ""
 
 ### Route
-@router.post("/databases/{db_name}/create", response_model=DatabaseGenericResponse, status_code = status.HTTP_201_CREATED)
-async def create_database(db_name: str, initEmmo: Optional[bool] = True):
+@router.post("/databases/{db_name}/create", response_model=DatabaseGenericResponse, status_code = status.HTTP_201_CREATED, responses={202: {"model": JobStatus}, 404: {}, 503: {}})
+async def create_database(db_name: str, initEmmo: Optional[bool] = True, template: Optional[str] = None, background: bool = False):
     """
        Create a database
+
+       With `template`, the database is created as a copy of the given template
+       database instead of importing EMMO. The EMMO template kept by the service
+       (by default `emmo-template`) is created on first use and refreshed when
+       the bundled ontology changes.
+       With `background=true`, the database is populated by a job whose status
+       is returned at once with code 202 and can be polled at `/jobs/{job_id}`.
     """
 
     try:
 
-        current_databases = Triplestore.list_databases("stardog", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        if not db_name in current_databases: #type:ignore
-            Triplestore.create_database("stardog", db_name, triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
+        if not await backend_executor.run(database_registry.exists, db_name):
+            if template:
+                await backend_executor.run(template_registry.resolve, template)
+            # A database left empty because its job was refused would be taken as created on retry
+            if background and (template or initEmmo):
+                job_manager.check_capacity()
+            await backend_executor.run(create_backend_database, db_name)
         else:
             return DatabaseGenericResponse(response="Database created")
 
-        if initEmmo:
-            triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-            emmo_path = str(Path(str(Path(__file__).parent.parent.parent.parent.resolve()) + os.path.sep.join(["", "ontologies","full_ontology_inferred_remapped.rdf"])))
-            triplestore.parse(location=emmo_path, format="rdf")
+        if background and (template or initEmmo):
+            try:
+                job = await job_manager.submit("create", db_name, lambda job: populate_database_job(job, template))
+            except JobQueueFull:
+                await backend_executor.run(remove_database, db_name)
+                raise
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(job_status(job)))
+
+        await populate_database(db_name, template, initEmmo)
+        await query_cache.invalidate(db_name)
+
+    except TemplateNotFound as err:
+        log.error("Exception occurred in /databases/{}/create: {}".format(db_name,err))
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template database does not exist")
+
+    except JobQueueFull as err:
+        log.warning("Exception occurred in /databases/{}/create: {}".format(db_name,err))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many pending jobs, retry later")
 
     except Exception as err:
         log.error("Exception occurred in /databases/{}/create: {}".format(db_name,err))
+        database_registry.invalidate()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
 
     return DatabaseGenericResponse(response="Database created")
@@ -210,32 +395,58 @@ async def create_database(db_name: str, initEmmo: Optional[bool] = True):
 ### Model
 class OntologyPostResponse(BaseModel):
     filename: Union[str, None] = None
+    triples: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    triples_per_second: float = 0.0
     
 ### Route
-@router.post("/databases/{db_name}", response_model=OntologyPostResponse, status_code = status.HTTP_200_OK)
-async def add_data_to_database(db_name: str, response: Response,  ontology: UploadFile = File(...)):
+@router.post("/databases/{db_name}", response_model=OntologyPostResponse, status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={202: {"model": JobStatus}, 400: {}, 404: {}, 500: {}, 503: {}})
+async def add_data_to_database(db_name: str, response: Response,  ontology: UploadFile = File(...), atomic: bool = True, background: bool = False):
     """
         Add an ontology file to the database
+
+        Supported files are Turtle (.ttl), N-Triples (.nt), N-Quads (.nq) and
+        RDF/XML (.rdf, .owl, .xml), optionally gzip-compressed (.gz).
+        The upload is passed to the triplestore without being read in memory;
+        N-Triples and N-Quads are sent in chunks, loaded concurrently when `atomic=false`.
+        With `background=true`, the file is imported by a job whose status is
+        returned at once with code 202 and can be polled at `/jobs/{job_id}`.
     """
-    content = ontology.file.read()
+    serialization_format, compression = upload_format(ontology.filename or "")
+    if serialization_format is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format of {} not supported".format(ontology.filename))
+
+    if background:
+        upload = await backend_executor.run(spool_upload, ontology.file)
+        try:
+            job = await job_manager.submit("import", db_name, lambda job: import_ontology_job(job, upload, serialization_format, compression, atomic), cleanup=upload.close)
+        except JobQueueFull as err:
+            upload.close()
+            log.warning("Exception occurred in /databases/{}: {}".format(db_name,err))
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many pending jobs, retry later")
+
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(job_status(job)))
+
+    started = time.perf_counter()
+    size = await backend_executor.run(file_size, ontology.file)
 
     try:
-        extension = ontology.filename.split(".")[1] #type:ignore
-        if not extension in ["ttl"]:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format {} not supported".format(extension))
-        else:
-            triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-            triplestore.parse(data=content, format="turtle")
+        triples = await import_and_record(db_name, ontology.file, serialization_format, compression, atomic, "import of {}".format(ontology.filename))
     
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /databases/{}: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        if triplestore_backend.is_missing_database(err):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bad file content")
 
     except Exception as err:
         log.error("Exception occurred in /databases/{}: {}".format(db_name,err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
 
-    return OntologyPostResponse(filename=ontology.filename)
+    seconds = time.perf_counter() - started
+    return OntologyPostResponse(filename=ontology.filename, triples=triples, bytes=size, seconds=seconds, triples_per_second=triples / seconds if seconds else 0.0)
 
 #
 # POST /databases/{db_name}/single
@@ -250,35 +461,73 @@ class Triple(BaseModel):
 class TripleList(BaseModel):
     triples: List[Triple]
 
+class BulkWriteResponse(DatabaseGenericResponse):
+    triples: int = 0
+    batches: int = 0
+    committed: int = 0
+    seconds: float = 0.0
+
+TRIPLE_LIST_SCHEMA = {"type": "object", "properties": {"triples": {"type": "array", "items": Triple.schema()}}, "required": ["triples"]}
     
 ### Route
-@router.post("/databases/{db_name}/single", response_model=DatabaseGenericResponse, status_code = status.HTTP_200_OK)
-async def add_triples_to_database(db_name: str, response: Response,  triples: TripleList):
+@router.post("/databases/{db_name}/single", response_model=BulkWriteResponse, status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={400: {}, 404: {}, 500: {}},
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": TRIPLE_LIST_SCHEMA}, NDJSON_MEDIA_TYPE: {"schema": Triple.schema()}}}})
+async def add_triples_to_database(db_name: str, request: Request, batch_size: Optional[int] = Query(None, gt=0), atomic: bool = True):
     """
         Add single turtle triples to the database
+
+        The body is either a `TripleList` JSON document or, with content type
+        `application/x-ndjson`, one triple per line (as `{"s": ..., "p": ..., "o": ...}`
+        or `[s, p, o]`), which is read and inserted incrementally.
+        Triples are sent in batches of `batch_size`, all in one transaction unless
+        `atomic=false`, in which case each batch is committed on its own.
     """
+    batch_size = batch_size or app_settings.INSERT_BATCH_SIZE
+    started = time.perf_counter()
+    writer = None
+    recorder = change_log.recorder(db_name, ADD)
 
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        formatted_triples = []
-        for triple in triples.triples:
-            formatted_triples.append((triple.s, triple.p, triple.o))
-
-        triplestore.add_triples(formatted_triples)
-
-    except QueryBadFormed as err:
+        if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+            batches = parse_ndjson_triples(request.stream(), batch_size)
+        else:
+            batches = split_batches(TripleList.parse_raw(await request.body()).triples, batch_size)
+
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        writer = TripleWriter(db_name, triplestore, atomic=atomic)
+        await backend_executor.run(writer.open)
+        try:
+            async for batch in batches:
+                await backend_executor.run_shielded(writer.write, batch)
+                recorder.extend(batch)
+            await backend_executor.run_shielded(writer.commit)
+        finally:
+            await backend_executor.run(writer.close)
+
+    except ValidationError as err:
+        raise RequestValidationError([ErrorWrapper(err, ("body",))])
+
+    except (QueryBadFormed, ValueError) as err:
         log.error("Exception occurred in /databases/{}/single: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted" + commit_point(writer))
     
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /databases/{}/single: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        if triplestore_backend.is_missing_database(err):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted" + commit_point(writer))
     
     except Exception as err:
         log.error("Exception occurred in /databases/{}/single: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
+        connection_manager.invalidate(db_name)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance" + commit_point(writer))
+
+    finally:
+        if writer is not None:
+            recorder.commit(writer.committed)
+        await query_cache.invalidate(db_name)
 
-    return DatabaseGenericResponse(response="Triples added successfully")
+    return BulkWriteResponse(response="Triples added successfully", triples=writer.written, batches=writer.batches, committed=writer.committed, seconds=time.perf_counter() - started)
 
 #
 # DELETE /databases/{db_name}
@@ -291,7 +540,12 @@ async def delete_database(db_name: str):
        Delete a database
     """
     try:
-        Triplestore.remove_database("stardog",  db_name, triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
+        namespace_cache.invalidate(db_name)
+        prepared_queries.drop_database(db_name)
+        change_log.drop_database(db_name)
+        replica_manager.drop(db_name)
+        await query_cache.invalidate(db_name)
+        await backend_executor.run(remove_database, db_name)
 
     except Exception as err:
         log.error("Exception occurred in /databases/{}: {}".format(db_name,err))
@@ -304,40 +558,400 @@ async def delete_database(db_name: str):
 #
 
 ### Route
-@router.delete("/databases/{db_name}/single", response_model = DatabaseGenericResponse, status_code = status.HTTP_200_OK)
-async def delete_database_triples(db_name: str,  triples: TripleList):
+@router.delete("/databases/{db_name}/single", response_model = BulkWriteResponse, status_code = status.HTTP_200_OK, dependencies = [Depends(existing_database)], responses={400: {}, 404: {}, 500: {}})
+async def delete_database_triples(db_name: str,  triples: TripleList, batch_size: Optional[int] = Query(None, gt=0), atomic: bool = True):
     """
        Delete triples from database
+
+       Triples are removed with one SPARQL update per batch of `batch_size`, all
+       in one transaction unless `atomic=false`. A triple with null `s`, `p` or `o`
+       is a pattern: all the matching triples are removed server side.
     """
+    batch_size = batch_size or app_settings.DELETE_BATCH_SIZE
+    started = time.perf_counter()
+    writer = None
+    recorder = change_log.recorder(db_name, REMOVE)
+
     try:
 
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        for triple in triples.triples:
-            formatted_triple = (triple.s, triple.p, triple.o)
-            triplestore.remove(formatted_triple) #type:ignore
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        writer = TripleWriter(db_name, triplestore, atomic=atomic)
+        await backend_executor.run(writer.open)
+        try:
+            for start in range(0, len(triples.triples), batch_size):
+                batch = [(triple.s, triple.p, triple.o) for triple in triples.triples[start:start + batch_size]]
+                await backend_executor.run_shielded(writer.remove, batch)
+                recorder.extend(batch)
+            await backend_executor.run_shielded(writer.commit)
+        finally:
+            await backend_executor.run(writer.close)
 
     except QueryBadFormed as err:
         log.error("Exception occurred in /databases/{}/single: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted" + commit_point(writer))
     
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /databases/{}/single: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        if triplestore_backend.is_missing_database(err):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted" + commit_point(writer))
 
     except Exception as err:
         log.error("Exception occurred in /databases/{}/single: {}".format(db_name,err))
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
+        connection_manager.invalidate(db_name)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance" + commit_point(writer))
+
+    finally:
+        if writer is not None:
+            recorder.commit(writer.committed)
+        await query_cache.invalidate(db_name)
 
-    return DatabaseGenericResponse(response="Triples deleted successfully")
+    return BulkWriteResponse(response="Triples deleted successfully", triples=writer.written, batches=writer.batches, committed=writer.committed, seconds=time.perf_counter() - started)
 
 
 ## Utils
-def convert_value_to_N3(value):
-    new_value = value.n3() if isinstance(value, Literal) else value if value.startswith("<") or value.startswith("_:") else "<{}>".format(value)  
+def select_triples(triplestore, limit, offset) -> Iterator:
+    """
+        Return a single cursor over the triples of a database: all of them, or
+        the window selected by `limit` and `offset` in a stable order, so that
+        successive windows neither skip nor repeat triples
+    """
+    if limit is None and not offset:
+        return triplestore.triples((None, None, None))
+
+    query = "SELECT ?s ?p ?o WHERE { ?s ?p ?o } ORDER BY ?s ?p ?o"
+    if limit is not None:
+        query += " LIMIT {}".format(limit)
+    if offset:
+        query += " OFFSET {}".format(offset)
+
+    return iter(triplestore.query(query))
+
+def iter_triples_pages(triplestore, limit, offset, page_size) -> Iterator[List[N3Triple]]:
+    """
+        Yield pages of N3 triples read from a single cursor, converting one page
+        at a time. The first page is always yielded, even when empty.
+    """
+    triples = select_triples(triplestore, limit, offset)
+    page = n3_converter.rows(itertools.islice(triples, page_size))
+    yield page
+
+    while len(page) == page_size:
+        page = n3_converter.rows(itertools.islice(triples, page_size))
+        if page:
+            yield page
+
+async def encode_ndjson(first_page, pages):
+    async for page in prepend(first_page, pages):
+        yield "".join(json.dumps(triple) + "\n" for triple in page)
+
+async def encode_ontology_data(first_page, pages):
+    yield '{"triples": ['
+    separator = ""
+    async for page in prepend(first_page, pages):
+        if page:
+            yield separator + ", ".join(json.dumps(triple) for triple in page)
+            separator = ", "
+    yield "]}"
+
+async def query_rows(db_name: str, queryModel: QueryBody, request: Request, limits: QueryLimits) -> List:
+    """
+        Return the N3 rows of a query from the cache, or run it on the replica
+        of the database or the pooled connection. SELECT queries are limited to
+        one row more than `limits.max_rows`, which tells if they were truncated.
+    """
+    query = limit_query(queryModel.query, limits.max_rows + 1) if limits.max_rows is not None else queryModel.query
+    cache_key, cached = await query_cache.get(db_name, query, bool(queryModel.reasoning))
+    if cached is not None:
+        return cached
+
+    route = route_name(request.scope)
+    triplestore = await read_triplestore(db_name, bool(queryModel.reasoning))
+    query = tagged_query(query)
+    started = time.perf_counter()
+    try:
+        with phase_seconds.time(route, "backend"):
+            results = await run_query(request, db_name, query, limits.timeout, backend_executor.run(triplestore.query, query, reasoning=queryModel.reasoning))
+    except QueryTimeout:
+        slow_queries.record(db_name, queryModel.query, bool(queryModel.reasoning), time.perf_counter() - started, None, route, timed_out=True)
+        raise
+    backend_seconds = time.perf_counter() - started
+    with phase_seconds.time(route, "conversion"):
+        triples = await backend_executor.run(n3_converter.rows, results)
+    result_rows.observe(len(triples), route)
+    slow_queries.record(db_name, queryModel.query, bool(queryModel.reasoning), backend_seconds, len(triples), route)
+
+    await query_cache.set(cache_key, triples)
+    return triples
+
+async def query_results_response(db_name: str, queryModel: QueryBody, request: Request, limits: QueryLimits, media_type: str) -> Response:
+    """
+        Answer the results of a query in a standard SPARQL results format, read
+        up to the size limit or, without one, streamed as received. Their rows
+        are not counted, so slow queries are recorded without a number of rows.
+    """
+    route = route_name(request.scope)
+    triplestore = await backend_executor.run(connection_manager.get, db_name)
+    query = tagged_query(queryModel.query)
+    chunks = backend_executor.iterate(query_result_chunks(db_name, triplestore, query, bool(queryModel.reasoning), media_type, limits.timeout, limits.max_rows))
+    started = time.perf_counter()
+    try:
+        with phase_seconds.time(route, "backend"):
+            if limits.max_bytes is None:
+                first_chunk = await run_query(request, db_name, query, limits.timeout, first_item(chunks, b""))
+            else:
+                try:
+                    (body, truncated) = await run_query(request, db_name, query, limits.timeout, limits.read_chunks(chunks, RESULT_FORMATS[media_type] != "json"))
+                finally:
+                    await chunks.aclose()
+    except QueryTimeout:
+        slow_queries.record(db_name, queryModel.query, bool(queryModel.reasoning), time.perf_counter() - started, None, route, timed_out=True)
+        raise
+
+    if limits.max_bytes is not None:
+        slow_queries.record(db_name, queryModel.query, bool(queryModel.reasoning), time.perf_counter() - started, None, route)
+        return Response(b"".join(body), media_type=media_type, headers={"X-Result-Truncated": "true"} if truncated else None)
+
+    async def stream():
+        try:
+            async for chunk in prepend(first_chunk, chunks):
+                yield chunk
+        finally:
+            slow_queries.record(db_name, queryModel.query, bool(queryModel.reasoning), time.perf_counter() - started, None, route)
+
+    return StreamingResponse(stream(), media_type=media_type)
+
+def query_exception(db_name: str, err: Exception) -> HTTPException:
+    """
+        Log an exception raised by a query and map it to the HTTP error answered for it
+    """
+    log.error("Exception occurred in /databases/{}/query: {}".format(db_name,err))
+
+    if isinstance(err, HTTPException):
+        return err
+
+    if isinstance(err, QueryTimeout):
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Query timed out")
+
+    if isinstance(err, ResultTooLarge):
+        return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Query results too large: {}".format(err))
+
+    if isinstance(err, QueryBadFormed):
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Triple bad formatted")
+
+    if isinstance(err, triplestore_backend.errors + replica_manager.errors):
+        if triplestore_backend.is_missing_database(err):
+            return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bad query")
+
+    if isinstance(err, NotImplementedError):
+        return HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail="{}".format(err))
+
+    connection_manager.invalidate(db_name)
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
+
+def limited_rows(limits: QueryLimits, rows: List, response: Response) -> List:
+    try:
+        rows, truncated = limits.limit_rows(rows)
+    except ResultTooLarge as err:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Query results too large: {}".format(err))
+
+    if truncated:
+        response.headers["X-Result-Truncated"] = "true"
+    return rows
+
+async def first_item(items, default):
+    try:
+        return await items.__anext__()
+    except StopAsyncIteration:
+        return default
+
+async def prepend(head, items):
+    yield head
+    async for item in items:
+        yield item
+
+def as_n3_triple(triple) -> N3Triple:
+    if isinstance(triple, dict):
+        triple = Triple.parse_obj(triple)
+        triple = (triple.s, triple.p, triple.o)
+    elif isinstance(triple, Triple):
+        triple = (triple.s, triple.p, triple.o)
+
+    if len(triple) != 3 or not all(isinstance(term, str) and term for term in triple):
+        raise ValueError("Invalid triple {}".format(triple))
+
+    return tuple(triple) # type: ignore
+
+async def split_batches(triples, batch_size) -> AsyncIterator[List[N3Triple]]:
+    for start in range(0, len(triples), batch_size):
+        yield [as_n3_triple(triple) for triple in triples[start:start + batch_size]]
+
+async def parse_ndjson_triples(chunks, batch_size) -> AsyncIterator[List[N3Triple]]:
+    """
+        Parse a stream of NDJSON chunks into batches of triples
+    """
+    batch = []
+    pending = b""
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                batch.append(as_n3_triple(json.loads(line)))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+    if pending.strip():
+        batch.append(as_n3_triple(json.loads(pending)))
+    if batch:
+        yield batch
+
+def commit_point(writer) -> str:
+    if writer is None or writer.atomic:
+        return ""
+    return " ({} triples committed)".format(writer.committed)
+
+def file_size(file) -> int:
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    return size
+
+def spool_upload(file):
+    """
+        Copy an upload to a temporary file owned by a background job
+    """
+    upload = tempfile.TemporaryFile()
+    file.seek(0)
+    shutil.copyfileobj(file, upload)
+    upload.seek(0)
+    return upload
+
+async def import_ontology(db_name, file, serialization_format, compression, atomic, progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+        Load an RDF file into a database and return the number of triples added
+    """
+    triplestore = await backend_executor.run(connection_manager.get, db_name)
+    if serialization_format.line_oriented:
+        source = gzip.GzipFile(fileobj=file, mode="rb") if compression else file
+        chunks = backend_executor.iterate(iter_line_chunks(source, app_settings.UPLOAD_CHUNK_SIZE))
+        return await load_line_chunks(db_name, triplestore, chunks, serialization_format, atomic, progress)
 
-    return new_value
+    initial_size = await backend_executor.run(database_size, db_name, triplestore)
+    await backend_executor.run(load_chunk, db_name, triplestore, file, serialization_format, compression)
+    return await backend_executor.run(database_size, db_name, triplestore) - initial_size
 
-def convert_triple_to_N3(triple):
-    s, p, o = triple
+def import_committed(err: BaseException, atomic: bool, loaded: int) -> bool:
+    """
+        Tell if a failed import may have committed triples: chunks loaded in
+        their own transaction, or any write to a backend without transactions
+    """
+    if isinstance(err, triplestore_backend.errors) and triplestore_backend.is_missing_database(err):
+        return False
+    if not triplestore_backend.transactions:
+        return True
+    return not atomic and loaded > 0
+
+async def import_and_record(db_name, file, serialization_format, compression, atomic, detail: str, progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+        Import a file and record it in the change log, unless it failed
+        without committing any triple
+    """
+    loaded: List[int] = []
+
+    def count_loaded(count: int) -> None:
+        loaded.append(count)
+        if progress is not None:
+            progress(count)
+
+    try:
+        triples = await import_ontology(db_name, file, serialization_format, compression, atomic, count_loaded)
+    except BaseException as err:
+        if import_committed(err, atomic, sum(loaded)):
+            change_log.append(db_name, RESET, detail=detail)
+            await query_cache.invalidate(db_name)
+        raise
+
+    change_log.append(db_name, RESET, detail=detail)
+    await query_cache.invalidate(db_name)
+    return triples
+
+async def import_ontology_job(job: ImportJob, file, serialization_format, compression, atomic):
+    job.bytes = await backend_executor.run(file_size, file)
+    job.triples = await import_and_record(job.db_name, file, serialization_format, compression, atomic, "import job {}".format(job.id), job.progress)
+
+async def populate_database(db_name, template, initEmmo):
+    try:
+        if template:
+            triplestore = await backend_executor.run(connection_manager.get, db_name)
+            await backend_executor.run(template_registry.clone, template, db_name, triplestore)
 
-    return (convert_value_to_N3(s), convert_value_to_N3(p), convert_value_to_N3(o))
\ No newline at end of file
+        elif initEmmo:
+            triplestore = await backend_executor.run(connection_manager.get, db_name)
+            await backend_executor.run(load_emmo, db_name, triplestore)
+
+    finally:
+        if template or initEmmo:
+            change_log.append(db_name, RESET, detail="copy of {}".format(template) if template else "import of EMMO")
+
+async def populate_database_job(job: ImportJob, template):
+    try:
+        await populate_database(job.db_name, template, True)
+    finally:
+        await query_cache.invalidate(job.db_name)
+    triplestore = await backend_executor.run(connection_manager.get, job.db_name)
+    job.triples = await backend_executor.run(database_size, job.db_name, triplestore)
+
+async def load_line_chunks(db_name, triplestore, chunks, serialization_format, atomic, progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+        Load N-Triples/N-Quads chunks, in one transaction or concurrently
+        in one transaction per chunk, and return the number of statements.
+        `progress` is called with the number of statements of each chunk sent.
+    """
+    if atomic:
+        writer = TripleWriter(db_name, triplestore)
+        await backend_executor.run(writer.open)
+        try:
+            async for chunk in chunks:
+                count = count_statements(chunk)
+                await backend_executor.run_shielded(writer.write_raw, chunk, serialization_format, count=count)
+                if progress is not None:
+                    progress(count)
+            await backend_executor.run_shielded(writer.commit)
+        finally:
+            await backend_executor.run(writer.close)
+        return writer.written
+
+    triples = 0
+    slots = asyncio.Semaphore(app_settings.UPLOAD_PARALLELISM)
+    loads = []
+
+    async def load(chunk, count):
+        try:
+            await backend_executor.run_shielded(load_chunk, db_name, triplestore, chunk, serialization_format)
+            if progress is not None:
+                progress(count)
+        finally:
+            slots.release()
+
+    try:
+        async for chunk in chunks:
+            await slots.acquire()
+            if any(task.done() and task.exception() for task in loads):
+                slots.release()
+                break
+            count = count_statements(chunk)
+            triples += count
+            loads.append(asyncio.ensure_future(load(chunk, count)))
+    except asyncio.CancelledError:
+        for task in loads:
+            task.cancel()
+        await asyncio.gather(*loads, return_exceptions=True)
+        raise
+
+    for result in await asyncio.gather(*loads, return_exceptions=True):
+        if isinstance(result, BaseException):
+            raise result
+
+    return triples
@@ -0,0 +1,99 @@
+"""
+    Router for the background import jobs
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+
+from app.triplestore.jobs import ImportJob, job_manager
+
+
+router = APIRouter(
+    tags = ["Jobs"]
+)
+
+### Model
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    db_name: str
+    state: str
+    triples: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    triples_per_second: float = 0.0
+    error: Optional[str] = None
+    created: datetime
+    started: Optional[datetime] = None
+    finished: Optional[datetime] = None
+
+class Jobs(BaseModel):
+    jobs: List[JobStatus] = []
+
+#
+# GET /jobs
+#
+
+### Route
+@router.get("/jobs", response_model=Jobs, status_code = status.HTTP_200_OK)
+async def get_jobs():
+    """
+        Retrieve the list of the current and recently finished jobs
+    """
+    return Jobs(jobs = [job_status(job) for job in job_manager.list()])
+
+#
+# GET /jobs/{job_id}
+#
+
+### Route
+@router.get("/jobs/{job_id}", response_model=JobStatus, status_code = status.HTTP_200_OK, responses={404: {}})
+async def get_job(job_id: str):
+    """
+        Retrieve the state and progress of a job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job does not exist")
+
+    return job_status(job)
+
+#
+# DELETE /jobs/{job_id}
+#
+
+### Route
+@router.delete("/jobs/{job_id}", response_model=JobStatus, status_code = status.HTTP_200_OK, responses={404: {}})
+async def cancel_job(job_id: str):
+    """
+        Cancel a pending or running job
+
+        The data imported by a cancelled job is rolled back, except for the
+        chunks already committed by a non-atomic import.
+    """
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job does not exist")
+
+    return job_status(job)
+
+
+## Utils
+def job_status(job: ImportJob) -> JobStatus:
+    return JobStatus(
+        id=job.id,
+        kind=job.kind,
+        db_name=job.db_name,
+        state=job.state,
+        triples=job.triples,
+        bytes=job.bytes,
+        seconds=job.seconds,
+        triples_per_second=job.triples_per_second,
+        error=job.error,
+        created=job.created, # type: ignore
+        started=job.started, # type: ignore
+        finished=job.finished, # type: ignore
+    )
@@ -0,0 +1,24 @@
+"""
+    Router exposing the metrics of the service
+"""
+
+from fastapi import APIRouter, Response
+
+from app.metrics.metrics import CONTENT_TYPE, metrics
+
+
+router = APIRouter(
+    tags = ["Metrics"]
+)
+
+#
+# GET /metrics
+#
+
+### Route
+@router.get("/metrics", response_class=Response, responses={200: {"content": {CONTENT_TYPE: {}}}})
+async def get_metrics():
+    """
+        Retrieve the metrics of the service in the Prometheus text format
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
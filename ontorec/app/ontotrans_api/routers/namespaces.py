@@ -4,27 +4,31 @@
 """
 
 from app.logger.logger import log
-from typing import List
+from typing import Dict, List
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import JSONResponse
-from stardog.exceptions import StardogException # type: ignore
 
 
 from pydantic import BaseModel
 
-from tripper import Triplestore
-
 from app.config.triplestoreConfig import TriplestoreConfig
-from app.config.ontokbCredentials import OntoKBCredentials
+from app.triplestore.backends import triplestore_backend
+from app.triplestore.changeLog import BIND, UNBIND, change_log
+from app.triplestore.connectionManager import connection_manager
+from app.triplestore.databaseRegistry import existing_database
+from app.triplestore.etags import database_etag
+from app.triplestore.executor import backend_executor, backend_slot
+from app.triplestore.namespaceCache import namespace_cache
+from app.triplestore.queryCache import query_cache
 
 
 router = APIRouter(
-    tags = ["Namespaces"]
+    tags = ["Namespaces"],
+    dependencies = [Depends(backend_slot), Depends(existing_database)]
 )
 
 triplestore_config = TriplestoreConfig()
-ontokbcredentials_config = OntoKBCredentials()
 
 #
 # GET /databases/{db_name}/namespaces
@@ -39,7 +43,7 @@ class Namespaces(BaseModel):
     namespaces: List[Namespace] = []
 
 ### Route
-@router.get("/databases/{db_name}/namespaces", response_model=Namespaces, status_code = status.HTTP_200_OK)
+@router.get("/databases/{db_name}/namespaces", response_model=Namespaces, status_code = status.HTTP_200_OK, dependencies = [Depends(database_etag)])
 async def get_namespaces(db_name: str):
     """
         Retrieve the namespaces in a database
@@ -48,19 +52,18 @@ async def get_namespaces(db_name: str):
     response = Namespaces()
     try:
         log.info("[DEBUG] - Using URL {}".format("http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT)))
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-
-        namespaces_raw = triplestore.backend.namespaces()
+        namespaces_raw = await get_namespace_map(db_name)
         namespaces = [Namespace(prefix=prefix, iri=iri) for (prefix, iri) in namespaces_raw.items()]
        
         response = Namespaces(namespaces=namespaces)
 
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /namespaces: {}".format(err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
 
     except Exception as err:
         log.error("Exception occurred in /namespaces: {}".format(err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
 
     return response
@@ -71,7 +74,7 @@ async def get_namespaces(db_name: str):
 #
 
 ### Route
-@router.get("/databases/{db_name}/namespaces/base", response_model=Namespace, status_code = status.HTTP_200_OK, responses={404:{}})
+@router.get("/databases/{db_name}/namespaces/base", response_model=Namespace, status_code = status.HTTP_200_OK, dependencies = [Depends(database_etag)], responses={404:{}})
 async def get_base_namespace(db_name: str):
     """
         Retrieve the base namespace in a database
@@ -80,21 +83,19 @@ async def get_base_namespace(db_name: str):
     response = Namespace()
     try:
         
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-
-
-        namespaces_raw = triplestore.backend.namespaces()
+        namespaces_raw = await get_namespace_map(db_name)
         if "" in namespaces_raw:
             response = Namespace(prefix="base", iri=namespaces_raw[""])
         else:
             return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Base namespace does not exists"})
         
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /namespaces/base: {}".format(err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
     
     except Exception as err:
         log.error("Exception occurred in /namespaces/base: {}".format(err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
         
     return response
@@ -104,7 +105,7 @@ async def get_base_namespace(db_name: str):
 #
 
 ### Route
-@router.get("/databases/{db_name}/namespaces/{namespace_name}", response_model=Namespace, status_code = status.HTTP_200_OK, responses={404:{}})
+@router.get("/databases/{db_name}/namespaces/{namespace_name}", response_model=Namespace, status_code = status.HTTP_200_OK, dependencies = [Depends(database_etag)], responses={404:{}})
 async def get_namespace(db_name: str, namespace_name: str):
     """
         Retrieve a namespace in a database
@@ -112,20 +113,19 @@ async def get_namespace(db_name: str, namespace_name: str):
 
     response = Namespace()
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-
-        namespaces_raw = triplestore.backend.namespaces()
+        namespaces_raw = await get_namespace_map(db_name)
         if namespace_name in namespaces_raw:
-            response = Namespace(prefix=namespace_name, iri=namespaces_raw[""])
+            response = Namespace(prefix=namespace_name, iri=namespaces_raw[namespace_name])
         else:
             return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Namespace {} does not exists".format(namespace_name)})
         
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /namespaces/{}: {}".format(namespace_name, err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
     
     except Exception as err:
         log.error("Exception occurred in /namespaces/{}: {}".format(namespace_name,err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
         
     return response
@@ -144,20 +144,24 @@ async def add_namespace(db_name: str, namespace: Namespace):
     real_prefix = "" if namespace.prefix == "base" else namespace.prefix
     real_namespace = Namespace(prefix=real_prefix, iri=namespace.iri)
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        namespaces_raw = triplestore.backend.namespaces()
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        namespaces_raw = await get_namespace_map(db_name)
 
         if real_namespace.prefix in namespaces_raw and real_namespace.iri != namespaces_raw[real_namespace.prefix]:
             return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": "Already existing namespace"})
 
-        triplestore.bind(real_namespace.prefix, real_namespace.iri)
+        await backend_executor.run(triplestore.bind, real_namespace.prefix, real_namespace.iri)
+        namespace_cache.bind(db_name, real_namespace.prefix, real_namespace.iri)
+        change_log.append(db_name, BIND, prefix=real_namespace.prefix, iri=real_namespace.iri)
+        await query_cache.invalidate(db_name)
 
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /namespaces: {}".format(err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
 
     except Exception as err:
         log.error("Exception occurred in /namespaces: {}".format(err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="{}".format(err))
 
     return real_namespace
@@ -178,18 +182,22 @@ async def delete_namespace_byname(db_name: str):
     """
 
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        namespaces_raw = triplestore.backend.namespaces()
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        namespaces_raw = await get_namespace_map(db_name)
 
         if "" in namespaces_raw:
-            triplestore.backend.bind("", None) # type: ignore
+            await backend_executor.run(triplestore.backend.bind, "", None) # type: ignore
+            namespace_cache.bind(db_name, "", None)
+            change_log.append(db_name, UNBIND, prefix="", iri=namespaces_raw[""])
+            await query_cache.invalidate(db_name)
 
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /namespaces/base: {}".format(db_name,err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
 
     except Exception as err:
         log.error("Exception occurred in /namespaces/base: {}".format(db_name,err))
+        connection_manager.invalidate(db_name)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="{}".format(err))
 
 #
@@ -205,16 +213,34 @@ async def delete_namespace(db_name: str, namespace_name: str):
     """
 
     try:
-        triplestore = Triplestore(backend=triplestore_config.BACKEND, base_iri="", triplestore_url = "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT), database=db_name, uname=ontokbcredentials_config.USERNAME, pwd=ontokbcredentials_config.PASSWORD)
-        namespaces_raw = triplestore.backend.namespaces()
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        namespaces_raw = await get_namespace_map(db_name)
 
         if namespace_name in namespaces_raw:
-            triplestore.bind(namespace_name, None) # type: ignore
+            await backend_executor.run(triplestore.bind, namespace_name, None) # type: ignore
+            namespace_cache.bind(db_name, namespace_name, None)
+            change_log.append(db_name, UNBIND, prefix=namespace_name, iri=namespaces_raw[namespace_name])
+            await query_cache.invalidate(db_name)
 
-    except StardogException as err:
+    except triplestore_backend.errors as err:
         log.error("Exception occurred in /namespaces/{}: {}".format(namespace_name, err))
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
 
     except Exception as err:
         log.error("Exception occurred in /namespaces/{}: {}".format(namespace_name, err))
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="{}".format(err))
\ No newline at end of file
+        connection_manager.invalidate(db_name)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="{}".format(err))
+
+
+## Utils
+async def get_namespace_map(db_name: str) -> Dict[str, str]:
+    """
+        Return the prefix to IRI map of a database, from the cache if possible
+    """
+    namespaces = namespace_cache.get(db_name)
+    if namespaces is None:
+        triplestore = await backend_executor.run(connection_manager.get, db_name)
+        namespaces = await backend_executor.run(triplestore.backend.namespaces)
+        namespace_cache.set(db_name, namespaces)
+
+    return namespaces
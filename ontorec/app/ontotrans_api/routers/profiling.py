@@ -0,0 +1,76 @@
+"""
+    Router for the request profiles and the slow query log
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from app.metrics.profiling import app_settings, profile_path, profile_report, profiling_requested
+from app.metrics.slowQueries import slow_queries
+
+
+def profiling_access(x_profile: Optional[str] = Header(None)) -> None:
+    """
+        Restrict the profiling routes to the requests carrying PROFILING_TOKEN
+        in the X-Profile header, when one is set
+    """
+    if app_settings.PROFILING_TOKEN and not profiling_requested(x_profile):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling token required")
+
+
+router = APIRouter(
+    tags = ["Profiling"],
+    dependencies = [Depends(profiling_access)]
+)
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+### Model
+class SlowQuery(BaseModel):
+    time: datetime
+    database: str
+    route: str
+    query: str
+    reasoning: bool
+    seconds: float
+    rows: Optional[int] = None
+    timed_out: bool = False
+
+class SlowQueries(BaseModel):
+    threshold: float
+    queries: List[SlowQuery] = []
+
+#
+# GET /profiles/{profile_id}
+#
+
+### Route
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, status_code = status.HTTP_200_OK, responses={404: {}})
+async def get_profile(profile_id: str, sort: str = Query("cumulative", description="One of {}".format(", ".join(PROFILE_SORT_KEYS))), limit: int = Query(50, gt=0)):
+    """
+        Retrieve the report of a profiled request, the functions sorted by `sort`
+    """
+    if sort not in PROFILE_SORT_KEYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown sort key")
+
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile does not exist")
+
+    return PlainTextResponse(profile_report(path, sort, limit))
+
+#
+# GET /slow-queries
+#
+
+### Route
+@router.get("/slow-queries", response_model=SlowQueries, status_code = status.HTTP_200_OK)
+async def get_slow_queries(database: str = ""):
+    """
+        Retrieve the most recent slow queries, optionally of one database only
+    """
+    return SlowQueries(threshold = slow_queries.threshold, queries = slow_queries.entries(database))
@@ -0,0 +1,176 @@
+"""
+    Router for the prepared queries of a database
+    It is an extension of the databases route
+"""
+
+import time
+
+from app.logger.logger import log
+from typing import Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, Field
+
+from app.triplestore.databaseRegistry import existing_database
+from app.triplestore.executor import backend_executor, backend_slot
+from app.triplestore.preparedQueries import PreparedQuery, PreparedQueryError, PreparedQueryNotFound, prepared_queries
+from app.triplestore.queryGuard import ClientDisconnected, QueryLimits
+from app.ontotrans_api.routers.databases import CLIENT_CLOSED_REQUEST, QueryBody, limited_rows, query_exception, query_rows
+from app.ontotrans_api.routers.namespaces import get_namespace_map
+
+
+router = APIRouter(
+    tags = ["Queries"],
+    dependencies = [Depends(backend_slot), Depends(existing_database)]
+)
+
+### Model
+class PreparedQueryBody(BaseModel):
+    query: str
+    parameters: Dict[str, Literal["iri", "literal"]] = {}
+
+class PreparedQueryStatus(BaseModel):
+    name: str
+    query: str
+    parameters: Dict[str, str] = {}
+    digest: str
+    calls: int = 0
+    errors: int = 0
+    mean_seconds: float = 0.0
+
+class PreparedQueries(BaseModel):
+    queries: List[PreparedQueryStatus] = []
+
+#
+# GET /databases/{db_name}/queries
+#
+
+### Route
+@router.get("/databases/{db_name}/queries", response_model=PreparedQueries, status_code = status.HTTP_200_OK)
+async def get_prepared_queries(db_name: str):
+    """
+        Retrieve the prepared queries of a database, with their usage
+    """
+    return PreparedQueries(queries = [prepared_query_status(prepared) for prepared in prepared_queries.list(db_name)])
+
+#
+# GET /databases/{db_name}/queries/{query_name}
+#
+
+### Route
+@router.get("/databases/{db_name}/queries/{query_name}", response_model=PreparedQueryStatus, status_code = status.HTTP_200_OK)
+async def get_prepared_query(db_name: str, query_name: str):
+    """
+        Retrieve a prepared query of a database
+    """
+    try:
+        prepared = prepared_queries.get(db_name, query_name)
+
+    except PreparedQueryNotFound as err:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="{}".format(err))
+
+    return prepared_query_status(prepared)
+
+#
+# PUT /databases/{db_name}/queries/{query_name}
+#
+
+### Route
+@router.put("/databases/{db_name}/queries/{query_name}", response_model=PreparedQueryStatus, status_code = status.HTTP_201_CREATED)
+async def put_prepared_query(db_name: str, query_name: str, body: PreparedQueryBody):
+    """
+        Register or replace a prepared query on a database
+
+        The parameters are variables of the query, bound to an IRI or to a plain
+        literal on execution. The query is parsed once here, with the prefixes
+        of the database.
+    """
+    try:
+        namespaces = await get_namespace_map(db_name)
+        prepared = await backend_executor.run(PreparedQuery, query_name, body.query, dict(body.parameters), namespaces)
+        prepared_queries.register(db_name, prepared)
+
+    except PreparedQueryError as err:
+        log.error("Exception occurred in /databases/{}/queries/{}: {}".format(db_name, query_name, err))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="{}".format(err))
+
+    except Exception as err:
+        log.error("Exception occurred in /databases/{}/queries/{}: {}".format(db_name, query_name, err))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cannot connect to Stardog instance")
+
+    return prepared_query_status(prepared)
+
+#
+# DELETE /databases/{db_name}/queries/{query_name}
+#
+
+### Route
+@router.delete("/databases/{db_name}/queries/{query_name}", status_code = status.HTTP_200_OK)
+async def delete_prepared_query(db_name: str, query_name: str):
+    """
+        Remove a prepared query from a database
+    """
+    try:
+        prepared_queries.remove(db_name, query_name)
+
+    except PreparedQueryNotFound as err:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="{}".format(err))
+
+#
+# POST /databases/{db_name}/queries/{query_name}/execute
+#
+
+### Model
+class PreparedQueryExecution(BaseModel):
+    bindings: Dict[str, str] = {}
+    reasoning: Optional[bool] = False
+    timeout: Optional[float] = Field(None, gt=0)
+    max_rows: Optional[int] = Field(None, gt=0)
+    truncate: Optional[bool] = None
+
+### Route
+@router.post("/databases/{db_name}/queries/{query_name}/execute", status_code = status.HTTP_200_OK, responses={400: {}, 404: {}, 413: {}, 500: {}, 504: {}})
+async def execute_prepared_query(db_name: str, query_name: str, execution: PreparedQueryExecution, request: Request, response: Response):
+    """
+        Execute a prepared query with its parameters bound to `bindings`
+
+        Results, caching and limits are those of POST /databases/{db_name}/query.
+    """
+    try:
+        prepared = prepared_queries.get(db_name, query_name)
+        query = prepared.bind(execution.bindings)
+
+    except PreparedQueryNotFound as err:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="{}".format(err))
+
+    except PreparedQueryError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="{}".format(err))
+
+    queryModel = QueryBody(query=query, reasoning=execution.reasoning, timeout=execution.timeout, max_rows=execution.max_rows, truncate=execution.truncate)
+    limits = QueryLimits(execution.timeout, execution.max_rows, execution.truncate)
+    started = time.perf_counter()
+    try:
+        triples = await query_rows(db_name, queryModel, request, limits)
+
+    except ClientDisconnected:
+        log.info("Client disconnected, prepared query {} on database {} cancelled".format(query_name, db_name))
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    except Exception as err:
+        prepared.record(time.perf_counter() - started, failed=True)
+        raise query_exception(db_name, err)
+
+    prepared.record(time.perf_counter() - started)
+    return limited_rows(limits, triples, response)
+
+## Utils
+def prepared_query_status(prepared: PreparedQuery) -> PreparedQueryStatus:
+    return PreparedQueryStatus(
+        name = prepared.name,
+        query = prepared.query,
+        parameters = prepared.parameters,
+        digest = prepared.digest,
+        calls = prepared.calls,
+        errors = prepared.errors,
+        mean_seconds = prepared.mean_seconds,
+    )
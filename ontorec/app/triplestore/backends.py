@@ -0,0 +1,617 @@
+"""
+    Triplestore backends: database lifecycle, connections, errors and capabilities
+"""
+
+import threading
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import requests
+import stardog # type: ignore
+
+from pyparsing import ParseException
+from rdflib import BNode, Graph, Literal as RdflibLiteral, URIRef
+from rdflib.plugin import PluginException, get as get_plugin
+from rdflib.query import Result
+from rdflib.store import Store
+from rdflib.util import from_n3
+from SPARQLWrapper import JSON, POST, RDFXML, SPARQLWrapper # type: ignore
+from SPARQLWrapper.SPARQLExceptions import EndPointNotFound, SPARQLWrapperException # type: ignore
+from stardog.exceptions import StardogException # type: ignore
+from tripper import Literal, Triplestore
+
+from app.config.triplestoreConfig import TriplestoreConfig
+from app.config.ontokbCredentials import OntoKBCredentials
+
+triplestore_config = TriplestoreConfig()
+ontokbcredentials_config = OntoKBCredentials()
+
+EXPORT_CHUNK_SIZE = 256 * 1024
+# Stardog error code of a missing database
+DATABASE_NOT_FOUND_CODE = "0D0DU2"
+COPY_FROM_DATABASE = "INSERT { ?s ?p ?o } WHERE { SERVICE <db://%s> { ?s ?p ?o } }"
+DEFAULT_NAMESPACES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+}
+
+Triple = Tuple[Any, Any, Any]
+
+
+class DatabaseNotFound(Exception):
+    pass
+
+
+def triplestore_url() -> str:
+    return "http://{}:{}".format(triplestore_config.HOST, triplestore_config.PORT)
+
+
+def open_stardog_connection(db_name: str) -> stardog.Connection:
+    """
+        Open a native pystardog connection, for operations tripper does not expose
+    """
+    return stardog.Connection(db_name, endpoint=triplestore_url(), username=ontokbcredentials_config.USERNAME, password=ontokbcredentials_config.PASSWORD)
+
+
+def to_rdflib(term: Any) -> Any:
+    """
+        rdflib term of an N3 term, tripper literal or plain IRI; None is kept as a wildcard
+    """
+    if term is None:
+        return None
+    if isinstance(term, Literal):
+        return RdflibLiteral(str(term), lang=term.lang, datatype=term.datatype)
+    if term.startswith(("<", '"', "_:")):
+        return from_n3(term)
+    return URIRef(term)
+
+
+def from_rdflib(term: Any) -> Any:
+    """
+        Value of an rdflib term as returned by the tripper backends:
+        IRIs as `str`, blank nodes as `_:` strings and literals as tripper `Literal`
+    """
+    if isinstance(term, RdflibLiteral):
+        return Literal(str(term), lang=term.language, datatype=str(term.datatype) if term.datatype else None)
+    if isinstance(term, BNode):
+        return "_:" + str(term)
+    if term is None:
+        return None
+    return str(term)
+
+
+def from_sparql_json(entry: Optional[Dict[str, str]]) -> Any:
+    """
+        Value of a term of the SPARQL 1.1 JSON results format, as `from_rdflib`
+    """
+    if entry is None:
+        return None
+    if entry["type"] == "uri":
+        return entry["value"]
+    if entry["type"] == "bnode":
+        return "_:" + entry["value"]
+    return Literal(entry["value"], lang=entry.get("xml:lang"), datatype=entry.get("datatype"))
+
+
+def n3(term: Any) -> str:
+    if isinstance(term, Literal):
+        return term.n3()
+    return term if term.startswith(("<", '"', "_:")) else "<" + term + ">"
+
+
+def pattern_query(triple: Triple) -> str:
+    """
+        SELECT query of the terms of `triple` left unbound (None)
+    """
+    variables = ["?" + name for (name, term) in zip("spo", triple) if term is None]
+    terms = ["?" + name if term is None else n3(term) for (name, term) in zip("spo", triple)]
+    return "SELECT {} WHERE {{ {} {} {} . }}".format(" ".join(variables) or "*", *terms)
+
+
+def fill_pattern(triple: Triple, rows: List[Tuple]) -> Iterator[Triple]:
+    for row in rows:
+        values = iter(row)
+        yield tuple(next(values) if term is None else term for term in triple)
+
+
+class BackendTriplestore(Triplestore):
+    """
+        Triplestore wrapping a strategy instance of this module rather than a
+        tripper backend loaded by name
+    """
+
+    def __init__(self, name: str, strategy: Any):
+        self.base_iri = None
+        self.namespaces = {}
+        self.closed = False
+        self.backend_name = name
+        self.backend = strategy
+        self.function_repo = {}
+
+    def _check_method(self, name: str) -> None:
+        if not hasattr(self.backend, name):
+            raise NotImplementedError("Triplestore backend {} does not implement {}()".format(self.backend_name, name))
+
+    def bind(self, prefix: str, namespace: Any, **kwargs: Any) -> Any:
+        if namespace is None:
+            self.backend.bind(prefix, None)
+            self.namespaces.pop(prefix, None)
+            return None
+        return super().bind(prefix, namespace, **kwargs)
+
+
+class TriplestoreBackend:
+    """
+        Kind of triplestore the service runs on.
+
+        The capabilities tell which optimized code paths the backend supports;
+        the others fall back to generic tripper calls and SPARQL queries.
+    """
+
+    name = ""
+    # Errors raised by the backend for a bad request or a missing database
+    errors: Tuple[Type[Exception], ...] = (DatabaseNotFound,)
+
+    # Server-side transactions and parsing of uploaded files
+    transactions = False
+    # Export of a database streamed as received
+    native_export = False
+    # Query results streamed in standard formats as received
+    raw_results = False
+    # Copy of a database into another without going through the service
+    server_side_copy = False
+    # Listing and killing of running queries
+    query_management = False
+    # Queries answered with reasoning when asked for
+    reasoning = False
+
+    def capabilities(self) -> Dict[str, bool]:
+        return {name: getattr(self, name) for name in ("transactions", "native_export", "raw_results", "server_side_copy", "query_management", "reasoning")}
+
+    def list_databases(self) -> List[str]:
+        raise NotImplementedError("The {} backend cannot list its databases".format(self.name))
+
+    def create_database(self, db_name: str) -> Any:
+        raise NotImplementedError("The {} backend cannot create databases".format(self.name))
+
+    def remove_database(self, db_name: str) -> Any:
+        raise NotImplementedError("The {} backend cannot remove databases".format(self.name))
+
+    def open(self, db_name: str) -> Triplestore:
+        raise NotImplementedError
+
+    def is_missing_database(self, err: Exception) -> bool:
+        return isinstance(err, DatabaseNotFound)
+
+    def database_size(self, db_name: str, triplestore: Triplestore) -> int:
+        return int(str(triplestore.query("SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }")[0][0]))
+
+    def export(self, db_name: str, media_type: str) -> Iterator[bytes]:
+        raise NotImplementedError("The {} backend cannot export databases".format(self.name))
+
+    def raw_query(self, db_name: str, query: str, reasoning: bool, media_type: str, timeout: Optional[float] = None, max_rows: Optional[int] = None) -> Iterator[bytes]:
+        raise NotImplementedError("Raw query results are not supported by the {} backend".format(self.name))
+
+    def copy_database(self, source: str, destination: str) -> None:
+        raise NotImplementedError("The {} backend cannot copy databases".format(self.name))
+
+    def kill_queries(self, db_name: str, query: str) -> int:
+        return 0
+
+
+class StardogBackend(TriplestoreBackend):
+    """
+        Stardog server, through the PyBackTrip tripper backend and pystardog
+    """
+
+    name = "stardog"
+    errors = (StardogException, DatabaseNotFound)
+    transactions = True
+    native_export = True
+    raw_results = True
+    server_side_copy = True
+    query_management = True
+    reasoning = True
+
+    def _credentials(self) -> Dict[str, str]:
+        return {"triplestore_url": triplestore_url(), "uname": ontokbcredentials_config.USERNAME, "pwd": ontokbcredentials_config.PASSWORD}
+
+    def list_databases(self) -> List[str]:
+        return Triplestore.list_databases(self.name, **self._credentials())
+
+    def create_database(self, db_name: str) -> Any:
+        return Triplestore.create_database(self.name, db_name, **self._credentials())
+
+    def remove_database(self, db_name: str) -> Any:
+        return Triplestore.remove_database(self.name, db_name, **self._credentials())
+
+    def open(self, db_name: str) -> Triplestore:
+        return Triplestore(backend=self.name, base_iri="", database=db_name, **self._credentials())
+
+    def is_missing_database(self, err: Exception) -> bool:
+        return isinstance(err, DatabaseNotFound) or (isinstance(err, StardogException) and err.stardog_code == DATABASE_NOT_FOUND_CODE)
+
+    def database_size(self, db_name: str, triplestore: Triplestore) -> int:
+        with open_stardog_connection(db_name) as conn:
+            return int(conn.size())
+
+    def export(self, db_name: str, media_type: str) -> Iterator[bytes]:
+        with open_stardog_connection(db_name) as conn:
+            with conn.export(media_type, stream=True, chunk_size=EXPORT_CHUNK_SIZE) as chunks:
+                yield from chunks
+
+    def raw_query(self, db_name: str, query: str, reasoning: bool, media_type: str, timeout: Optional[float] = None, max_rows: Optional[int] = None) -> Iterator[bytes]:
+        """
+            Results passed through as received, without being decoded;
+            the timeout and the maximum number of rows are enforced by Stardog
+        """
+        with open_stardog_connection(db_name) as conn:
+            params = {"query": query, "reasoning": "true" if reasoning else "false", "timeout": int(timeout * 1000) if timeout else None, "limit": max_rows}
+            with conn.client.post("/query", data=params, headers={"Accept": media_type}, stream=True) as response:
+                yield from response.iter_content(EXPORT_CHUNK_SIZE)
+
+    def copy_database(self, source: str, destination: str) -> None:
+        """
+            Single update reading the source database through a `db://` service
+        """
+        with open_stardog_connection(destination) as conn:
+            conn.update(COPY_FROM_DATABASE % source)
+
+    def kill_queries(self, db_name: str, query: str) -> int:
+        killed = 0
+        with stardog.Admin(triplestore_url(), ontokbcredentials_config.USERNAME, ontokbcredentials_config.PASSWORD) as admin:
+            for running in admin.queries():
+                if running.get("db") == db_name and running.get("query", "").strip() == query.strip():
+                    admin.kill_query(running["id"])
+                    killed += 1
+        return killed
+
+
+class ReadWriteLock:
+    """
+        Lock shared by readers and held alone by a writer. Waiting writers go
+        before new readers, and the writer may take the lock again, for reading
+        or writing, while holding it.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._writes = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        if self._writer == threading.get_ident():
+            yield
+            return
+
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        thread = threading.get_ident()
+        with self._condition:
+            if self._writer != thread:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+                self._waiting_writers -= 1
+                self._writer = thread
+            self._writes += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writes -= 1
+                if not self._writes:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+class InMemoryStrategy:
+    """
+        tripper strategy of a database held in an rdflib graph of the process.
+        Reads share the lock of the database and writes hold it alone, and
+        matching triples are collected before being returned.
+    """
+
+    def __init__(self, graph: Graph, namespaces: Dict[str, str], lock: ReadWriteLock):
+        self.graph = graph
+        self._namespaces = namespaces
+        self._lock = lock
+
+    def triples(self, triple: Triple) -> Iterator[Triple]:
+        with self._lock.read():
+            matches = [tuple(map(from_rdflib, match)) for match in self.graph.triples(tuple(map(to_rdflib, triple)))]
+        return iter(matches)
+
+    def add_triples(self, triples: Sequence[Triple]) -> None:
+        with self._lock.write():
+            for triple in triples:
+                self.graph.add(tuple(map(to_rdflib, triple)))
+
+    def remove(self, triple: Triple) -> None:
+        with self._lock.write():
+            self.graph.remove(tuple(map(to_rdflib, triple)))
+
+    def close(self) -> None:
+        pass
+
+    def parse(self, source: Any = None, location: Optional[str] = None, data: Any = None, format: Optional[str] = None, **kwargs: Any) -> None:
+        with self._lock.write():
+            self.graph.parse(source=source, location=location, data=data, format=format, **kwargs)
+
+    def serialize(self, destination: Any = None, format: str = "turtle", **kwargs: Any) -> Optional[str]:
+        with self._lock.read():
+            result = self.graph.serialize(destination=destination, format=format, **kwargs)
+        if destination is None:
+            return result if isinstance(result, str) else result.decode()
+        return None
+
+    def query(self, query_object: str, reasoning: bool = False, **kwargs: Any) -> List[Tuple]:
+        with self._lock.read():
+            result = self.graph.query(query_object, **kwargs)
+            if result.type == "ASK":
+                return [(from_rdflib(RdflibLiteral(bool(result.askAnswer))),)]
+            return [tuple(map(from_rdflib, row)) for row in result]
+
+    def raw_query(self, query_object: str, **kwargs: Any) -> Result:
+        """
+            rdflib result of a query, for serialization in a standard results format
+        """
+        with self._lock.read():
+            result = self.graph.query(query_object, **kwargs)
+            # Solutions are evaluated lazily, so collect them while holding the lock
+            if result.type == "SELECT":
+                result.bindings = list(result.bindings)
+        return result
+
+    def update(self, update_object: str, **kwargs: Any) -> None:
+        with self._lock.write():
+            self.graph.update(update_object, **kwargs)
+
+    def bind(self, prefix: str, namespace: Optional[str]) -> None:
+        with self._lock.write():
+            if namespace:
+                self._namespaces[prefix] = str(namespace)
+                self.graph.bind(prefix, namespace, replace=True)
+            else:
+                self._namespaces.pop(prefix, None)
+
+    def namespaces(self) -> Dict[str, str]:
+        with self._lock.read():
+            return dict(self._namespaces)
+
+
+class InMemoryBackend(TriplestoreBackend):
+    """
+        Databases held in rdflib graphs of the service process, for small
+        deployments and tests; they are lost on restart.
+
+        `store` selects the rdflib store plugin, e.g. "Oxigraph" when the
+        oxrdflib package is installed.
+    """
+
+    errors = (DatabaseNotFound, ParseException)
+
+    def __init__(self, store: str = "default", name: str = "rdflib"):
+        try:
+            get_plugin(store, Store)
+        except PluginException:
+            raise ValueError("rdflib store {} is not installed".format(store))
+
+        self.name = name
+        self.store = store
+        self._graphs: Dict[str, Graph] = {}
+        self._namespaces: Dict[str, Dict[str, str]] = {}
+        self._locks: Dict[str, ReadWriteLock] = {}
+        self._lock = threading.Lock()
+
+    def list_databases(self) -> List[str]:
+        return list(self._graphs)
+
+    def create_database(self, db_name: str) -> None:
+        with self._lock:
+            if db_name in self._graphs:
+                raise ValueError("Database {} already exists".format(db_name))
+            self._graphs[db_name] = Graph(store=self.store)
+            self._namespaces[db_name] = dict(DEFAULT_NAMESPACES)
+            self._locks[db_name] = ReadWriteLock()
+
+    def remove_database(self, db_name: str) -> None:
+        with self._lock:
+            if self._graphs.pop(db_name, None) is None:
+                raise DatabaseNotFound("Database {} does not exist".format(db_name))
+            self._namespaces.pop(db_name)
+            self._locks.pop(db_name)
+
+    def open(self, db_name: str) -> Triplestore:
+        with self._lock:
+            if db_name not in self._graphs:
+                raise DatabaseNotFound("Database {} does not exist".format(db_name))
+            strategy = InMemoryStrategy(self._graphs[db_name], self._namespaces[db_name], self._locks[db_name])
+        return BackendTriplestore(self.name, strategy)
+
+
+class SparqlStrategy:
+    """
+        tripper strategy of a dataset of a SPARQL 1.1 endpoint.
+
+        Namespaces are not part of the SPARQL protocol and are kept by the
+        service for each dataset.
+    """
+
+    def __init__(self, query_endpoint: str, update_endpoint: str, data_endpoint: str, namespaces: Dict[str, str], timeout: Optional[float] = None):
+        self.query_endpoint = query_endpoint
+        self.update_endpoint = update_endpoint
+        self.data_endpoint = data_endpoint
+        self.timeout = timeout
+        self._namespaces = namespaces
+
+    def _wrapper(self, endpoint: str) -> SPARQLWrapper:
+        sparql = SPARQLWrapper(endpoint)
+        sparql.setCredentials(ontokbcredentials_config.USERNAME, ontokbcredentials_config.PASSWORD)
+        if self.timeout:
+            sparql.setTimeout(int(self.timeout))
+        return sparql
+
+    def triples(self, triple: Triple) -> Iterator[Triple]:
+        return fill_pattern(triple, self.query(pattern_query(triple)))
+
+    def add_triples(self, triples: Sequence[Triple]) -> None:
+        if triples:
+            self.update("INSERT DATA {{ {} }}".format(" ".join("{} {} {} .".format(*map(n3, triple)) for triple in triples)))
+
+    def remove(self, triple: Triple) -> None:
+        self.update("DELETE WHERE {{ {} {} {} . }}".format(*["?" + name if term is None else n3(term) for (name, term) in zip("spo", triple)]))
+
+    def close(self) -> None:
+        pass
+
+    def parse(self, source: Any = None, location: Optional[str] = None, data: Any = None, format: Optional[str] = None, **kwargs: Any) -> None:
+        """
+            Parse the data in the service and send it as N-Triples, through
+            the graph store protocol when the endpoint is configured
+        """
+        graph = Graph()
+        graph.parse(source=source, location=location, data=data, format=format, **kwargs)
+        content = graph.serialize(format="nt", encoding="utf-8")
+        if self.data_endpoint:
+            response = requests.post(self.data_endpoint, params={"default": ""}, data=content, headers={"Content-Type": "application/n-triples"}, auth=(ontokbcredentials_config.USERNAME, ontokbcredentials_config.PASSWORD), timeout=self.timeout)
+            response.raise_for_status()
+        elif len(graph):
+            self.update("INSERT DATA {{ {} }}".format(content.decode()))
+
+    def serialize(self, destination: Any = None, format: str = "turtle", **kwargs: Any) -> Optional[str]:
+        graph = Graph()
+        for (prefix, namespace) in self._namespaces.items():
+            graph.bind(prefix, namespace)
+        for triple in self.triples((None, None, None)):
+            graph.add(tuple(map(to_rdflib, triple)))
+        result = graph.serialize(destination=destination, format=format, **kwargs)
+        if destination is None:
+            return result if isinstance(result, str) else result.decode()
+        return None
+
+    def query(self, query_object: str, reasoning: bool = False, **kwargs: Any) -> List[Tuple]:
+        sparql = self._wrapper(self.query_endpoint)
+        sparql.setQuery(query_object)
+        if sparql.queryType in ("CONSTRUCT", "DESCRIBE"):
+            sparql.setReturnFormat(RDFXML)
+            return [tuple(map(from_rdflib, triple)) for triple in sparql.queryAndConvert()]
+
+        sparql.setReturnFormat(JSON)
+        results = sparql.queryAndConvert()
+        if "boolean" in results:
+            return [(from_rdflib(RdflibLiteral(bool(results["boolean"]))),)]
+        variables = results["head"]["vars"]
+        return [tuple(from_sparql_json(binding.get(variable)) for variable in variables) for binding in results["results"]["bindings"]]
+
+    def update(self, update_object: str, **kwargs: Any) -> None:
+        sparql = self._wrapper(self.update_endpoint)
+        sparql.setMethod(POST)
+        sparql.setQuery(update_object)
+        sparql.query()
+
+    def bind(self, prefix: str, namespace: Optional[str]) -> None:
+        if namespace:
+            self._namespaces[prefix] = str(namespace)
+        else:
+            self._namespaces.pop(prefix, None)
+
+    def namespaces(self) -> Dict[str, str]:
+        return dict(self._namespaces)
+
+
+class SparqlBackend(TriplestoreBackend):
+    """
+        Datasets of a SPARQL 1.1 endpoint such as Apache Jena Fuseki.
+
+        The endpoints of a dataset are given by the SPARQL_*_PATH settings, and
+        datasets are listed, created and removed through the Fuseki
+        administration protocol under SPARQL_ADMIN_PATH, if set.
+    """
+
+    name = "sparql"
+    errors = (SPARQLWrapperException, requests.HTTPError, DatabaseNotFound)
+    raw_results = True
+
+    def __init__(self):
+        self._namespaces: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _url(self, path: str, db_name: str = "") -> str:
+        return triplestore_url() + path.format(database=db_name) if path else ""
+
+    def _admin(self, method: str, path: str = "", **kwargs: Any) -> requests.Response:
+        if not triplestore_config.SPARQL_ADMIN_PATH:
+            raise NotImplementedError("No administration endpoint configured for the sparql backend")
+        response = requests.request(method, self._url(triplestore_config.SPARQL_ADMIN_PATH) + path, auth=(ontokbcredentials_config.USERNAME, ontokbcredentials_config.PASSWORD), **kwargs)
+        if response.status_code == 404:
+            raise DatabaseNotFound("Database {} does not exist".format(path.lstrip("/")))
+        response.raise_for_status()
+        return response
+
+    def list_databases(self) -> List[str]:
+        return [dataset["ds.name"].lstrip("/") for dataset in self._admin("GET").json().get("datasets", [])]
+
+    def create_database(self, db_name: str) -> None:
+        self._admin("POST", data={"dbName": db_name, "dbType": triplestore_config.SPARQL_DATASET_TYPE})
+
+    def remove_database(self, db_name: str) -> None:
+        self._admin("DELETE", "/" + db_name)
+        with self._lock:
+            self._namespaces.pop(db_name, None)
+
+    def open(self, db_name: str) -> Triplestore:
+        with self._lock:
+            namespaces = self._namespaces.setdefault(db_name, dict(DEFAULT_NAMESPACES))
+        strategy = SparqlStrategy(
+            self._url(triplestore_config.SPARQL_QUERY_PATH, db_name),
+            self._url(triplestore_config.SPARQL_UPDATE_PATH, db_name),
+            self._url(triplestore_config.SPARQL_DATA_PATH, db_name),
+            namespaces,
+        )
+        return BackendTriplestore(self.name, strategy)
+
+    def is_missing_database(self, err: Exception) -> bool:
+        return isinstance(err, (DatabaseNotFound, EndPointNotFound)) or (isinstance(err, requests.HTTPError) and err.response is not None and err.response.status_code == 404)
+
+    def raw_query(self, db_name: str, query: str, reasoning: bool, media_type: str, timeout: Optional[float] = None, max_rows: Optional[int] = None) -> Iterator[bytes]:
+        """
+            Results passed through as received; the maximum number of rows is
+            applied to the query by the caller
+        """
+        with requests.post(self._url(triplestore_config.SPARQL_QUERY_PATH, db_name), data={"query": query}, headers={"Accept": media_type}, auth=(ontokbcredentials_config.USERNAME, ontokbcredentials_config.PASSWORD), timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            yield from response.iter_content(EXPORT_CHUNK_SIZE)
+
+
+def get_backend(name: str) -> TriplestoreBackend:
+    if name == "stardog":
+        return StardogBackend()
+    if name == "rdflib":
+        return InMemoryBackend()
+    if name == "oxigraph":
+        return InMemoryBackend(store="Oxigraph", name="oxigraph")
+    if name == "sparql":
+        return SparqlBackend()
+    raise ValueError("Unknown triplestore backend {}".format(name))
+
+
+triplestore_backend = get_backend(triplestore_config.BACKEND)
@@ -0,0 +1,183 @@
+"""
+    Log of the changes made to each database through the service
+"""
+
+import threading
+import time
+import uuid
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.config.ontoRECSettings import OntoRECSetting
+
+app_settings = OntoRECSetting()
+
+ADD = "add"
+REMOVE = "remove"
+BIND = "bind"
+UNBIND = "unbind"
+RESET = "reset"
+
+TriplePattern = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class ChangeLogGap(Exception):
+    """
+        The changes since a revision cannot be replayed as triples; the
+        database must be downloaded again from the current revision
+    """
+    pass
+
+
+class Change:
+    """
+        One revision of a database.
+
+        `add` and `remove` carry N3 triples, where a None term of a removed
+        triple is a wildcard; `bind` and `unbind` carry a namespace; `reset`
+        marks changes that were not recorded as triples, e.g. file imports.
+    """
+
+    def __init__(self, revision: int, op: str, triples: Optional[Sequence[TriplePattern]] = None, prefix: Optional[str] = None, iri: Optional[str] = None, detail: Optional[str] = None):
+        self.revision = revision
+        self.op = op
+        self.triples = list(triples) if triples is not None else None
+        self.prefix = prefix
+        self.iri = iri
+        self.detail = detail
+        self.time = time.time()
+
+    @property
+    def size(self) -> int:
+        return len(self.triples) if self.triples else 1
+
+    def as_dict(self) -> dict:
+        change = {"revision": self.revision, "op": self.op, "time": self.time}
+        if self.triples is not None:
+            change["triples"] = self.triples
+        if self.op in (BIND, UNBIND):
+            change["prefix"] = self.prefix
+            change["iri"] = self.iri
+        if self.detail is not None:
+            change["detail"] = self.detail
+        return change
+
+
+class _DatabaseChanges:
+
+    def __init__(self):
+        self.revision = 0
+        self.first_revision = 1
+        self.size = 0
+        self.changes: Deque[Change] = deque()
+
+
+class ChangeRecorder:
+    """
+        Triples written by a route, recorded as one change once the write ends.
+        Past `max_triples` the triples are dropped and a reset is recorded instead.
+    """
+
+    def __init__(self, change_log: "ChangeLog", db_name: str, op: str):
+        self.change_log = change_log
+        self.db_name = db_name
+        self.op = op
+        self.triples: Optional[List[TriplePattern]] = []
+        self.count = 0
+
+    def extend(self, triples: Sequence[TriplePattern]) -> None:
+        self.count += len(triples)
+        if self.triples is not None:
+            if self.count > self.change_log.max_triples:
+                self.triples = None
+            else:
+                self.triples.extend(triples)
+
+    def commit(self, committed: int) -> Optional[Change]:
+        """
+            Record the first `committed` triples written, which are persisted
+        """
+        if committed <= 0:
+            return None
+        if self.triples is None:
+            return self.change_log.append(self.db_name, RESET, detail="{} of {} triples".format(self.op, committed))
+        return self.change_log.append(self.db_name, self.op, triples=self.triples[:committed])
+
+
+class ChangeLog:
+    """
+        Revisions of each database, numbered from 1, with at most `max_triples`
+        triples retained per database; older changes are dropped first.
+
+        The log lives in the process: `epoch` changes on every restart.
+        Revisions keep increasing across deletions of a database, so that a
+        revision always identifies one state of the database during an epoch.
+    """
+
+    def __init__(self, max_triples: int):
+        self.max_triples = max_triples
+        self.epoch = uuid.uuid4().hex
+        self._databases: Dict[str, _DatabaseChanges] = {}
+        self._lock = threading.Lock()
+
+    def revision(self, db_name: str) -> int:
+        database = self._databases.get(db_name)
+        return database.revision if database is not None else 0
+
+    def append(self, db_name: str, op: str, triples: Optional[Sequence[TriplePattern]] = None, prefix: Optional[str] = None, iri: Optional[str] = None, detail: Optional[str] = None) -> Change:
+        with self._lock:
+            database = self._databases.setdefault(db_name, _DatabaseChanges())
+            database.revision += 1
+            if triples is not None and len(triples) > self.max_triples:
+                change = Change(database.revision, RESET, detail="{} of {} triples".format(op, len(triples)))
+            else:
+                change = Change(database.revision, op, triples, prefix, iri, detail)
+
+            database.changes.append(change)
+            database.size += change.size
+            while database.size > self.max_triples and len(database.changes) > 1:
+                dropped = database.changes.popleft()
+                database.size -= dropped.size
+                database.first_revision = dropped.revision + 1
+
+            return change
+
+    def recorder(self, db_name: str, op: str) -> ChangeRecorder:
+        return ChangeRecorder(self, db_name, op)
+
+    def since(self, db_name: str, revision: int) -> List[Change]:
+        """
+            Return the changes after `revision`, or raise ChangeLogGap if they
+            are no longer retained or cannot be expressed as triples
+        """
+        with self._lock:
+            database = self._databases.get(db_name, _DatabaseChanges())
+            if revision > database.revision:
+                raise ChangeLogGap("Revision {} is ahead of the log, at revision {}".format(revision, database.revision))
+            if revision < database.first_revision - 1:
+                raise ChangeLogGap("Changes before revision {} are no longer retained".format(database.first_revision))
+
+            changes = [change for change in database.changes if change.revision > revision]
+
+        for change in changes:
+            if change.op == RESET:
+                raise ChangeLogGap("Revision {} was not recorded as triples ({})".format(change.revision, change.detail))
+
+        return changes
+
+    def drop_database(self, db_name: str) -> None:
+        """
+            Forget the changes of a deleted database, leaving a reset in their place
+        """
+        with self._lock:
+            database = self._databases.get(db_name)
+            if database is not None:
+                database.changes.clear()
+                database.size = 0
+                database.first_revision = database.revision + 1
+
+        self.append(db_name, RESET, detail="database deleted")
+
+
+change_log = ChangeLog(app_settings.CHANGE_LOG_MAX_TRIPLES)
@@ -0,0 +1,151 @@
+"""
+    Process-wide cache of triplestore connections, one per database
+"""
+
+import threading
+import time
+import weakref
+
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from tripper import Triplestore
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.backends import triplestore_backend
+
+app_settings = OntoRECSetting()
+
+HEALTH_CHECK_QUERY = "SELECT * WHERE { } LIMIT 1"
+
+
+def open_triplestore(db_name: str) -> Triplestore:
+    """
+        Open a new connection to a database of the configured backend
+    """
+    return triplestore_backend.open(db_name)
+
+
+def close_backend(backend: Any) -> None:
+    try:
+        if hasattr(backend, "close"):
+            backend.close()
+    except Exception as err:
+        log.warning("Error while closing triplestore connection: {}".format(err))
+
+
+class _PooledConnection:
+    """
+        Pooled connection, whose backend is closed once the triplestore is no
+        longer referenced by the pool nor by any request or stream using it
+    """
+
+    def __init__(self, triplestore: Triplestore):
+        now = time.monotonic()
+        self.triplestore = triplestore
+        self.last_used = now
+        self.last_checked = now
+        self.close = weakref.finalize(triplestore, close_backend, getattr(triplestore, "backend", None))
+
+
+class ConnectionManager:
+    """
+        LRU cache of open triplestore connections keyed by database name.
+
+        Connections unused for more than `idle_timeout` seconds are dropped,
+        and connections older than `health_check_interval` seconds since their
+        last check are probed with a trivial query before being handed out.
+        Connections dropped from the pool, by eviction or invalidation, are
+        only closed once the requests and streams still using them release
+        them; `clear()` closes them at once.
+    """
+
+    def __init__(self, max_size: int, idle_timeout: float, health_check_interval: float, factory: Callable[[str], Triplestore] = open_triplestore):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._factory = factory
+        self._connections: "OrderedDict[str, _PooledConnection]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db_name: str) -> Triplestore:
+        """
+            Return a connection to `db_name`, opening a new one if needed
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            pooled = self._connections.get(db_name)
+            if pooled is not None:
+                self._connections.move_to_end(db_name)
+
+        if pooled is not None and now - pooled.last_checked >= self.health_check_interval:
+            if self._is_healthy(pooled.triplestore):
+                pooled.last_checked = now
+            else:
+                log.warning("Connection to database {} failed health check, reopening".format(db_name))
+                self.invalidate(db_name)
+                pooled = None
+
+        if pooled is None:
+            pooled = _PooledConnection(self._factory(db_name))
+            with self._lock:
+                existing = self._connections.get(db_name)
+                if existing is not None:
+                    pooled.close()
+                    pooled = existing
+                else:
+                    self._connections[db_name] = pooled
+                    self._evict_overflow()
+
+        pooled.last_used = now
+        return pooled.triplestore
+
+    def invalidate(self, db_name: str) -> None:
+        """
+            Forget the connection to `db_name`, if any, which is closed once released
+        """
+        with self._lock:
+            self._connections.pop(db_name, None)
+
+    def clear(self) -> None:
+        """
+            Close every pooled connection
+        """
+        with self._lock:
+            pooled_connections = list(self._connections.values())
+            self._connections.clear()
+        for pooled in pooled_connections:
+            pooled.close()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def __contains__(self, db_name: str) -> bool:
+        return db_name in self._connections
+
+    def _evict_idle(self, now: float) -> None:
+        expired = [db_name for (db_name, pooled) in self._connections.items() if now - pooled.last_used >= self.idle_timeout]
+        for db_name in expired:
+            del self._connections[db_name]
+
+    def _evict_overflow(self) -> None:
+        while len(self._connections) > self.max_size:
+            self._connections.popitem(last=False)
+
+    @staticmethod
+    def _is_healthy(triplestore: Triplestore) -> bool:
+        try:
+            triplestore.query(HEALTH_CHECK_QUERY)
+        except Exception as err:
+            log.warning("Triplestore health check failed: {}".format(err))
+            return False
+        return True
+
+
+connection_manager = ConnectionManager(
+    max_size=app_settings.CONNECTION_POOL_SIZE,
+    idle_timeout=app_settings.CONNECTION_IDLE_TIMEOUT,
+    health_check_interval=app_settings.CONNECTION_HEALTH_CHECK_INTERVAL,
+)
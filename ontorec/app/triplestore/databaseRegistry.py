@@ -0,0 +1,128 @@
+"""
+    Cached listing of the databases of the triplestore
+"""
+
+import threading
+import time
+
+from typing import Callable, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.backends import triplestore_backend
+from app.triplestore.connectionManager import connection_manager
+from app.triplestore.executor import backend_executor
+
+app_settings = OntoRECSetting()
+
+
+def list_databases() -> List[str]:
+    return triplestore_backend.list_databases()
+
+def create_database(db_name: str):
+    result = triplestore_backend.create_database(db_name)
+    database_registry.add(db_name)
+    return result
+
+def remove_database(db_name: str):
+    connection_manager.invalidate(db_name)
+    result = triplestore_backend.remove_database(db_name)
+    database_registry.discard(db_name)
+    return result
+
+
+class DatabaseRegistry:
+    """
+        Set of the existing databases, listed again every `ttl` seconds.
+
+        Databases created or removed through the service are recorded at once.
+        A name missing from the set triggers a new listing at most every
+        `miss_interval` seconds, to notice databases created elsewhere
+        without listing the databases on every unknown name.
+    """
+
+    def __init__(self, ttl: float, miss_interval: float, lister: Callable[[], List[str]] = list_databases):
+        self.ttl = ttl
+        self.miss_interval = miss_interval
+        self._lister = lister
+        self._databases: List[str] = []
+        self._names = set()
+        self._refreshed: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def needs_refresh(self, db_name: Optional[str] = None) -> bool:
+        """
+            Tell if the listing is stale, or may be for a lookup of `db_name`
+        """
+        if self._refreshed is None:
+            return True
+
+        age = time.monotonic() - self._refreshed
+        return age >= self.ttl or (db_name is not None and db_name not in self._names and age >= self.miss_interval)
+
+    def refresh(self) -> List[str]:
+        """
+            List the databases from the triplestore
+        """
+        databases = list(self._lister())
+        with self._lock:
+            self._databases = databases
+            self._names = set(databases)
+            self._refreshed = time.monotonic()
+
+        return list(databases)
+
+    def names(self) -> List[str]:
+        if self.needs_refresh():
+            return self.refresh()
+        return list(self._databases)
+
+    def exists(self, db_name: str) -> bool:
+        if self.needs_refresh(db_name):
+            self.refresh()
+        return db_name in self._names
+
+    def add(self, db_name: str) -> None:
+        with self._lock:
+            if db_name not in self._names:
+                self._names.add(db_name)
+                self._databases.append(db_name)
+
+    def discard(self, db_name: str) -> None:
+        with self._lock:
+            if db_name in self._names:
+                self._names.discard(db_name)
+                self._databases.remove(db_name)
+
+    def invalidate(self) -> None:
+        self._refreshed = None
+
+    def __contains__(self, db_name: str) -> bool:
+        return db_name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+database_registry = DatabaseRegistry(
+    ttl=app_settings.DATABASE_REGISTRY_TTL,
+    miss_interval=app_settings.DATABASE_REGISTRY_MISS_INTERVAL,
+)
+
+
+async def existing_database(db_name: str):
+    """
+        FastAPI dependency failing with 404 when the database `db_name` does not exist.
+        If the databases cannot be listed, the check is left to the route.
+    """
+    if database_registry.needs_refresh(db_name):
+        try:
+            await backend_executor.run(database_registry.refresh)
+        except Exception as err:
+            log.warning("Cannot list databases: {}".format(err))
+            return
+
+    if db_name not in database_registry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Database does not exist")
@@ -0,0 +1,97 @@
+"""
+    Pre-parsed snapshot of the bundled EMMO ontology
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+from rdflib import Graph
+from tripper import Triplestore
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.loader import load_file
+
+app_settings = OntoRECSetting()
+
+EMMO_PATH = Path(__file__).parent.parent.parent.resolve() / "ontologies" / "full_ontology_inferred_remapped.rdf"
+
+
+def default_snapshot_dir() -> Path:
+    return Path(app_settings.SNAPSHOT_DIR) if app_settings.SNAPSHOT_DIR else Path(tempfile.gettempdir()) / "ontorec"
+
+
+class OntologySnapshot:
+    """
+        N-Triples snapshot of an RDF/XML ontology file.
+
+        The snapshot is named after the SHA-256 of the source, so it is rebuilt
+        automatically whenever the source changes. The source is only re-hashed
+        when its size or modification time changes.
+    """
+
+    def __init__(self, source: Path, snapshot_dir: Path):
+        self.source = source
+        self.snapshot_dir = snapshot_dir
+        self._stat: Optional[Tuple[int, int]] = None
+        self._digest = ""
+        self._lock = threading.Lock()
+
+    @property
+    def digest(self) -> str:
+        """
+            SHA-256 of the current source file
+        """
+        stat = self.source.stat()
+        if self._stat != (stat.st_mtime_ns, stat.st_size):
+            self._digest = hashlib.sha256(self.source.read_bytes()).hexdigest()
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+
+        return self._digest
+
+    def path(self) -> Path:
+        """
+            Return the snapshot of the current source, building it if needed
+        """
+        with self._lock:
+            digest = self.digest
+            snapshot = self.snapshot_dir / "{}.{}.nt".format(self.source.stem, digest[:16])
+            if not snapshot.exists():
+                self._build(snapshot)
+
+        return snapshot
+
+    def _build(self, snapshot: Path) -> None:
+        log.info("Building snapshot {} of {}".format(snapshot, self.source))
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        graph = Graph()
+        graph.parse(str(self.source), format="xml")
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.snapshot_dir), suffix=".nt.tmp")
+        os.close(fd)
+        try:
+            graph.serialize(destination=tmp_path, format="nt", encoding="utf-8")
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, str(snapshot))
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        for stale in self.snapshot_dir.glob("{}.*.nt".format(self.source.stem)):
+            if stale != snapshot:
+                stale.unlink()
+
+
+emmo_snapshot = OntologySnapshot(EMMO_PATH, default_snapshot_dir())
+
+
+def load_emmo(db_name: str, triplestore: Triplestore) -> None:
+    """
+        Load the bundled EMMO ontology into a database from its snapshot
+    """
+    load_file(db_name, triplestore, emmo_snapshot.path(), "nt")
@@ -0,0 +1,73 @@
+"""
+    Entity tags of the read endpoints, for conditional requests
+"""
+
+import hashlib
+import time
+
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.changeLog import change_log
+
+app_settings = OntoRECSetting()
+
+# Request headers selecting the representation, and thus part of its tag
+VARIANT_HEADERS = ("accept", "accept-encoding")
+
+
+def content_etag(*parts: Any) -> str:
+    """
+        Strong entity tag derived from `parts`, e.g. the revision of the data
+        and everything selecting its representation
+    """
+    return '"{}"'.format(hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()[:32])
+
+
+def request_variant(request: Request) -> str:
+    return "\0".join([request.url.path, str(request.url.query)] + [request.headers.get(header, "") for header in VARIANT_HEADERS])
+
+
+def etag_period() -> int:
+    """
+        Current period of ETAG_MAX_AGE seconds, after which every tag changes so
+        that writes made outside the service are eventually noticed
+    """
+    return int(time.time() // app_settings.ETAG_MAX_AGE) if app_settings.ETAG_MAX_AGE > 0 else 0
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+        Tell if `etag` matches the If-None-Match header of the request
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def check_etag(request: Request, response: Response, etag: str) -> str:
+    """
+        Answer 304 Not Modified if the client already holds `etag`,
+        otherwise send `etag` with the response
+    """
+    if is_not_modified(request, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return etag
+
+
+async def database_etag(db_name: str, request: Request, response: Response) -> str:
+    """
+        FastAPI dependency answering 304 when the client holds the current
+        representation of a database resource, tagged by the revision of the
+        database in the change log.
+        Routes returning a Response themselves must add the returned tag to it.
+    """
+    etag = content_etag(change_log.epoch, db_name, change_log.revision(db_name), etag_period(), request_variant(request))
+    return check_etag(request, response, etag)
@@ -0,0 +1,147 @@
+"""
+    Worker pool running blocking triplestore calls off the event loop
+"""
+
+import asyncio
+import functools
+
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, TypeVar
+
+from fastapi import HTTPException, Request, status
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.metrics.profiling import current_profile
+
+app_settings = OntoRECSetting()
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(Exception):
+    pass
+
+
+def parse_route_limits(route_limits: str) -> Dict[str, int]:
+    """
+        Parse a "route_name=limit|route_name=limit" specification
+    """
+    limits = {}
+    for item in route_limits.split("|"):
+        if item.strip():
+            route_name, limit = item.split("=")
+            limits[route_name.strip()] = int(limit)
+
+    return limits
+
+
+class BackendExecutor:
+    """
+        Bounded thread pool for triplestore I/O.
+
+        Admission is controlled per request: at most `max_workers + max_queue`
+        requests may be in flight at once, and each route is further limited
+        to its own number of concurrent requests.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, route_concurrency: int, route_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.route_concurrency = route_concurrency
+        self.route_limits = dict(route_limits or {})
+        self.in_flight = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="triplestore")
+        self._route_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+            Run `func(*args, **kwargs)` in the worker pool and await its result
+        """
+        loop = asyncio.get_running_loop()
+        profile = current_profile.get()
+        if profile is not None:
+            return await loop.run_in_executor(self._pool, functools.partial(profile.run, func, *args, **kwargs))
+        return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    async def run_shielded(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+            Like `run`, but if cancelled wait for `func` to return before raising
+            CancelledError, so that a connection it uses can then be rolled back
+            and closed by the caller
+        """
+        call = asyncio.ensure_future(self.run(func, *args, **kwargs))
+        try:
+            return await asyncio.shield(call)
+        except asyncio.CancelledError:
+            await asyncio.wait([call])
+            raise
+
+    def spawn(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+            Run `func(*args, **kwargs)` in the worker pool without waiting for it,
+            e.g. for cleanups that must not be cancelled with the request
+        """
+        self._pool.submit(functools.partial(func, *args, **kwargs))
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """
+            Consume a blocking iterator item by item in the worker pool
+        """
+        done = object()
+        try:
+            while True:
+                item = await self.run(next, iterator, done)
+                if item is done:
+                    break
+                yield item # type: ignore
+        finally:
+            if hasattr(iterator, "close"):
+                await self.run(iterator.close) # type: ignore
+
+    @asynccontextmanager
+    async def admit(self, route_name: str):
+        """
+            Reserve a backend slot for a request to `route_name`
+        """
+        if self.in_flight >= self.max_workers + self.max_queue:
+            raise ExecutorSaturated("{} requests in flight".format(self.in_flight))
+
+        self.in_flight += 1
+        try:
+            async with self._route_semaphore(route_name):
+                yield
+        finally:
+            self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def _route_semaphore(self, route_name: str) -> asyncio.Semaphore:
+        semaphore = self._route_semaphores.get(route_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.route_limits.get(route_name, self.route_concurrency))
+            self._route_semaphores[route_name] = semaphore
+
+        return semaphore
+
+
+backend_executor = BackendExecutor(
+    max_workers=app_settings.EXECUTOR_MAX_WORKERS,
+    max_queue=app_settings.EXECUTOR_MAX_QUEUE,
+    route_concurrency=app_settings.EXECUTOR_ROUTE_CONCURRENCY,
+    route_limits=parse_route_limits(app_settings.EXECUTOR_ROUTE_LIMITS),
+)
+
+
+async def backend_slot(request: Request):
+    """
+        FastAPI dependency reserving a backend slot for the current request
+    """
+    try:
+        async with backend_executor.admit(request.scope["endpoint"].__name__):
+            yield
+    except ExecutorSaturated as err:
+        log.warning("Backend executor saturated, rejecting {} {}: {}".format(request.method, request.url.path, err))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service overloaded, retry later")
@@ -0,0 +1,202 @@
+"""
+    Background jobs for long-running imports
+"""
+
+import asyncio
+import time
+import uuid
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiojobs # type: ignore
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+
+app_settings = OntoRECSetting()
+
+JOB_CLOSE_TIMEOUT = 10.0
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class ImportJob:
+    """
+        Status and progress of a background job
+    """
+
+    def __init__(self, kind: str, db_name: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.db_name = db_name
+        self.state = PENDING
+        self.triples = 0
+        self.bytes = 0
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._job: Optional[aiojobs.Job] = None
+
+    def progress(self, triples: int) -> None:
+        self.triples += triples
+
+    @property
+    def done(self) -> bool:
+        return self.state in (COMPLETED, FAILED, CANCELLED)
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def triples_per_second(self) -> float:
+        seconds = self.seconds
+        return self.triples / seconds if seconds else 0.0
+
+
+class JobManager:
+    """
+        Run background jobs on an aiojobs scheduler.
+
+        At most `max_running` jobs run at once, and at most `database_concurrency`
+        of them on the same database; the others wait in a queue bounded by
+        `max_pending`. Finished jobs are kept `retention` seconds for polling.
+    """
+
+    def __init__(self, max_running: int, max_pending: int, database_concurrency: int, retention: float):
+        self.max_running = max_running
+        self.max_pending = max_pending
+        self.database_concurrency = database_concurrency
+        self.retention = retention
+        self._scheduler: Optional[aiojobs.Scheduler] = None
+        self._running: Optional[asyncio.Semaphore] = None
+        self._databases: Dict[str, asyncio.Semaphore] = {}
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+
+    async def submit(self, kind: str, db_name: str, work: Callable[[ImportJob], Awaitable[Any]], cleanup: Optional[Callable[[], None]] = None) -> ImportJob:
+        """
+            Queue `work(job)` as a new job on `db_name` and return the job at once.
+            `cleanup` is called when the job ends, even if it never started.
+        """
+        self.check_capacity()
+
+        if self._scheduler is None:
+            self._scheduler = aiojobs.Scheduler(limit=None, close_timeout=JOB_CLOSE_TIMEOUT)
+            self._running = asyncio.Semaphore(self.max_running)
+
+        job = ImportJob(kind, db_name)
+        self._jobs[job.id] = job
+        job._job = await self._scheduler.spawn(self._run(job, work, cleanup))
+        return job
+
+    def check_capacity(self) -> None:
+        """
+            Raise JobQueueFull if a new job would not fit in the queue, e.g. before
+            making changes that only the job would complete
+        """
+        self._prune()
+        if self.pending_count >= self.max_pending:
+            raise JobQueueFull("{} jobs pending".format(self.pending_count))
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[ImportJob]:
+        self._prune()
+        return list(self._jobs.values())
+
+    @property
+    def pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.state == PENDING)
+
+    async def cancel(self, job_id: str) -> Optional[ImportJob]:
+        """
+            Cancel a pending or running job. The job waits for its current call
+            to the triplestore to return, then rolls back the work in progress.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done or job._job is None:
+            return job
+
+        try:
+            await job._job.close(timeout=JOB_CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning("Job {} did not stop within {} seconds".format(job_id, JOB_CLOSE_TIMEOUT))
+
+        return job
+
+    async def close(self) -> None:
+        """
+            Cancel all the jobs and stop the scheduler
+        """
+        if self._scheduler is not None:
+            await self._scheduler.close()
+            self._scheduler = None
+
+    async def _run(self, job: ImportJob, work: Callable[[ImportJob], Awaitable[Any]], cleanup: Optional[Callable[[], None]]) -> None:
+        try:
+            async with self._database_slot(job.db_name):
+                async with self._running: # type: ignore
+                    job.state = RUNNING
+                    job.started = time.time()
+                    log.info("Job {} ({}) started on database {}".format(job.id, job.kind, job.db_name))
+                    await work(job)
+            job.state = COMPLETED
+
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            raise
+
+        except Exception as err:
+            log.error("Exception occurred in job {} on database {}: {}".format(job.id, job.db_name, err))
+            job.state = FAILED
+            job.error = str(err) or type(err).__name__
+
+        finally:
+            job.finished = time.time()
+            if cleanup is not None:
+                cleanup()
+            log.info("Job {} ({}) {} on database {}".format(job.id, job.kind, job.state, job.db_name))
+
+    @asynccontextmanager
+    async def _database_slot(self, db_name: str):
+        semaphore = self._databases.get(db_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.database_concurrency)
+            self._databases[db_name] = semaphore
+
+        async with semaphore:
+            yield
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [job_id for (job_id, job) in self._jobs.items() if job.done and now - job.finished >= self.retention] # type: ignore
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        active_databases = {job.db_name for job in self._jobs.values() if not job.done}
+        for db_name in list(self._databases):
+            if db_name not in active_databases:
+                del self._databases[db_name]
+
+
+job_manager = JobManager(
+    max_running=app_settings.JOB_MAX_RUNNING,
+    max_pending=app_settings.JOB_MAX_PENDING,
+    database_concurrency=app_settings.JOB_DATABASE_CONCURRENCY,
+    retention=app_settings.JOB_RETENTION,
+)
@@ -0,0 +1,218 @@
+"""
+    Bulk loading of RDF files into a database
+"""
+
+import gzip
+import io
+
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+import stardog # type: ignore
+
+from stardog import content_types # type: ignore
+
+from rdflib.parser import InputSource
+
+from tripper import Triplestore
+
+from app.triplestore.backends import open_stardog_connection, triplestore_backend
+from app.triplestore.serialization import SerializationFormat
+
+
+def load_file(db_name: str, triplestore: Triplestore, path: Path, rdflib_format: str) -> None:
+    """
+        Load an RDF file into a database.
+
+        Backends with transactions (Stardog) receive the file as-is in a single
+        transaction and parse it server side; other backends parse it through tripper.
+    """
+    if triplestore_backend.transactions:
+        with open_stardog_connection(db_name) as conn:
+            conn.begin()
+            try:
+                conn.add(stardog.content.File(str(path)))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    else:
+        triplestore.parse(location=str(path), format=rdflib_format)
+
+
+def iter_line_chunks(source: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """
+        Read a line-oriented file in chunks of about `chunk_size` bytes, cut on line boundaries
+    """
+    pending = b""
+    while True:
+        data = source.read(chunk_size)
+        if not data:
+            break
+
+        data = pending + data
+        cut = data.rfind(b"\n") + 1
+        if cut:
+            yield data[:cut]
+        pending = data[cut:]
+
+    if pending:
+        yield pending + b"\n"
+
+
+def count_statements(chunk: bytes) -> int:
+    """
+        Count the statements of an N-Triples/N-Quads chunk
+    """
+    return sum(1 for line in chunk.splitlines() if line.strip() and not line.lstrip().startswith(b"#"))
+
+
+def database_size(db_name: str, triplestore: Triplestore) -> int:
+    return triplestore_backend.database_size(db_name, triplestore)
+
+
+def load_chunk(db_name: str, triplestore: Triplestore, chunk: Union[bytes, BinaryIO], serialization_format: SerializationFormat, content_encoding: Optional[str] = None) -> None:
+    """
+        Load a chunk or file of RDF data in its own transaction
+    """
+    writer = TripleWriter(db_name, triplestore)
+    writer.open()
+    try:
+        writer.write_raw(chunk, serialization_format, content_encoding)
+        writer.commit()
+    finally:
+        writer.close()
+
+
+def delete_query(batch: Sequence[Tuple[Optional[str], Optional[str], Optional[str]]]) -> str:
+    """
+        Build a single SPARQL update removing a batch of triples.
+
+        Fully specified triples are removed with one DELETE DATA operation,
+        while each triple pattern (with None as wildcard) becomes a DELETE WHERE
+        operation of the same request.
+    """
+    operations: List[str] = []
+
+    triples = [triple for triple in batch if None not in triple]
+    if triples:
+        operations.append("DELETE DATA {{ {} }}".format(" ".join("{} {} {} .".format(*triple) for triple in triples)))
+
+    for pattern in batch:
+        if None in pattern:
+            terms = [term if term is not None else "?{}".format(var) for (term, var) in zip(pattern, "spo")]
+            operations.append("DELETE WHERE {{ {} {} {} . }}".format(*terms))
+
+    return " ;\n".join(operations)
+
+
+class TripleWriter:
+    """
+        Write batches of N3 triple additions or removals to a database.
+
+        With `atomic`, all the batches are sent within one transaction which is
+        committed by `commit()`; otherwise every batch is committed on its own,
+        and `committed` tells how many triples are already persisted.
+        Backends without transactions get the batches through tripper.
+    """
+
+    def __init__(self, db_name: str, triplestore: Triplestore, atomic: bool = True):
+        self.db_name = db_name
+        self.triplestore = triplestore
+        self.atomic = atomic
+        self.written = 0
+        self.committed = 0
+        self.batches = 0
+        self._conn = None
+
+    def open(self) -> None:
+        if triplestore_backend.transactions:
+            self._conn = open_stardog_connection(self.db_name)
+            if self.atomic:
+                self._conn.begin()
+
+    def close(self) -> None:
+        """
+            Release the connection, rolling back any uncommitted transaction
+        """
+        if self._conn is not None:
+            try:
+                if self._conn.transaction:
+                    self._conn.rollback()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+    def write(self, batch: Sequence[Tuple[str, str, str]]) -> None:
+        if not batch:
+            return
+
+        if self._conn is None:
+            self.triplestore.add_triples(batch)
+            self.committed += len(batch)
+        else:
+            content = stardog.content.Raw("".join("{} {} {} .\n".format(*triple) for triple in batch).encode(), content_types.TURTLE)
+            if self.atomic:
+                self._conn.add(content)
+            else:
+                self._conn.begin()
+                self._conn.add(content)
+                self._conn.commit()
+                self.committed += len(batch)
+
+        self.written += len(batch)
+        self.batches += 1
+
+    def write_raw(self, data: Union[bytes, BinaryIO], serialization_format: SerializationFormat, content_encoding: Optional[str] = None, count: int = 0) -> None:
+        """
+            Write serialized RDF data, as bytes or a (possibly gzip-compressed) binary file.
+            Stardog receives the data as-is, without parsing it client side.
+        """
+        if self._conn is None:
+            source = io.BytesIO(data) if isinstance(data, bytes) else data
+            if content_encoding == "gzip":
+                source = gzip.GzipFile(fileobj=source, mode="rb")
+            # Given as a byte stream, as anonymous temporary files have no usable name
+            input_source = InputSource()
+            input_source.setByteStream(source)
+            self.triplestore.parse(source=input_source, format=serialization_format.rdflib_format)
+            self.committed += count
+        else:
+            content = stardog.content.Raw(data, serialization_format.media_type, content_encoding=content_encoding)
+            if self.atomic:
+                self._conn.add(content)
+            else:
+                self._conn.begin()
+                self._conn.add(content)
+                self._conn.commit()
+                self.committed += count
+
+        self.written += count
+        self.batches += 1
+
+    def remove(self, batch: Sequence[Tuple[Optional[str], Optional[str], Optional[str]]]) -> None:
+        """
+            Remove a batch of triples or triple patterns with one SPARQL update
+        """
+        if not batch:
+            return
+
+        query = delete_query(batch)
+        if self._conn is None:
+            self.triplestore.update(query)
+            self.committed += len(batch)
+        elif self.atomic:
+            self._conn.update(query)
+        else:
+            self._conn.begin()
+            self._conn.update(query)
+            self._conn.commit()
+            self.committed += len(batch)
+
+        self.written += len(batch)
+        self.batches += 1
+
+    def commit(self) -> None:
+        if self._conn is not None and self.atomic:
+            self._conn.commit()
+            self.committed = self.written
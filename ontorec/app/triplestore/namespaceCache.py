@@ -0,0 +1,71 @@
+"""
+    Cache of the namespace map of each database
+"""
+
+import threading
+import time
+
+from typing import Dict, Optional, Tuple
+
+from app.config.ontoRECSettings import OntoRECSetting
+
+app_settings = OntoRECSetting()
+
+
+class NamespaceCache:
+    """
+        Prefix to IRI map of each database, kept for `ttl` seconds.
+
+        Changes made through the service update the cached maps in place;
+        the time-to-live bounds how long changes made elsewhere go unseen.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._namespaces: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_name: str) -> Optional[Dict[str, str]]:
+        """
+            Return a copy of the cached namespace map of `db_name`, if still fresh
+        """
+        with self._lock:
+            entry = self._namespaces.get(db_name)
+            if entry is None:
+                return None
+
+            expires, namespaces = entry
+            if expires <= time.monotonic():
+                del self._namespaces[db_name]
+                return None
+
+            return dict(namespaces)
+
+    def set(self, db_name: str, namespaces: Dict[str, str]) -> None:
+        with self._lock:
+            self._namespaces[db_name] = (time.monotonic() + self.ttl, dict(namespaces))
+
+    def bind(self, db_name: str, prefix: str, iri: Optional[str]) -> None:
+        """
+            Record a prefix bound to `iri`, or unbound if `iri` is None
+        """
+        with self._lock:
+            entry = self._namespaces.get(db_name)
+            if entry is None:
+                return
+
+            _, namespaces = entry
+            if iri is None:
+                namespaces.pop(prefix, None)
+            else:
+                namespaces[prefix] = iri
+
+    def invalidate(self, db_name: str) -> None:
+        with self._lock:
+            self._namespaces.pop(db_name, None)
+
+    def __len__(self) -> int:
+        return len(self._namespaces)
+
+
+namespace_cache = NamespaceCache(app_settings.NAMESPACE_CACHE_TTL)
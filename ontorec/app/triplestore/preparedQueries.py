@@ -0,0 +1,194 @@
+"""
+    Named, parameterised query templates registered per database
+"""
+
+import hashlib
+import re
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import rdflib
+
+from rdflib.plugins.sparql import prepareQuery
+
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.queryCache import QUERY_TOKENS, is_read_query, normalize_query
+
+app_settings = OntoRECSetting()
+
+# Variables, outside of the literals, IRIs and comments matched by QUERY_TOKENS
+QUERY_VARIABLES = re.compile(QUERY_TOKENS.pattern + r"|[?$]([A-Za-z0-9_]+)")
+# Braces, variables, keywords and prefixed names, outside of the literals, IRIs and comments
+QUERY_GROUPS = re.compile(QUERY_TOKENS.pattern + r"|[?$][A-Za-z0-9_]+|[A-Za-z_:][\w.:-]*|[{}]")
+IRI = re.compile(r'[^<>"{}|^`\\\x00-\x20]+')
+PARAMETER_KINDS = ("iri", "literal")
+
+
+class PreparedQueryError(ValueError):
+    pass
+
+
+class PreparedQueryNotFound(Exception):
+    pass
+
+
+def query_variables(query: str) -> List[str]:
+    return sorted({match.group(1) for match in QUERY_VARIABLES.finditer(query) if match.group(1)})
+
+
+def values_clause(values: Dict[str, str]) -> str:
+    """
+        VALUES clause binding each variable to an N3 term
+    """
+    return "VALUES ({}) {{ ({}) }}".format(" ".join("?" + name for name in values), " ".join(values.values()))
+
+
+def where_group(query: str) -> Optional[int]:
+    """
+        Position just after the opening brace of the outermost WHERE group,
+        or None if the query has none
+    """
+    depth = 0
+    where = False
+    first = None
+    for match in QUERY_GROUPS.finditer(query):
+        token = match.group()
+        if token == "{":
+            if depth == 0:
+                if where:
+                    return match.end()
+                if first is None:
+                    first = match.end()
+            depth += 1
+        elif token == "}":
+            depth -= 1
+        elif depth == 0 and token.upper() == "WHERE":
+            where = True
+    return first
+
+
+def bind_values(query: str, position: int, values: Dict[str, str]) -> str:
+    return "{} {} {}".format(query[:position], values_clause(values), query[position:])
+
+
+class PreparedQuery:
+    """
+        Read query whose `parameters` are bound at execution time.
+
+        The template is parsed once when registered, with its parameters bound,
+        so that executions only check and quote the values. Values are bound by
+        a VALUES clause at the start of the WHERE group rather than by
+        substitution in the text, which keeps the template valid whatever the
+        bound terms, projected variables included. Being inside the group, the
+        values are joined before FILTERs and aggregates are evaluated.
+    """
+
+    def __init__(self, name: str, query: str, parameters: Dict[str, str], namespaces: Optional[Dict[str, str]] = None):
+        normalized = normalize_query(query)
+        if not is_read_query(normalized):
+            raise PreparedQueryError("Only SELECT, ASK, CONSTRUCT and DESCRIBE queries can be prepared")
+
+        variables = query_variables(query)
+        for (parameter, kind) in parameters.items():
+            if parameter not in variables:
+                raise PreparedQueryError("Parameter {} is not a variable of the query".format(parameter))
+            if kind not in PARAMETER_KINDS:
+                raise PreparedQueryError("Parameter {} has unknown kind {}".format(parameter, kind))
+
+        self.name = name
+        self.query = query
+        self.parameters = dict(parameters)
+        self.digest = hashlib.sha256("{}\0{}".format(normalized, sorted(self.parameters.items())).encode()).hexdigest()[:12]
+        self.created = time.time()
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.group = where_group(query)
+        if self.parameters and self.group is None:
+            raise PreparedQueryError("The query has no WHERE group to bind parameters in")
+
+        sample = {parameter: "<urn:x>" if kind == "iri" else '""' for (parameter, kind) in self.parameters.items()}
+        try:
+            prepareQuery(bind_values(self.query, self.group, sample) if sample else self.query, initNs=namespaces or {})
+        except Exception as err:
+            raise PreparedQueryError("Invalid query: {}".format(err))
+
+    def bind(self, bindings: Dict[str, str]) -> str:
+        """
+            Return the query with every parameter bound to its value in `bindings`
+        """
+        missing = set(self.parameters) - set(bindings)
+        unknown = set(bindings) - set(self.parameters)
+        if missing or unknown:
+            raise PreparedQueryError("Missing parameters: {}; unknown parameters: {}".format(sorted(missing) or "none", sorted(unknown) or "none"))
+
+        if not self.parameters:
+            return self.query
+
+        values = {}
+        for (parameter, kind) in self.parameters.items():
+            value = bindings[parameter]
+            if kind == "iri":
+                if not IRI.fullmatch(value):
+                    raise PreparedQueryError("Invalid IRI for parameter {}".format(parameter))
+                values[parameter] = "<" + value + ">"
+            else:
+                values[parameter] = rdflib.Literal(value).n3()
+
+        return bind_values(self.query, self.group, values)
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        if failed:
+            self.errors += 1
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+class PreparedQueryRegistry:
+    """
+        Prepared queries of each database, at most `max_per_database` of them.
+        The registry lives in the process and is emptied on restart.
+    """
+
+    def __init__(self, max_per_database: int):
+        self.max_per_database = max_per_database
+        self._queries: Dict[str, "OrderedDict[str, PreparedQuery]"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, db_name: str, prepared: PreparedQuery) -> None:
+        with self._lock:
+            queries = self._queries.setdefault(db_name, OrderedDict())
+            if prepared.name not in queries and len(queries) >= self.max_per_database:
+                raise PreparedQueryError("At most {} prepared queries per database".format(self.max_per_database))
+            queries[prepared.name] = prepared
+
+    def get(self, db_name: str, name: str) -> PreparedQuery:
+        prepared = self._queries.get(db_name, {}).get(name)
+        if prepared is None:
+            raise PreparedQueryNotFound("Prepared query {} does not exist".format(name))
+        return prepared
+
+    def list(self, db_name: str) -> List[PreparedQuery]:
+        return list(self._queries.get(db_name, {}).values())
+
+    def items(self) -> List[Tuple[str, PreparedQuery]]:
+        return [(db_name, prepared) for (db_name, queries) in list(self._queries.items()) for prepared in list(queries.values())]
+
+    def remove(self, db_name: str, name: str) -> None:
+        with self._lock:
+            if self._queries.get(db_name, {}).pop(name, None) is None:
+                raise PreparedQueryNotFound("Prepared query {} does not exist".format(name))
+
+    def drop_database(self, db_name: str) -> None:
+        with self._lock:
+            self._queries.pop(db_name, None)
+
+
+prepared_queries = PreparedQueryRegistry(app_settings.PREPARED_QUERIES_PER_DATABASE)
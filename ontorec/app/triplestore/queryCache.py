@@ -0,0 +1,214 @@
+"""
+    Cache of query results, invalidated by writes to the database
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+
+try:
+    import aioredis # type: ignore
+except ImportError:  # pragma: no cover
+    aioredis = None
+
+app_settings = OntoRECSetting()
+
+# String literals and IRIs, matched first so that their content is kept as-is,
+# then runs of whitespace and comments
+QUERY_TOKENS = re.compile(r'"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^<>"{}|^`\\\s]*>|(?:\s|#[^\n]*)+')
+QUERY_PROLOGUE = re.compile(r"^(?:\s*(?:PREFIX\s+[^\s:]*:\s*<[^>]*>|BASE\s*<[^>]*>))*\s*", re.IGNORECASE)
+READ_QUERY_FORMS = ("SELECT", "ASK", "CONSTRUCT", "DESCRIBE")
+
+
+def normalize_query(query: str) -> str:
+    """
+        Collapse whitespace and drop comments outside of literals and IRIs
+    """
+    def replace(match):
+        token = match.group(0)
+        return " " if token[0] == "#" or token[0].isspace() else token
+
+    return QUERY_TOKENS.sub(replace, query).strip()
+
+
+def query_form(query: str) -> Optional[str]:
+    """
+        Return the read form of a normalized query, e.g. SELECT, or None for updates
+    """
+    body = QUERY_PROLOGUE.sub("", query, count=1)[:9].upper()
+    for form in READ_QUERY_FORMS:
+        if body.startswith(form):
+            return form
+    return None
+
+
+def is_read_query(query: str) -> bool:
+    """
+        Tell if a normalized query is a read-only query form
+    """
+    return query_form(query) is not None
+
+
+class MemoryCacheBackend:
+    """
+        In-process LRU cache bounded in bytes, with a time-to-live per entry
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        entry_size = len(key) + len(value)
+        if entry_size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self.size += entry_size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    async def generation(self, db_name: str) -> int:
+        return self._generations.get(db_name, 0)
+
+    async def bump(self, db_name: str) -> None:
+        with self._lock:
+            self._generations[db_name] = self._generations.get(db_name, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.size -= len(key) + len(value)
+
+
+class RedisCacheBackend:
+    """
+        Cache shared through Redis by all the workers; Redis evicts the entries
+        after their time-to-live and according to its own memory policy
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "ontorec:query:"):
+        if aioredis is None:
+            raise RuntimeError("aioredis is required for the Redis query cache")
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._redis.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    async def generation(self, db_name: str) -> int:
+        return int(await self._redis.get(self.prefix + "generation:" + db_name) or 0)
+
+    async def bump(self, db_name: str) -> None:
+        await self._redis.incr(self.prefix + "generation:" + db_name)
+
+
+class QueryCache:
+    """
+        Cache of query results keyed on the normalized query, the reasoning flag
+        and the generation of the database.
+
+        Every write to a database bumps its generation, so the results computed
+        before the write are never served again and simply age out.
+        Errors of the backend are logged and treated as misses.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, db_name: str, query: str, reasoning: bool) -> Tuple[Optional[str], Any]:
+        """
+            Return the cache key of a query, or None if it cannot be cached,
+            and the cached result, or None on a miss
+        """
+        if self.backend is None:
+            return None, None
+
+        normalized = normalize_query(query)
+        if not is_read_query(normalized):
+            return None, None
+
+        try:
+            generation = await self.backend.generation(db_name)
+            key = hashlib.sha256("{}\0{}\0{}\0{}".format(db_name, generation, bool(reasoning), normalized).encode()).hexdigest()
+            value = await self.backend.get(key)
+        except Exception as err:
+            log.warning("Query cache lookup failed: {}".format(err))
+            return None, None
+
+        if value is None:
+            self.misses += 1
+            return key, None
+
+        self.hits += 1
+        return key, json.loads(value)
+
+    async def set(self, key: Optional[str], result: Any) -> None:
+        if key is None:
+            return
+
+        try:
+            await self.backend.set(key, json.dumps(result).encode())
+        except Exception as err:
+            log.warning("Query cache update failed: {}".format(err))
+
+    async def invalidate(self, db_name: str) -> None:
+        """
+            Make all the cached results of a database stale
+        """
+        if self.backend is None:
+            return
+
+        try:
+            await self.backend.bump(db_name)
+        except Exception as err:
+            log.error("Query cache invalidation of {} failed: {}".format(db_name, err))
+
+
+def create_cache_backend():
+    if app_settings.QUERY_CACHE_REDIS_URL:
+        return RedisCacheBackend(app_settings.QUERY_CACHE_REDIS_URL, app_settings.QUERY_CACHE_TTL)
+    if app_settings.QUERY_CACHE_SIZE > 0:
+        return MemoryCacheBackend(app_settings.QUERY_CACHE_SIZE, app_settings.QUERY_CACHE_TTL)
+    return None
+
+
+query_cache = QueryCache(create_cache_backend())
@@ -0,0 +1,186 @@
+"""
+    Timeouts, cancellation and result-size limits of queries
+"""
+
+import asyncio
+import re
+import uuid
+
+from typing import AsyncIterator, Awaitable, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import Request
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.backends import triplestore_backend
+from app.triplestore.executor import backend_executor
+from app.triplestore.preparedQueries import QUERY_GROUPS
+from app.triplestore.queryCache import normalize_query, query_form
+
+app_settings = OntoRECSetting()
+
+DISCONNECT_POLL_INTERVAL = 0.5
+# Comment heading the text of each query sent to the triplestore
+QUERY_TAG = "# ontorec-query {}\n"
+LIMIT_VALUE = re.compile(r"\s*(\d+)")
+
+T = TypeVar("T")
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+class ResultTooLarge(Exception):
+    pass
+
+
+def cap(value, limit):
+    return min(value, limit) if limit else value
+
+
+class QueryLimits:
+    """
+        Limits applied to one query: the settings, tightened by the request.
+
+        A requested timeout is capped to QUERY_MAX_TIMEOUT and a requested number
+        of rows to QUERY_MAX_ROWS; None means no limit.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, max_rows: Optional[int] = None, truncate: Optional[bool] = None):
+        self.timeout = cap(timeout, app_settings.QUERY_MAX_TIMEOUT) if timeout else app_settings.QUERY_TIMEOUT or None
+        self.max_rows = cap(max_rows, app_settings.QUERY_MAX_ROWS) if max_rows else app_settings.QUERY_MAX_ROWS or None
+        self.max_bytes = app_settings.QUERY_MAX_BYTES or None
+        self.truncate = app_settings.QUERY_TRUNCATE if truncate is None else truncate
+
+    def limit_rows(self, rows: List[Sequence[Optional[str]]]) -> Tuple[List[Sequence[Optional[str]]], bool]:
+        """
+            Cut N3 rows to the limits, estimating their size as encoded in JSON.
+            Return the rows kept and whether any was dropped, or raise
+            ResultTooLarge if truncation is not allowed.
+        """
+        count = len(rows) if self.max_rows is None else min(len(rows), self.max_rows)
+        if self.max_bytes is not None:
+            size = 2
+            for (index, row) in enumerate(rows[:count]):
+                size += 3 + sum(4 if value is None else len(value) + 3 for value in row)
+                if size > self.max_bytes:
+                    count = index
+                    break
+
+        if count == len(rows):
+            return rows, False
+        if not self.truncate:
+            raise ResultTooLarge("{} rows over the limits".format(len(rows) - count))
+        return rows[:count], True
+
+    async def read_chunks(self, chunks: AsyncIterator[bytes], lines: bool = False) -> Tuple[List[bytes], bool]:
+        """
+            Read a stream of raw results up to `max_bytes`, before anything is sent.
+            Return the chunks and whether the results were cut, at the last line
+            boundary with `lines`, or raise ResultTooLarge if truncation is not allowed.
+        """
+        buffered: List[bytes] = []
+        size = 0
+        async for chunk in chunks:
+            if self.max_bytes is not None and size + len(chunk) > self.max_bytes:
+                if not self.truncate:
+                    raise ResultTooLarge("Results over {} bytes".format(self.max_bytes))
+                buffered.append(chunk[:self.max_bytes - size])
+                if lines:
+                    data = b"".join(buffered)
+                    buffered = [data[:data.rfind(b"\n") + 1]]
+                log.warning("Query results over {} bytes, truncated".format(self.max_bytes))
+                return buffered, True
+            size += len(chunk)
+            buffered.append(chunk)
+        return buffered, False
+
+
+def limit_query(query: str, max_rows: int) -> str:
+    """
+        Bound the solutions of a SELECT query to `max_rows`, by adding or lowering
+        its LIMIT clause, so that the triplestore does not return them all; other
+        query forms are returned as they are
+    """
+    if query_form(normalize_query(query)) != "SELECT":
+        return query
+
+    depth = 0
+    end = len(query)
+    for match in QUERY_GROUPS.finditer(query):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+        elif depth == 0 and token.upper() == "LIMIT":
+            value = LIMIT_VALUE.match(query, match.end())
+            if value is None:
+                return query
+            return query[:value.start(1)] + str(min(int(value.group(1)), max_rows)) + query[value.end(1):]
+        elif depth == 0 and token.upper() == "VALUES":
+            # Trailing VALUES clause, which follows the solution modifiers
+            end = match.start()
+            break
+
+    # On its own line, in case the query ends with a comment
+    return "{}\nLIMIT {}\n{}".format(query[:end].rstrip(), max_rows, query[end:]).rstrip()
+
+
+def tagged_query(query: str) -> str:
+    """
+        Prefix a query with a comment unique to the request, so that the same
+        query run by other clients is not killed along with it
+    """
+    return QUERY_TAG.format(uuid.uuid4().hex) + query
+
+
+def kill_backend_query(db_name: str, query: str) -> int:
+    """
+        Kill the running queries of `db_name` with the text `query` on the triplestore,
+        which should be tagged by `tagged_query` to match this request only.
+        Only backends managing their queries (Stardog) can kill them; elsewhere
+        the query runs to its end.
+    """
+    if not triplestore_backend.query_management:
+        return 0
+
+    try:
+        return triplestore_backend.kill_queries(db_name, query)
+    except Exception as err:
+        log.warning("Cannot kill query on database {}: {}".format(db_name, err))
+        return 0
+
+
+async def wait_disconnect(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def run_query(request: Request, db_name: str, query: str, timeout: Optional[float], result: Awaitable[T]) -> T:
+    """
+        Await the `result` of `query`, as tagged by `tagged_query` and sent to
+        the triplestore, until it is ready, the timeout expires or the client
+        disconnects; in the last two cases the query is killed on the
+        triplestore and QueryTimeout or ClientDisconnected is raised
+    """
+    task = asyncio.ensure_future(result)
+    watcher = asyncio.ensure_future(wait_disconnect(request))
+    try:
+        done, _ = await asyncio.wait({task, watcher}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+
+    if task in done:
+        return task.result()
+
+    task.cancel()
+    backend_executor.spawn(kill_backend_query, db_name, query)
+    if watcher in done:
+        raise ClientDisconnected("Client disconnected")
+    raise QueryTimeout("Query exceeded {} seconds".format(timeout))
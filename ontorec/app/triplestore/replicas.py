@@ -0,0 +1,212 @@
+"""
+    In-process read replicas of selected databases
+"""
+
+import tempfile
+import threading
+import time
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from rdflib import Graph
+from rdflib.plugin import PluginException, get as get_plugin
+from rdflib.store import Store
+from tripper import Triplestore
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.backends import BackendTriplestore, InMemoryBackend, InMemoryStrategy, ReadWriteLock, triplestore_backend
+from app.triplestore.changeLog import ADD, BIND, REMOVE, UNBIND, Change, ChangeLogGap, change_log
+from app.triplestore.connectionManager import connection_manager
+from app.triplestore.executor import backend_executor
+from app.triplestore.serialization import SERIALIZATION_FORMATS
+
+app_settings = OntoRECSetting()
+
+# Seconds before a failed load is attempted again, unless the database changes
+RETRY_INTERVAL = 30.0
+
+
+class Replica:
+    """
+        Copy of a database in an rdflib graph of the process, at `revision`
+        of the change log
+    """
+
+    def __init__(self, db_name: str, store: str = "default"):
+        self.db_name = db_name
+        self.graph = Graph(store=store)
+        self.namespaces: Dict[str, str] = {}
+        self.lock = ReadWriteLock()
+        self.revision = 0
+        self.loaded = time.monotonic()
+        self.strategy = InMemoryStrategy(self.graph, self.namespaces, self.lock)
+        self.triplestore = BackendTriplestore("replica", self.strategy)
+
+    def __len__(self) -> int:
+        return len(self.graph)
+
+    def load(self, triplestore: Triplestore) -> None:
+        """
+            Copy the triples and namespaces of `triplestore`, through an N-Triples
+            snapshot on backends with a native export
+        """
+        if triplestore_backend.native_export:
+            with tempfile.TemporaryFile() as snapshot:
+                for chunk in triplestore_backend.export(self.db_name, SERIALIZATION_FORMATS["ntriples"].media_type):
+                    snapshot.write(chunk)
+                snapshot.seek(0)
+                self.strategy.parse(source=snapshot, format="nt")
+        else:
+            self.strategy.add_triples(list(triplestore.triples((None, None, None))))
+
+        for (prefix, iri) in triplestore.backend.namespaces().items():
+            self.strategy.bind(prefix, iri)
+
+    def apply(self, changes: Sequence[Change]) -> None:
+        with self.lock.write():
+            for change in changes:
+                if change.op == ADD:
+                    self.strategy.add_triples(change.triples)
+                elif change.op == REMOVE:
+                    for triple in change.triples:
+                        self.strategy.remove(triple)
+                elif change.op == BIND:
+                    self.strategy.bind(change.prefix, change.iri)
+                elif change.op == UNBIND:
+                    self.strategy.bind(change.prefix, None)
+                self.revision = change.revision
+
+
+class ReplicaManager:
+    """
+        Replicas of the `databases` answering reads without a round-trip to
+        the triplestore.
+
+        A replica is loaded in the worker pool on the first read of its
+        database, which is answered by the triplestore until the replica is
+        ready. Writes made through the service are replayed from the change
+        log before each read; changes the log cannot replay, such as file
+        imports, reload the replica. Writes made outside the service are
+        picked up when the replica is reloaded every `refresh_interval`
+        seconds, the stale replica answering reads in the meantime.
+    """
+
+    def __init__(self, databases: Sequence[str], store: str = "default", refresh_interval: float = 300.0):
+        try:
+            get_plugin(store, Store)
+        except PluginException:
+            raise ValueError("rdflib store {} is not installed".format(store))
+
+        self.databases: Set[str] = set(databases)
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.errors = InMemoryBackend.errors
+        self._replicas: Dict[str, Replica] = {}
+        self._loading: Set[str] = set()
+        self._failed: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def replicated(self, db_name: str) -> bool:
+        return db_name in self.databases
+
+    def get(self, db_name: str) -> Optional[Replica]:
+        """
+            Return the replica of a database, which may lag behind the change
+            log, or None while it is not loaded; missing and expired replicas
+            are scheduled for loading
+        """
+        if not self.replicated(db_name):
+            return None
+
+        replica = self._replicas.get(db_name)
+        if replica is None or (self.refresh_interval and time.monotonic() - replica.loaded > self.refresh_interval):
+            self.schedule(db_name)
+        return replica
+
+    def sync(self, replica: Replica) -> Optional[Replica]:
+        """
+            Replay the changes made since the revision of a replica; return None,
+            and schedule a reload, when they cannot be replayed
+        """
+        try:
+            # Only take the lock from the readers when there is something to replay
+            if change_log.revision(replica.db_name) != replica.revision:
+                with replica.lock.write():
+                    replica.apply(change_log.since(replica.db_name, replica.revision))
+        except ChangeLogGap as err:
+            log.info("Replica of database {} is reloaded: {}".format(replica.db_name, err))
+            with self._lock:
+                if self._replicas.get(replica.db_name) is replica:
+                    del self._replicas[replica.db_name]
+            self.schedule(replica.db_name)
+            return None
+        return replica
+
+    def schedule(self, db_name: str) -> None:
+        with self._lock:
+            if db_name in self._loading:
+                return
+            if db_name in self._failed:
+                (failed, revision) = self._failed[db_name]
+                if time.monotonic() - failed < RETRY_INTERVAL and revision == change_log.revision(db_name):
+                    return
+            self._loading.add(db_name)
+        backend_executor.spawn(self.load, db_name)
+
+    def load(self, db_name: str) -> Optional[Replica]:
+        """
+            Load a replica from the triplestore. The revision is read before the
+            snapshot, so that writes made during the load are replayed afterwards.
+        """
+        revision = change_log.revision(db_name)
+        try:
+            replica = Replica(db_name, self.store)
+            replica.revision = revision
+            replica.load(connection_manager.get(db_name))
+            replica = self.sync(replica)
+            if replica is not None:
+                with self._lock:
+                    self._replicas[db_name] = replica
+                    self._failed.pop(db_name, None)
+                log.info("Replica of database {} loaded: {} triples at revision {}".format(db_name, len(replica), replica.revision))
+            return replica
+
+        except Exception as err:
+            log.warning("Cannot load replica of database {}: {}".format(db_name, err))
+            with self._lock:
+                self._failed[db_name] = (time.monotonic(), revision)
+            return None
+
+        finally:
+            with self._lock:
+                self._loading.discard(db_name)
+
+    def drop(self, db_name: str) -> None:
+        with self._lock:
+            self._replicas.pop(db_name, None)
+            self._failed.pop(db_name, None)
+
+    def replicas(self) -> List[Replica]:
+        return list(self._replicas.values())
+
+
+def replica_databases(setting: str) -> List[str]:
+    return [db_name.strip() for db_name in setting.split("|") if db_name.strip()]
+
+
+async def read_triplestore(db_name: str, reasoning: bool = False) -> Triplestore:
+    """
+        Return the triplestore answering a read of a database: its replica,
+        once up to date with the change log, or the pooled connection.
+        Reads with reasoning always go to the triplestore.
+    """
+    replica = replica_manager.get(db_name) if not reasoning else None
+    if replica is not None and replica.revision != change_log.revision(db_name):
+        replica = await backend_executor.run(replica_manager.sync, replica)
+    if replica is not None:
+        return replica.triplestore
+    return await backend_executor.run(connection_manager.get, db_name)
+
+
+replica_manager = ReplicaManager(replica_databases(app_settings.REPLICA_DATABASES), app_settings.REPLICA_STORE, app_settings.REPLICA_REFRESH_INTERVAL)
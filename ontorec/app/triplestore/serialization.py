@@ -0,0 +1,224 @@
+"""
+    Chunked serialization of database content in the supported RDF formats
+"""
+
+import itertools
+import zlib
+
+from pathlib import PurePosixPath
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from rdflib import Graph
+from stardog import content_types # type: ignore
+
+from app.triplestore.backends import to_rdflib, triplestore_backend
+from app.triplestore.queryCache import normalize_query, query_form
+from app.triplestore.queryGuard import limit_query
+
+try:
+    import zstandard # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+TSV_CHUNK_ROWS = 10000
+
+
+class SerializationFormat(NamedTuple):
+    media_type: str
+    rdflib_format: str
+    line_oriented: bool
+
+
+SERIALIZATION_FORMATS: Dict[str, SerializationFormat] = {
+    "turtle": SerializationFormat(content_types.TURTLE, "turtle", False),
+    "ntriples": SerializationFormat(content_types.NTRIPLES, "nt", True),
+    "nquads": SerializationFormat(content_types.NQUADS, "nquads", True),
+    "xml": SerializationFormat(content_types.RDF_XML, "xml", False),
+    "json-ld": SerializationFormat(content_types.LD_JSON, "json-ld", False),
+}
+
+RESULT_FORMATS: Dict[str, str] = {
+    content_types.SPARQL_JSON: "json",
+    content_types.CSV: "csv",
+    content_types.TSV: "tsv",
+}
+
+# Query forms whose results each raw result format can carry
+RESULT_FORMAT_QUERIES: Dict[str, Tuple[str, ...]] = {
+    "json": ("SELECT", "ASK"),
+    "csv": ("SELECT",),
+    "tsv": ("SELECT",),
+}
+
+FORMAT_ALIASES: Dict[str, str] = {
+    "ttl": "turtle",
+    "nt": "ntriples",
+    "nq": "nquads",
+    "rdf": "xml",
+    "rdfxml": "xml",
+    "owl": "xml",
+    "jsonld": "json-ld",
+}
+
+
+def get_serialization_format(format: str) -> Optional[SerializationFormat]:
+    return SERIALIZATION_FORMATS.get(FORMAT_ALIASES.get(format, format))
+
+
+def upload_format(filename: str) -> Tuple[Optional[SerializationFormat], Optional[str]]:
+    """
+        Return the format and compression of an uploaded file from its name,
+        e.g. ntriples and gzip for "data.v2.nt.gz"
+    """
+    suffixes = [suffix.lstrip(".").lower() for suffix in PurePosixPath(filename).suffixes]
+    compression = None
+    if suffixes and suffixes[-1] == "gz":
+        compression = "gzip"
+        suffixes.pop()
+
+    if not suffixes:
+        return None, compression
+
+    return get_serialization_format(suffixes[-1]), compression
+
+
+def negotiate_result_format(accept: str) -> Optional[str]:
+    """
+        Return the raw query result media type accepted by the client, if any
+    """
+    for item in accept.split(","):
+        media_type, _, params = item.strip().partition(";")
+        media_type = media_type.strip().lower()
+        if media_type in RESULT_FORMATS and params.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            return media_type
+
+    return None
+
+
+def available_encodings() -> List[str]:
+    encodings = ["gzip"]
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+        Pick the preferred content encoding accepted by the client, if any
+    """
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+
+    for encoding in available_encodings():
+        if encoding in accepted:
+            return encoding
+
+    return None
+
+
+def compress_chunks(chunks: Iterator[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    """
+        Compress a stream of chunks with the given content encoding
+    """
+    if encoding is None:
+        yield from chunks
+        return
+
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        compressor = zlib.compressobj(wbits=31)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def triples_pages(triplestore: Any, page_size: int) -> Iterator[List]:
+    """
+        Pages of the triples of a database, as returned by the backend,
+        read from a single `triples()` cursor
+    """
+    triples = triplestore.triples((None, None, None))
+    while True:
+        page = list(itertools.islice(triples, page_size))
+        if page:
+            yield page
+        if len(page) < page_size:
+            break
+
+
+def ntriples_chunk(page: List) -> bytes:
+    """
+        N-Triples of a page of triples as returned by the backend, written by
+        rdflib so that literals are escaped and datatypes are IRIs
+    """
+    graph = Graph()
+    for triple in page:
+        graph.add(tuple(map(to_rdflib, triple)))
+    return graph.serialize(format="nt", encoding="utf-8")
+
+
+def export_chunks(db_name: str, serialization_format: SerializationFormat, serialize: Callable[[str], str], triples_pages: Callable[[], Iterator[List]]) -> Iterator[bytes]:
+    """
+        Serialize a database as a stream of byte chunks.
+
+        Backends with a native export stream it as received. For the others,
+        line-oriented formats are written page by page from `triples_pages`,
+        pages of triples as returned by the backend, while the others fall
+        back to `serialize`.
+    """
+    if triplestore_backend.native_export:
+        yield from triplestore_backend.export(db_name, serialization_format.media_type)
+
+    elif serialization_format.line_oriented:
+        for page in triples_pages():
+            yield ntriples_chunk(page)
+
+    else:
+        yield serialize(serialization_format.rdflib_format).encode()
+
+
+def query_result_chunks(db_name: str, triplestore: Any, query: str, reasoning: bool, media_type: str, timeout: Optional[float] = None, max_rows: Optional[int] = None) -> Iterator[bytes]:
+    """
+        Run a query and stream its results in a standard SPARQL results format.
+
+        Backends with raw results pass them through as received, without
+        decoding them. Other backends must be in-memory; their results are
+        serialized by rdflib. SELECT queries are limited to `max_rows` on every
+        backend. Queries whose results the format cannot carry, e.g. CONSTRUCT
+        results as CSV, and reasoning on backends without it raise NotImplementedError.
+    """
+    form = query_form(normalize_query(query))
+    if form is not None and form not in RESULT_FORMAT_QUERIES[RESULT_FORMATS[media_type]]:
+        raise NotImplementedError("Results of {} queries cannot be returned as {}".format(form, media_type))
+    if reasoning and not triplestore_backend.reasoning:
+        raise NotImplementedError("Reasoning is not supported by the {} backend".format(triplestore_backend.name))
+    if max_rows is not None:
+        query = limit_query(query, max_rows)
+
+    if triplestore_backend.raw_results:
+        yield from triplestore_backend.raw_query(db_name, query, reasoning, media_type, timeout, max_rows)
+
+    elif hasattr(triplestore.backend, "raw_query"):
+        result = triplestore.backend.raw_query(query)
+        if RESULT_FORMATS[media_type] == "tsv":
+            lines = ["\t".join("?{}".format(var) for var in result.vars)]
+            for row in result:
+                lines.append("\t".join(term.n3().replace("\t", "\\t") if term is not None else "" for term in row))
+                if len(lines) >= TSV_CHUNK_ROWS:
+                    yield ("\n".join(lines) + "\n").encode()
+                    lines = []
+            if lines:
+                yield ("\n".join(lines) + "\n").encode()
+        else:
+            yield result.serialize(format=RESULT_FORMATS[media_type])
+
+    else:
+        raise NotImplementedError("Raw query results are not supported by the {} backend".format(triplestore_backend.name))
@@ -0,0 +1,120 @@
+"""
+    Template databases used to provision new databases by copy
+"""
+
+import re
+import threading
+
+from typing import Callable, Optional
+
+from tripper import Triplestore
+
+from app.logger.logger import log
+from app.config.ontoRECSettings import OntoRECSetting
+from app.triplestore.backends import triplestore_backend
+from app.triplestore.connectionManager import connection_manager
+from app.triplestore.databaseRegistry import create_database, list_databases, remove_database
+from app.triplestore.emmo import emmo_snapshot, load_emmo
+
+app_settings = OntoRECSetting()
+
+
+class TemplateNotFound(Exception):
+    pass
+
+
+class ManagedTemplate:
+    """
+        Template database kept by the service and populated by `populate`.
+
+        The physical database is named after the logical name and the digest
+        of its source, so a change of the source leads to a new template being
+        created lazily on next use, and to the stale ones being dropped.
+    """
+
+    def __init__(self, name: str, digest: Callable[[], str], populate: Callable[[str, Triplestore], None]):
+        self.name = name
+        self._digest = digest
+        self._populate = populate
+        self._ready: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def database(self) -> str:
+        """
+            Return the name of the up-to-date template database, creating it if needed
+        """
+        with self._lock:
+            db_name = "{}-{}".format(self.name, self._digest()[:12])
+            if self._ready == db_name:
+                return db_name
+
+            current_databases = list_databases()
+            if db_name not in current_databases:
+                log.info("Creating template database {}".format(db_name))
+                create_database(db_name)
+                try:
+                    self._populate(db_name, connection_manager.get(db_name))
+                except Exception:
+                    remove_database(db_name)
+                    raise
+
+            for stale in current_databases:
+                if re.fullmatch(re.escape(self.name) + "-[0-9a-f]{12}", stale) and stale != db_name:
+                    log.info("Dropping stale template database {}".format(stale))
+                    remove_database(stale)
+
+            self._ready = db_name
+            return db_name
+
+    def reset(self) -> None:
+        with self._lock:
+            self._ready = None
+
+
+def copy_database(source: str, destination: str, triplestore: Triplestore) -> None:
+    """
+        Copy all the triples of `source` into `destination`.
+
+        Backends copying databases server side do it without going through
+        the service; other backends go through an N-Triples export of the source.
+    """
+    if triplestore_backend.server_side_copy:
+        triplestore_backend.copy_database(source, destination)
+    else:
+        content = connection_manager.get(source).serialize(format="nt")
+        triplestore.parse(data=content, format="nt")
+
+
+class TemplateRegistry:
+    """
+        Resolve template names to template databases and clone them
+    """
+
+    def __init__(self):
+        self.managed = {
+            app_settings.EMMO_TEMPLATE_DATABASE: ManagedTemplate(app_settings.EMMO_TEMPLATE_DATABASE, lambda: emmo_snapshot.digest, load_emmo),
+        }
+
+    def resolve(self, template: str) -> str:
+        if template in self.managed:
+            return self.managed[template].database()
+
+        if template not in list_databases():
+            raise TemplateNotFound("Template database {} does not exist".format(template))
+
+        return template
+
+    def clone(self, template: str, db_name: str, triplestore: Triplestore) -> None:
+        """
+            Fill the (empty) database `db_name` with the content of `template`
+        """
+        source = self.resolve(template)
+        try:
+            copy_database(source, db_name, triplestore)
+        except Exception:
+            if template in self.managed:
+                self.managed[template].reset()
+            raise
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,82 @@
+"""
+    Conversion of query results to N3 terms
+"""
+
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from tripper import Literal
+
+from app.config.ontoRECSettings import OntoRECSetting
+
+app_settings = OntoRECSetting()
+
+
+class _IriForms(dict):
+    """
+        Memo of the N3 form of IRIs and blank nodes, filled on lookup
+    """
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def __missing__(self, value: str) -> str:
+        n3 = value if value.startswith(("<", "_:")) else "<" + value + ">"
+        if len(self) >= self.max_size:
+            self.clear()
+        self[value] = n3
+        return n3
+
+
+def term_to_N3(value: Any) -> Optional[str]:
+    """
+        Convert a term without the memo: literals, other `str` subclasses and None
+    """
+    if isinstance(value, Literal):
+        return value.n3()
+    if isinstance(value, str):
+        return value if value.startswith(("<", "_:")) else "<" + value + ">"
+    return value
+
+
+class N3Converter:
+    """
+        Batch converter of result rows to N3 terms.
+
+        IRIs come as plain `str` and literals as tripper `Literal`, a `str`
+        subclass comparing equal to its lexical form; the memo of IRI forms is
+        therefore only looked up for exact `str` values.
+        Unbound values (None) are kept as-is.
+    """
+
+    def __init__(self, max_size: int):
+        self._iris = _IriForms(max_size)
+
+    def value(self, value: Any) -> Optional[str]:
+        return self._iris[value] if type(value) is str else term_to_N3(value)
+
+    def row(self, row: Sequence[Any]) -> Tuple[Optional[str], ...]:
+        iri = self._iris.__getitem__
+        return tuple([iri(value) if type(value) is str else term_to_N3(value) for value in row])
+
+    def rows(self, rows: Iterable[Sequence[Any]]) -> List[Tuple[Optional[str], ...]]:
+        """
+            Convert a page of rows column by column: columns holding only IRIs
+            are mapped through the memo without any per-cell Python code
+        """
+        rows = list(rows)
+        iri = self._iris.__getitem__
+        columns = []
+        for column in zip(*rows):
+            if set(map(type, column)) == {str}:
+                columns.append(map(iri, column))
+            else:
+                columns.append([iri(value) if type(value) is str else term_to_N3(value) for value in column])
+
+        if not columns:
+            return [() for _ in rows]
+
+        return list(zip(*columns))
+
+
+n3_converter = N3Converter(app_settings.N3_CACHE_SIZE)
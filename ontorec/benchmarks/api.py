@@ -0,0 +1,204 @@
+"""
+    Benchmark of the REST API against an in-memory backend
+
+    Runs the FastAPI app in process on the in-memory rdflib backend, and
+    measures the throughput and the p50/p99 latencies of the main routes on
+    synthetic datasets of several sizes and on the bundled EMMO ontology.
+    Results are written as JSON, and can be compared with the results of a
+    previous run to catch regressions. Run from the ontorec directory:
+
+        python -m benchmarks.api [--sizes 1000,10000] [--iterations 50] [--output results.json] [--baseline previous.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import warnings
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+PREFIX = "/ontorec/api/v1"
+EX = "http://example.org/bench#"
+QUERY = "SELECT ?s ?o WHERE {{ ?s <{}label> ?o }} LIMIT 100".format(EX)
+UNCACHED_QUERY = "SELECT ?s ?o WHERE {{ ?s <{}label> ?o }} LIMIT {}"
+WRITE_BATCH = 500
+
+Request = Callable[[int], Any]
+
+
+def make_client():
+    """
+        Test client of the app running on the in-memory rdflib backend
+    """
+    os.environ["ONTOKB_BACKEND"] = "rdflib"
+    warnings.filterwarnings("ignore")
+
+    from fastapi.testclient import TestClient
+
+    import app
+    from app.logger.logger import log
+
+    log.setLevel(logging.ERROR)
+    return TestClient(app.create_app())
+
+
+def synthetic_ntriples(count: int, seed: int = 0) -> bytes:
+    """
+        N-Triples of a class hierarchy with labels, as in EMMO
+    """
+    rng = random.Random(seed)
+    classes = ["<{}Class{}>".format(EX, i) for i in range(max(count // 3, 1))]
+    lines = []
+    for i in range(count):
+        subject = classes[i % len(classes)]
+        kind = i // len(classes)
+        if kind == 0:
+            lines.append('{} <{}label> "Class {}"@en .'.format(subject, EX, i))
+        elif kind == 1:
+            lines.append("{} <http://www.w3.org/2000/01/rdf-schema#subClassOf> {} .".format(subject, rng.choice(classes)))
+        else:
+            lines.append("{} <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://www.w3.org/2002/07/owl#Class> .".format(subject))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def write_batch(iteration: int) -> Dict:
+    return {"triples": [{"s": "<{}New{}>".format(EX, iteration * WRITE_BATCH + i), "p": "<{}label>".format(EX), "o": '"new {}"'.format(i)} for i in range(WRITE_BATCH)]}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def measure(request: Request, iterations: int, warmup: int = 1) -> Dict:
+    """
+        Send `request` `iterations` times in a row after `warmup` unmeasured calls
+    """
+    for iteration in range(warmup):
+        request(-1 - iteration)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for iteration in range(iterations):
+        sent = time.perf_counter()
+        response = request(iteration)
+        latencies.append(time.perf_counter() - sent)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": iterations,
+        "errors": errors,
+        "throughput": iterations / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def benchmark_dataset(client, name: str, filename: str, content: bytes, iterations: int) -> Dict:
+    database = "{}/databases/bench-{}".format(PREFIX, name)
+    client.post(database + "/create", params={"initEmmo": False})
+
+    started = time.perf_counter()
+    response = client.post(database, files={"ontology": (filename, content)})
+    load_seconds = time.perf_counter() - started
+    if response.status_code != 200:
+        raise RuntimeError("Cannot load {}: {} {}".format(name, response.status_code, response.text))
+    triples = response.json().get("triples", 0)
+
+    # Read routes first, since the writes change the revision of the database
+    dump_iterations = max(iterations // 10, 3)
+    routes = {
+        "list": measure(lambda i: client.get(PREFIX + "/databases"), iterations),
+        "namespaces": measure(lambda i: client.get(database + "/namespaces"), iterations),
+        "query": measure(lambda i: client.post(database + "/query", json={"query": QUERY}), iterations),
+        "query_uncached": measure(lambda i: client.post(database + "/query", json={"query": UNCACHED_QUERY.format(EX, 1000 + i)}), iterations),
+        "dump": measure(lambda i: client.get(database), dump_iterations),
+        "dump_stream": measure(lambda i: client.get(database, headers={"Accept": "application/x-ndjson"}), dump_iterations),
+        "serialize": measure(lambda i: client.get(database + "/serialization", params={"format": "turtle"}), dump_iterations),
+        "bulk_add": measure(lambda i: client.post(database + "/single", json=write_batch(i)), iterations, warmup=0),
+        "bulk_delete": measure(lambda i: client.request("DELETE", database + "/single", json=write_batch(i)), iterations, warmup=0),
+    }
+
+    client.delete(database)
+    return {"name": name, "triples": triples, "load_seconds": load_seconds, "routes": routes}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+        Routes whose p50 latency grew by more than `tolerance` since `baseline`
+    """
+    previous = {dataset["name"]: dataset["routes"] for dataset in baseline.get("datasets", [])}
+    regressions = []
+    for dataset in results["datasets"]:
+        for (route, result) in dataset["routes"].items():
+            before = previous.get(dataset["name"], {}).get(route)
+            if before and result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+                regressions.append("{} {}: p50 {:.2f} ms -> {:.2f} ms".format(dataset["name"], route, before["p50_ms"], result["p50_ms"]))
+    return regressions
+
+
+def main(sizes: List[int], iterations: int = 50, emmo: bool = True, output: Optional[str] = None, baseline: Optional[str] = None, tolerance: float = 0.2) -> Dict:
+    client = make_client()
+
+    from app import __version__
+    from app.triplestore.emmo import EMMO_PATH
+
+    datasets = [("synthetic-{}".format(size), "synthetic.nt", synthetic_ntriples(size)) for size in sizes]
+    if emmo:
+        datasets.append(("emmo", EMMO_PATH.name, EMMO_PATH.read_bytes()))
+
+    results = {
+        "version": __version__,
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": "rdflib",
+        "iterations": iterations,
+        "datasets": [],
+    }
+    for (name, filename, content) in datasets:
+        dataset = benchmark_dataset(client, name, filename, content, iterations)
+        results["datasets"].append(dataset)
+
+        print("{} ({} triples, loaded in {:.2f} s)".format(name, dataset["triples"], dataset["load_seconds"]))
+        for (route, result) in dataset["routes"].items():
+            print("    {:<15} {:>9.1f} req/s  p50 {:>9.2f} ms  p99 {:>9.2f} ms{}".format(
+                route, result["throughput"], result["p50_ms"], result["p99_ms"], "  ({} errors)".format(result["errors"]) if result["errors"] else ""))
+
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if baseline:
+        with open(baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), tolerance)
+        results["regressions"] = regressions
+        for regression in regressions:
+            print("regression: " + regression)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the REST API against an in-memory backend")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Comma-separated numbers of triples of the synthetic datasets")
+    parser.add_argument("--iterations", type=int, default=50, help="Requests per route; dumps and serializations get a tenth of them")
+    parser.add_argument("--no-emmo", action="store_true", help="Skip the bundled EMMO ontology")
+    parser.add_argument("--output", help="File where the results are written as JSON")
+    parser.add_argument("--baseline", help="Results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative p50 increase reported as a regression")
+    arguments = parser.parse_args()
+
+    results = main([int(size) for size in arguments.sizes.split(",") if size], arguments.iterations, not arguments.no_emmo, arguments.output, arguments.baseline, arguments.tolerance)
+    sys.exit(1 if results.get("regressions") else 0)
@@ -0,0 +1,67 @@
+"""
+    Micro-benchmark of the conversion of query results to N3 terms
+
+    Compares the former per-cell conversion of the routers with the batch
+    converter on synthetic SELECT results. Run from the ontorec directory:
+
+        python -m benchmarks.n3_conversion [rows]
+"""
+
+import random
+import sys
+import timeit
+
+from tripper import Literal
+
+from app.triplestore.terms import N3Converter
+
+
+def legacy_value_to_N3(value):
+    return value.n3() if isinstance(value, Literal) else value if value.startswith("<") or value.startswith("_:") else "<{}>".format(value)
+
+def legacy_rows(rows):
+    triples = []
+    for triple in rows:
+        converted_tuple = ()
+        for el in triple:
+            converted_tuple = converted_tuple + (legacy_value_to_N3(el),)
+        triples.append(converted_tuple)
+    return triples
+
+
+def make_rows(count, seed=0):
+    """
+        Rows of an EMMO-like class hierarchy: few predicates, a pool of
+        repeated IRIs and one language-tagged literal every four rows
+    """
+    rng = random.Random(seed)
+    iris = ["http://emmo.info/emmo#EMMO_{:08x}".format(rng.getrandbits(32)) for _ in range(max(count // 15, 1))]
+    predicates = [
+        "http://www.w3.org/2000/01/rdf-schema#subClassOf",
+        "http://www.w3.org/1999/02/22-rdf-syntax-ns#type",
+        "http://www.w3.org/2004/02/skos/core#prefLabel",
+    ]
+    return [
+        (rng.choice(iris), rng.choice(predicates), Literal("label {}".format(i), lang="en") if i % 4 == 0 else rng.choice(iris))
+        for i in range(count)
+    ]
+
+
+def main(count=300000, repeat=5):
+    rows = make_rows(count)
+    converter = N3Converter(max_size=100000)
+    assert converter.rows(rows) == legacy_rows(rows)
+
+    legacy = min(timeit.repeat(lambda: legacy_rows(rows), number=1, repeat=repeat))
+    batch = min(timeit.repeat(lambda: converter.rows(rows), number=1, repeat=repeat))
+
+    print("rows:    {}".format(count))
+    print("legacy:  {:.3f} s ({:.0f} rows/s)".format(legacy, count / legacy))
+    print("batch:   {:.3f} s ({:.0f} rows/s)".format(batch, count / batch))
+    print("speed-up: {:.1f}x".format(legacy / batch))
+
+    return {"rows": count, "legacy_seconds": legacy, "batch_seconds": batch, "speedup": legacy / batch}
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
@@ -1,7 +1,9 @@
 import app
 import os
+import json
 import unittest
 import stardog
+from unittest import mock
 from rdflib import BNode
 from pathlib import Path
 from rdflib import URIRef
@@ -9,6 +11,8 @@ from tripper.literal import Literal
 from fastapi.testclient import TestClient
 
 from app.config.triplestoreConfig import TriplestoreConfig
+from app.triplestore.changeLog import change_log
+from app.triplestore.jobs import job_manager
 
 
 triplestore_config = TriplestoreConfig()
@@ -82,6 +86,40 @@ class NamespacesAPIs_TestCase(unittest.TestCase):
         self.assertCountEqual(response_obj["triples"], [ list(triple) for triple in to_add ])
 
 
+    def test_get_databases_content_windows(self):
+        to_add = [("<http://onto-ns.com/ontologies/examples/food#FOOD_{}>".format(i), "<http://www.w3.org/2004/02/skos/core#prefLabel>", "\"Food {}\"@en".format(i)) for i in range(25)]
+
+        self.__connection.begin()
+        for triple in to_add:
+            self.__connection.add(stardog.content.Raw("{} {} {} .".format(*triple), "text/turtle"))
+        self.__connection.commit()
+
+        windows = [self.__client.get("/databases/{}?limit=10&offset={}".format(self.__database_name, offset)) for offset in (0, 10, 20)]
+        streamed = self.__client.get("/databases/{}?limit=10&offset=10&stream=true".format(self.__database_name))
+
+        self.assertEqual([response.status_code for response in windows], [200, 200, 200])
+        self.assertEqual([len(response.json()["triples"]) for response in windows], [10, 10, 5])
+        self.assertCountEqual([triple for response in windows for triple in response.json()["triples"]], [ list(triple) for triple in to_add ])
+        self.assertEqual(streamed.json()["triples"], windows[1].json()["triples"])
+
+
+    def test_get_databases_content_ndjson(self):
+        to_add = [("<http://onto-ns.com/ontologies/examples/food#FOOD_{}>".format(i), "<http://www.w3.org/2004/02/skos/core#prefLabel>", "\"Food {}\"@en".format(i)) for i in range(25)]
+
+        self.__connection.begin()
+        for triple in to_add:
+            self.__connection.add(stardog.content.Raw("{} {} {} .".format(*triple), "text/turtle"))
+        self.__connection.commit()
+
+        response = self.__client.get("/databases/{}".format(self.__database_name), headers={"Accept": "application/x-ndjson"})
+        window = self.__client.get("/databases/{}?limit=5&offset=20".format(self.__database_name), headers={"Accept": "application/x-ndjson"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.assertCountEqual([json.loads(line) for line in response.text.splitlines()], [ list(triple) for triple in to_add ])
+        self.assertEqual(len(window.text.splitlines()), 5)
+
+
     def test_serialize_turtle(self):
         ontology_file_path = str(Path(str(Path(__file__).parent.parent.resolve()) + os.path.sep.join(["","ontologies","food.ttl"])))
         self.__connection.begin()
@@ -89,8 +127,7 @@ class NamespacesAPIs_TestCase(unittest.TestCase):
         self.__connection.commit()
 
         response = self.__client.get("/databases/{}/serialization".format(self.__database_name))
-        response_obj = response.json()
-        db_content = response_obj["content"]
+        db_content = response.text
 
         with open(str(Path(str(Path(__file__).parent.parent.resolve()) + os.path.sep.join(["","ontologies","expected_ontology.ttl"]))), "r") as out_file:
             expected_serialization = out_file.read()
@@ -144,6 +181,18 @@ class NamespacesAPIs_TestCase(unittest.TestCase):
         self.assertEqual(expected_serialization, db_content)
 
 
+    def test_add_data_failed(self):
+        revision = change_log.revision(self.__database_name)
+
+        bad_content = self.__client.post("/databases/{}".format(self.__database_name), files={"ontology": ("bad.ttl", b"<http://a> <http://b> .")})
+        missing_database = self.__client.post("/databases/missing_database", files={"ontology": ("food.ttl", b"<http://a> <http://b> <http://c> .")})
+
+        self.assertEqual(bad_content.status_code, 400)
+        self.assertEqual(missing_database.status_code, 404)
+        self.assertEqual(change_log.revision(self.__database_name), revision)
+        self.assertEqual(change_log.revision("missing_database"), 0)
+
+
     def test_add_single_triples(self):
         triple_1 = [{"s":"<http://onto-ns.com/ontologies/examples/food#FOOD_e9cb271c_3be0_44e4_960f_6f6676445dbb>", "p":"<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>", "o":"<http://www.w3.org/2002/07/owl#Class>"}]
         triple_2 = [{"s":"<http://onto-ns.com/ontologies/examples/food#FOOD_e9cb271c_3be0_44e4_960f_6f6676445dbb>", "p":"<http://www.w3.org/2000/01/rdf-schema#subClassOf>","o":"<http://onto-ns.com/ontologies/examples/food#FOOD_d2741ae5_f200_4873_8f72_ac315917c41b>"}]
@@ -163,6 +212,26 @@ class NamespacesAPIs_TestCase(unittest.TestCase):
         self.assertCountEqual(triples, formatted_triples)
 
 
+    def test_add_single_triples_ndjson(self):
+        to_add = [
+            ("<http://onto-ns.com/ontologies/examples/food#FOOD_e9cb271c_3be0_44e4_960f_6f6676445dbb>", "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>", "<http://www.w3.org/2002/07/owl#Class>"),
+            ("<http://onto-ns.com/ontologies/examples/food#FOOD_e9cb271c_3be0_44e4_960f_6f6676445dbb>", "<http://www.w3.org/2000/01/rdf-schema#subClassOf>", "<http://onto-ns.com/ontologies/examples/food#FOOD_d2741ae5_f200_4873_8f72_ac315917c41b>"),
+            ("<http://onto-ns.com/ontologies/examples/food#FOOD_e9cb271c_3be0_44e4_960f_6f6676445dbb>", "<http://www.w3.org/2004/02/skos/core#prefLabel>", "\"Carrot\"@en"),
+        ]
+        body = "\n".join(json.dumps(list(triple)) for triple in to_add)
+
+        response = self.__client.post("/databases/{}/single?batch_size=2".format(self.__database_name), data=body, headers={"Content-Type": "application/x-ndjson"})
+        response_obj = response.json()
+        query_result = self.__connection.select("SELECT ?s ?p ?o WHERE { ?s ?p ?o . }", reasoning=False)
+        triples = self.parseQueryResult(query_result) # type: ignore
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_obj["triples"], 3)
+        self.assertEqual(response_obj["batches"], 2)
+        self.assertEqual(response_obj["committed"], 3)
+        self.assertCountEqual(triples, to_add)
+
+
     def test_delete_database(self):
         response = self.__client.delete("/databases/{}".format(self.__database_name))
         current_databases = list(map(lambda x : x.name ,  self.__admin.databases()))
@@ -221,6 +290,24 @@ class NamespacesAPIs_TestCase(unittest.TestCase):
         self.assertTrue(db_content == "")
 
 
+    def test_create_database_queue_full(self):
+        marker = "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> ."
+        db_name_to_create = "database_queuefull"
+        with mock.patch.object(job_manager, "max_pending", 0):
+            response = self.__client.post("/databases/{}/create?background=true".format(db_name_to_create))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn(db_name_to_create, list(map(lambda x : x.name, self.__admin.databases())))
+
+        response = self.__client.post("/databases/{}/create".format(db_name_to_create))
+        new_connection = stardog.Connection(db_name_to_create, **self.__connection_details)
+        db_content = new_connection.export(stardog.content_types.TURTLE).decode()  # type: ignore
+        db_content = db_content[db_content.find(marker) + len(marker) :].strip()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(db_content != "")
+
+
     ## Utils functions
     def parseQueryResult(self, query_result: dict):
         query_vars = query_result["head"]["vars"]    # type: ignore
@@ -0,0 +1,66 @@
+import unittest
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.responses import Response
+
+from app.metrics.metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, metrics
+
+
+class Metrics_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+
+    ## Unit test
+
+    def test_counter(self):
+        counter = self.metrics.counter("requests_total", "Requests", ("route",))
+        counter.inc("get")
+        counter.inc("get", amount=2)
+
+        self.assertEqual(counter.value("get"), 3)
+        self.assertIn('requests_total{route="get"} 3', self.metrics.render())
+
+    def test_histogram(self):
+        histogram = self.metrics.histogram("seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "get")
+        histogram.observe(0.1, "get")
+        histogram.observe(5, "get")
+
+        lines = self.metrics.render().splitlines()
+        self.assertIn('seconds_bucket{route="get",le="0.1"} 2', lines)
+        self.assertIn('seconds_bucket{route="get",le="1"} 2', lines)
+        self.assertIn('seconds_bucket{route="get",le="+Inf"} 3', lines)
+        self.assertIn('seconds_count{route="get"} 3', lines)
+        self.assertIn('seconds_sum{route="get"} 5.15', lines)
+
+    def test_gauge(self):
+        self.metrics.gauge("pool", "Pool size", lambda: {("a\"b",): 2}, ("name",))
+        self.metrics.gauge("broken", "Broken", lambda: 1 / 0)
+
+        text = self.metrics.render()
+        self.assertIn('pool{name="a\\"b"} 2', text)
+        self.assertIn("# broken unavailable", text)
+
+    def test_content_type(self):
+        self.assertEqual(Response(b"", media_type=CONTENT_TYPE).headers["content-type"], "text/plain; version=0.0.4; charset=utf-8")
+
+    def test_database_label(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, databases={"known"})
+
+        @app.get("/databases/{db_name}")
+        async def get_database(db_name: str):
+            if db_name != "known":
+                raise HTTPException(status_code=404)
+            return {}
+
+        client = TestClient(app)
+        self.assertEqual(client.get("/databases/known").status_code, 200)
+        self.assertEqual(client.get("/databases/unknown-6f1c").status_code, 404)
+
+        text = metrics.render()
+        self.assertIn('database="known"', text)
+        self.assertIn('database="other"', text)
+        self.assertNotIn("unknown-6f1c", text)
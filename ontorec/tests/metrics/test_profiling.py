@@ -0,0 +1,55 @@
+import unittest
+
+from unittest import mock
+
+from fastapi import HTTPException
+
+from app.metrics import profiling
+from app.metrics.profiling import RequestProfile
+from app.ontotrans_api.routers.profiling import profiling_access
+from app.metrics.slowQueries import SlowQueryLog
+
+
+def fibonacci(n):
+    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+
+class Profiling_TestCase(unittest.TestCase):
+
+    ## Unit test
+
+    def test_request_profile(self):
+        profile = RequestProfile()
+        self.assertIsNone(profile.stats())
+
+        self.assertEqual(profile.run(fibonacci, 10), 55)
+        profile.run(fibonacci, 5)
+
+        functions = {function for (_, _, function) in profile.stats().stats}
+        self.assertIn("fibonacci", functions)
+
+    def test_slow_queries(self):
+        slow_queries = SlowQueryLog(threshold=1.0, size=2)
+
+        self.assertFalse(slow_queries.record("db", "SELECT * WHERE { ?s ?p ?o }", False, 0.5, 10))
+        self.assertTrue(slow_queries.record("db", "SELECT * WHERE { ?s ?p ?o }", True, 1.5, 10))
+        self.assertTrue(slow_queries.record("other", "ASK { ?s ?p ?o }", False, 2.0, None, timed_out=True))
+        self.assertTrue(slow_queries.record("db", "SELECT ?s WHERE { ?s ?p ?o }", False, 3.0, 1))
+
+        self.assertEqual([entry["seconds"] for entry in slow_queries.entries()], [3.0, 2.0])
+        self.assertEqual([entry["rows"] for entry in slow_queries.entries("db")], [1])
+        self.assertEqual([entry["timed_out"] for entry in slow_queries.entries()], [False, True])
+
+    def test_slow_queries_disabled(self):
+        self.assertFalse(SlowQueryLog(threshold=0, size=2).record("db", "ASK { ?s ?p ?o }", False, 60.0, 1))
+
+    def test_profiling_access(self):
+        with mock.patch.multiple(profiling.app_settings, PROFILING_ENABLED=True, PROFILING_TOKEN=""):
+            profiling_access(None)
+
+        with mock.patch.multiple(profiling.app_settings, PROFILING_ENABLED=True, PROFILING_TOKEN="secret"):
+            profiling_access("secret")
+            for header in (None, "other"):
+                with self.assertRaises(HTTPException) as context:
+                    profiling_access(header)
+                self.assertEqual(context.exception.status_code, 403)
@@ -0,0 +1,150 @@
+import threading
+import unittest
+
+from unittest import mock
+
+import rdflib
+
+from rdflib.plugin import PluginException, get as get_plugin
+from rdflib.store import Store
+from tripper import Literal
+
+from app.triplestore import serialization
+from app.triplestore.backends import DatabaseNotFound, InMemoryBackend, ReadWriteLock, SparqlBackend, from_sparql_json, get_backend, pattern_query
+from app.triplestore.serialization import export_chunks, get_serialization_format, triples_pages
+
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+
+def oxigraph_installed() -> bool:
+    try:
+        get_plugin("Oxigraph", Store)
+    except PluginException:
+        return False
+    return True
+
+
+def export_graph(backend, db_name: str, format: str = "ntriples") -> rdflib.Graph:
+    """
+        Export a database in a line-oriented format and parse the result back
+    """
+    serialization_format = get_serialization_format(format)
+    triplestore = backend.open(db_name)
+    with mock.patch.object(serialization, "triplestore_backend", backend):
+        content = b"".join(export_chunks(db_name, serialization_format, lambda rdflib_format: triplestore.serialize(format=rdflib_format), lambda: triples_pages(triplestore, 2)))
+
+    graph = rdflib.Graph()
+    graph.parse(data=content, format=serialization_format.rdflib_format)
+    return graph
+
+
+class Backends_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = InMemoryBackend()
+        self.backend.create_database("db")
+
+    ## Unit test
+
+    def test_lifecycle(self):
+        self.assertEqual(self.backend.list_databases(), ["db"])
+        with self.assertRaises(ValueError):
+            self.backend.create_database("db")
+
+        self.backend.remove_database("db")
+        self.assertEqual(self.backend.list_databases(), [])
+        with self.assertRaises(DatabaseNotFound) as context:
+            self.backend.open("db")
+        self.assertTrue(self.backend.is_missing_database(context.exception))
+
+    def test_triples(self):
+        triplestore = self.backend.open("db")
+        triplestore.add_triples([("<http://ex/a>", "<http://ex/b>", '"c"@en'), ("<http://ex/a>", "<http://ex/b>", "_:n")])
+
+        rows = triplestore.query("SELECT ?o WHERE { <http://ex/a> ?p ?o } ORDER BY DESC(?o)")
+        self.assertEqual(rows[0], (Literal("c", lang="en"),))
+        self.assertTrue(rows[1][0].startswith("_:"))
+        self.assertEqual(self.backend.database_size("db", triplestore), 2)
+
+        triplestore.remove(("<http://ex/a>", None, '"c"@en'))
+        self.assertEqual(len(list(triplestore.triples((None, None, None)))), 1)
+        self.assertEqual(self.backend.open("db").query("ASK { ?s ?p ?o }")[0][0], "true")
+
+    def test_namespaces(self):
+        triplestore = self.backend.open("db")
+        triplestore.bind("ex", "http://ex/")
+        self.assertEqual(self.backend.open("db").backend.namespaces()["ex"], "http://ex/")
+
+        triplestore.bind("ex", None)
+        self.assertNotIn("ex", self.backend.open("db").backend.namespaces())
+
+    def test_sparql_terms(self):
+        self.assertEqual(pattern_query(("<http://ex/a>", None, None)), "SELECT ?p ?o WHERE { <http://ex/a> ?p ?o . }")
+        self.assertEqual(from_sparql_json({"type": "uri", "value": "http://ex/a"}), "http://ex/a")
+        self.assertEqual(from_sparql_json({"type": "bnode", "value": "b0"}), "_:b0")
+        self.assertEqual(from_sparql_json({"type": "literal", "value": "c", "xml:lang": "en"}), Literal("c", lang="en"))
+        self.assertIsNone(from_sparql_json(None))
+
+    def test_get_backend(self):
+        self.assertEqual(get_backend("sparql").capabilities()["raw_results"], True)
+        self.assertTrue(get_backend("stardog").reasoning)
+        with self.assertRaises(ValueError):
+            get_backend("unknown")
+
+    def test_read_write_lock(self):
+        lock = ReadWriteLock()
+        readers = threading.Barrier(2, timeout=5)
+
+        def read():
+            with lock.read():
+                readers.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(readers.broken)
+
+        with lock.write():
+            with lock.write(), lock.read():
+                pass
+            reader = threading.Thread(target=lambda: lock.read().__enter__())
+            reader.start()
+            reader.join(0.1)
+            self.assertTrue(reader.is_alive())
+        reader.join()
+
+    def test_export(self):
+        self.backend.open("db").add_triples([
+            ("<http://ex/a>", "<http://ex/n>", Literal("1", datatype=XSD_INTEGER)),
+            ("<http://ex/a>", "<http://ex/label>", Literal('a "b"\nc', lang="en")),
+            ("_:n", "<http://ex/label>", Literal("n")),
+        ])
+
+        for format in ("ntriples", "nquads"):
+            graph = export_graph(self.backend, "db", format)
+            self.assertEqual(len(graph), 3)
+            self.assertIn(rdflib.Literal(1), graph.objects())
+            self.assertIn(rdflib.Literal('a "b"\nc', lang="en"), graph.objects())
+
+    @unittest.skipUnless(oxigraph_installed(), "oxrdflib is not installed")
+    def test_export_oxigraph(self):
+        backend = get_backend("oxigraph")
+        backend.create_database("db")
+        backend.open("db").add_triples([("<http://ex/a>", "<http://ex/n>", Literal("1", datatype=XSD_INTEGER))])
+
+        self.assertIn(rdflib.Literal(1), export_graph(backend, "db").objects())
+
+    def test_export_sparql(self):
+        results = {"head": {"vars": ["s", "p", "o"]}, "results": {"bindings": [
+            {"s": {"type": "uri", "value": "http://ex/a"}, "p": {"type": "uri", "value": "http://ex/n"}, "o": {"type": "literal", "value": "1", "datatype": XSD_INTEGER}},
+            {"s": {"type": "bnode", "value": "b0"}, "p": {"type": "uri", "value": "http://ex/label"}, "o": {"type": "literal", "value": 'a "b"\nc'}},
+        ]}}
+
+        with mock.patch("app.triplestore.backends.SPARQLWrapper.queryAndConvert", return_value=results):
+            graph = export_graph(SparqlBackend(), "db")
+
+        self.assertEqual(len(graph), 2)
+        self.assertIn(rdflib.Literal(1), graph.objects())
+        self.assertIn(rdflib.Literal('a "b"\nc'), graph.objects())
@@ -0,0 +1,62 @@
+import unittest
+
+from app.triplestore.changeLog import ADD, BIND, REMOVE, RESET, ChangeLog, ChangeLogGap
+
+
+class ChangeLog_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.change_log = ChangeLog(max_triples=4)
+
+    ## Unit test
+
+    def test_since(self):
+        self.change_log.append("db", ADD, triples=[("<a>", "<b>", "<c>")])
+        self.change_log.append("db", REMOVE, triples=[("<a>", None, None)])
+        self.change_log.append("db", BIND, prefix="ex", iri="http://ex/")
+
+        self.assertEqual(self.change_log.revision("db"), 3)
+        self.assertEqual([change.revision for change in self.change_log.since("db", 1)], [2, 3])
+        self.assertEqual(self.change_log.since("db", 0)[1].as_dict()["triples"], [("<a>", None, None)])
+        self.assertEqual(self.change_log.since("db", 3), [])
+        self.assertEqual(self.change_log.revision("other"), 0)
+
+    def test_gaps(self):
+        self.change_log.append("db", RESET, detail="import")
+        self.change_log.append("db", ADD, triples=[("<a>", "<b>", "<c>")])
+
+        with self.assertRaises(ChangeLogGap):
+            self.change_log.since("db", 0)
+        with self.assertRaises(ChangeLogGap):
+            self.change_log.since("db", 3)
+        self.assertEqual(len(self.change_log.since("db", 1)), 1)
+
+    def test_retention(self):
+        for _ in range(3):
+            self.change_log.append("db", ADD, triples=[("<a>", "<b>", "<c>"), ("<d>", "<e>", "<f>")])
+
+        with self.assertRaises(ChangeLogGap):
+            self.change_log.since("db", 0)
+        self.assertEqual(len(self.change_log.since("db", 1)), 2)
+
+        self.assertEqual(self.change_log.append("db", ADD, triples=[("<a>", "<b>", "<c>")] * 5).op, RESET)
+
+    def test_recorder(self):
+        recorder = self.change_log.recorder("db", ADD)
+        recorder.extend([("<a>", "<b>", "<c>"), ("<d>", "<e>", "<f>")])
+        recorder.extend([("<g>", "<h>", "<i>")])
+
+        self.assertIsNone(recorder.commit(0))
+        self.assertEqual(recorder.commit(2).triples, [("<a>", "<b>", "<c>"), ("<d>", "<e>", "<f>")])
+
+        recorder.extend([("<a>", "<b>", "<c>")] * 2)
+        self.assertEqual(recorder.commit(5).op, RESET)
+
+    def test_drop_database(self):
+        self.change_log.append("db", BIND, prefix="ex", iri="http://ex/")
+        self.change_log.drop_database("db")
+
+        self.assertEqual(self.change_log.revision("db"), 2)
+        with self.assertRaises(ChangeLogGap):
+            self.change_log.since("db", 1)
+        self.assertEqual(self.change_log.since("db", 2), [])
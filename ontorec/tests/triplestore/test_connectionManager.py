@@ -0,0 +1,113 @@
+import gc
+import unittest
+
+from app.triplestore.connectionManager import ConnectionManager
+
+
+class FakeBackend:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTriplestore:
+
+    def __init__(self, db_name, healthy=True):
+        self.db_name = db_name
+        self.healthy = healthy
+        self.backend = FakeBackend()
+
+    def query(self, query_object, **kwargs):
+        if not self.healthy:
+            raise ConnectionError("connection lost")
+        return []
+
+    @property
+    def closed(self):
+        return self.backend.closed
+
+
+class ConnectionManager_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.opened = []
+        self.manager = ConnectionManager(max_size=2, idle_timeout=3600, health_check_interval=3600, factory=self.open)
+
+    def open(self, db_name):
+        triplestore = FakeTriplestore(db_name)
+        self.opened.append(triplestore.backend)
+        return triplestore
+
+    def release(self):
+        gc.collect()
+
+    ## Unit test
+
+    def test_reuse_connection(self):
+        first = self.manager.get("db1")
+        second = self.manager.get("db1")
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_lru_eviction(self):
+        db1 = self.manager.get("db1")
+        db2 = self.manager.get("db2")
+        self.manager.get("db1")
+        db3 = self.manager.get("db3")
+
+        self.assertEqual(len(self.manager), 2)
+        self.assertIn("db1", self.manager)
+        self.assertNotIn("db2", self.manager)
+        self.assertFalse(db1.closed)
+        self.assertFalse(db2.closed)
+        self.assertFalse(db3.closed)
+
+        del db2
+        self.release()
+        self.assertTrue(self.opened[1].closed)
+
+    def test_idle_timeout(self):
+        self.manager.idle_timeout = 0
+        first = self.manager.get("db1")
+        second = self.manager.get("db1")
+
+        self.assertIsNot(first, second)
+        self.assertFalse(first.closed)
+
+        del first
+        self.release()
+        self.assertTrue(self.opened[0].closed)
+
+    def test_health_check(self):
+        self.manager.health_check_interval = 0
+        first = self.manager.get("db1")
+        first.healthy = False
+        second = self.manager.get("db1")
+
+        self.assertIsNot(first, second)
+        del first
+        self.release()
+        self.assertTrue(self.opened[0].closed)
+
+    def test_invalidate(self):
+        first = self.manager.get("db1")
+        self.manager.invalidate("db1")
+
+        self.assertFalse(first.closed)
+        self.assertNotIn("db1", self.manager)
+        self.assertIsNot(first, self.manager.get("db1"))
+
+        del first
+        self.release()
+        self.assertTrue(self.opened[0].closed)
+
+    def test_clear(self):
+        first = self.manager.get("db1")
+        self.manager.clear()
+
+        self.assertTrue(first.closed)
+        self.assertEqual(len(self.manager), 0)
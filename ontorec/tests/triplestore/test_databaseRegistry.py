@@ -0,0 +1,47 @@
+import unittest
+
+from app.triplestore.databaseRegistry import DatabaseRegistry
+
+
+class DatabaseRegistry_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.databases = ["emmo"]
+        self.listings = 0
+        self.registry = DatabaseRegistry(ttl=60.0, miss_interval=60.0, lister=self.list_databases)
+
+    def list_databases(self):
+        self.listings += 1
+        return list(self.databases)
+
+    ## Unit test
+
+    def test_cached_listing(self):
+        self.assertEqual(self.registry.names(), ["emmo"])
+        self.assertTrue(self.registry.exists("emmo"))
+        self.assertEqual(self.registry.names(), ["emmo"])
+        self.assertEqual(self.listings, 1)
+
+    def test_add_and_discard(self):
+        self.registry.refresh()
+        self.registry.add("food")
+        self.assertEqual(self.registry.names(), ["emmo", "food"])
+
+        self.registry.discard("emmo")
+        self.assertFalse(self.registry.exists("emmo"))
+        self.assertEqual(self.registry.names(), ["food"])
+        self.assertEqual(self.listings, 1)
+
+    def test_miss_interval(self):
+        self.registry.refresh()
+        self.databases.append("food")
+        self.assertFalse(self.registry.exists("food"))
+
+        self.registry.miss_interval = 0.0
+        self.assertTrue(self.registry.exists("food"))
+        self.assertEqual(self.listings, 2)
+
+    def test_invalidate(self):
+        self.registry.refresh()
+        self.registry.invalidate()
+        self.assertTrue(self.registry.needs_refresh())
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pathlib import Path
+from rdflib import Graph
+
+from app.triplestore.emmo import OntologySnapshot
+
+
+class OntologySnapshot_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__tmp_dir = Path(tempfile.mkdtemp())
+        self.__source = self.__tmp_dir / "food.rdf"
+        shutil.copy(str(Path(str(Path(__file__).parent.parent.resolve()) + os.path.sep.join(["","ontologies","food.rdf"]))), str(self.__source))
+        self.__snapshot = OntologySnapshot(self.__source, self.__tmp_dir / "snapshots")
+
+    def tearDown(self):
+        shutil.rmtree(str(self.__tmp_dir))
+
+    ## Unit test
+
+    def test_snapshot_content(self):
+        snapshot = self.__snapshot.path()
+
+        expected = Graph().parse(str(self.__source), format="xml")
+        actual = Graph().parse(str(snapshot), format="nt")
+        self.assertEqual(len(actual), len(expected))
+        self.assertTrue(expected.isomorphic(actual))
+
+    def test_snapshot_reused(self):
+        first = self.__snapshot.path()
+        mtime = first.stat().st_mtime_ns
+
+        self.assertEqual(self.__snapshot.path(), first)
+        self.assertEqual(first.stat().st_mtime_ns, mtime)
+
+    def test_snapshot_rebuilt_on_change(self):
+        first = self.__snapshot.path()
+        with open(str(self.__source), "a") as source_file:
+            source_file.write("\n")
+        second = self.__snapshot.path()
+
+        self.assertNotEqual(first, second)
+        self.assertFalse(first.exists())
+        self.assertTrue(second.exists())
@@ -0,0 +1,28 @@
+import unittest
+
+from starlette.requests import Request
+
+from app.triplestore.etags import content_etag, is_not_modified
+
+
+def make_request(**headers) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": [(name.replace("_", "-").encode(), value.encode()) for (name, value) in headers.items()]})
+
+
+class ETags_TestCase(unittest.TestCase):
+
+    ## Unit test
+
+    def test_content_etag(self):
+        self.assertEqual(content_etag("db", 1), content_etag("db", 1))
+        self.assertNotEqual(content_etag("db", 1), content_etag("db", 2))
+        self.assertTrue(content_etag("db", 1).startswith('"'))
+
+    def test_is_not_modified(self):
+        etag = content_etag("db", 1)
+
+        self.assertTrue(is_not_modified(make_request(if_none_match=etag), etag))
+        self.assertTrue(is_not_modified(make_request(if_none_match='"other", W/' + etag), etag))
+        self.assertTrue(is_not_modified(make_request(if_none_match="*"), etag))
+        self.assertFalse(is_not_modified(make_request(if_none_match='"other"'), etag))
+        self.assertFalse(is_not_modified(make_request(), etag))
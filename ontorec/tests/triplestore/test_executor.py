@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import unittest
+
+from app.triplestore.executor import BackendExecutor, ExecutorSaturated, parse_route_limits
+
+
+class BackendExecutor_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = BackendExecutor(max_workers=1, max_queue=1, route_concurrency=2, route_limits={"execute_query": 1})
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    ## Unit test
+
+    def test_parse_route_limits(self):
+        self.assertEqual(parse_route_limits(""), {})
+        self.assertEqual(parse_route_limits("execute_query=4| get_database_data = 2"), {"execute_query": 4, "get_database_data": 2})
+
+    def test_run_off_event_loop(self):
+        async def run():
+            return await self.executor.run(lambda: threading.current_thread().name)
+
+        self.assertTrue(asyncio.run(run()).startswith("triplestore"))
+
+    def test_run_shielded(self):
+        release = threading.Event()
+        calls = []
+
+        def call():
+            release.wait(5)
+            calls.append("call")
+
+        async def run():
+            task = asyncio.ensure_future(self.executor.run_shielded(call))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.sleep(0.05)
+            running = task.done()
+            release.set()
+            try:
+                await task
+            except asyncio.CancelledError:
+                calls.append("cancelled")
+            return running
+
+        self.assertFalse(asyncio.run(run()))
+        self.assertEqual(calls, ["call", "cancelled"])
+
+    def test_route_limit(self):
+        async def run():
+            await self.executor.admit("execute_query").__aenter__()
+            second = asyncio.ensure_future(self.executor.admit("execute_query").__aenter__())
+            await asyncio.sleep(0)
+            return second.done()
+
+        self.assertFalse(asyncio.run(run()))
+
+    def test_saturation(self):
+        async def run():
+            await self.executor.admit("get_databases").__aenter__()
+            await self.executor.admit("get_databases").__aenter__()
+            await self.executor.admit("get_databases").__aenter__()
+
+        with self.assertRaises(ExecutorSaturated):
+            asyncio.run(run())
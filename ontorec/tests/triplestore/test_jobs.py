@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from app.triplestore.jobs import CANCELLED, COMPLETED, FAILED, PENDING, RUNNING, JobManager, JobQueueFull
+
+
+class JobManager_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = JobManager(max_running=2, max_pending=1, database_concurrency=1, retention=60.0)
+
+    ## Unit test
+
+    def test_job_progress(self):
+        async def work(job):
+            job.progress(3)
+            job.progress(4)
+
+        async def run():
+            job = await self.manager.submit("import", "db", work)
+            await asyncio.sleep(0.01)
+            await self.manager.close()
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(job.state, COMPLETED)
+        self.assertEqual(job.triples, 7)
+        self.assertIs(self.manager.get(job.id), job)
+
+    def test_job_failure(self):
+        async def work(job):
+            raise ValueError("Bad file content")
+
+        async def run():
+            job = await self.manager.submit("import", "db", work)
+            await asyncio.sleep(0.01)
+            await self.manager.close()
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(job.state, FAILED)
+        self.assertEqual(job.error, "Bad file content")
+
+    def test_database_concurrency_and_cancel(self):
+        self.manager.max_pending = 2
+        cleaned = []
+
+        async def run():
+            first = await self.manager.submit("import", "db", lambda job: asyncio.sleep(10), cleanup=lambda: cleaned.append(1))
+            await asyncio.sleep(0.01)
+            second = await self.manager.submit("import", "db", lambda job: asyncio.sleep(10), cleanup=lambda: cleaned.append(2))
+            other = await self.manager.submit("import", "other", lambda job: asyncio.sleep(10))
+            await asyncio.sleep(0.01)
+            states = (first.state, second.state, other.state)
+
+            await self.manager.cancel(second.id)
+            await self.manager.close()
+            return states, (first.state, second.state, other.state)
+
+        states, final_states = asyncio.run(run())
+        self.assertEqual(states, (RUNNING, PENDING, RUNNING))
+        self.assertEqual(final_states, (CANCELLED, CANCELLED, CANCELLED))
+        self.assertEqual(sorted(cleaned), [1, 2])
+
+    def test_queue_full(self):
+        async def run():
+            await self.manager.submit("import", "db", lambda job: asyncio.sleep(10))
+            await self.manager.submit("import", "db", lambda job: asyncio.sleep(10))
+            try:
+                await self.manager.submit("import", "db", lambda job: asyncio.sleep(10))
+            finally:
+                await self.manager.close()
+
+        with self.assertRaises(JobQueueFull):
+            asyncio.run(run())
+
+    def test_check_capacity(self):
+        async def run():
+            self.manager.check_capacity()
+            await self.manager.submit("import", "db", lambda job: asyncio.sleep(10))
+            await self.manager.submit("import", "db", lambda job: asyncio.sleep(10))
+            try:
+                self.manager.check_capacity()
+            finally:
+                await self.manager.close()
+
+        with self.assertRaises(JobQueueFull):
+            asyncio.run(run())
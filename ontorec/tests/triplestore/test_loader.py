@@ -0,0 +1,43 @@
+import io
+import unittest
+
+from app.triplestore.loader import count_statements, delete_query, iter_line_chunks
+
+
+class DeleteQuery_TestCase(unittest.TestCase):
+
+    ## Unit test
+
+    def test_delete_data(self):
+        query = delete_query([("<http://a/s>", "<http://a/p>", "<http://a/o>"), ("<http://a/s>", "<http://a/p>", "\"Carrot\"@en")])
+
+        self.assertEqual(query, "DELETE DATA { <http://a/s> <http://a/p> <http://a/o> . <http://a/s> <http://a/p> \"Carrot\"@en . }")
+
+    def test_delete_where(self):
+        query = delete_query([(None, "<http://a/p>", None)])
+
+        self.assertEqual(query, "DELETE WHERE { ?s <http://a/p> ?o . }")
+
+    def test_mixed_batch(self):
+        query = delete_query([("<http://a/s>", "<http://a/p>", "<http://a/o>"), ("<http://a/s>", None, None)])
+
+        self.assertEqual(query.split(" ;\n"), ["DELETE DATA { <http://a/s> <http://a/p> <http://a/o> . }", "DELETE WHERE { <http://a/s> ?p ?o . }"])
+
+
+class LineChunks_TestCase(unittest.TestCase):
+
+    ## Unit test
+
+    def test_chunks_cut_on_lines(self):
+        content = b"".join(b"<http://a/s%d> <http://a/p> <http://a/o> .\n" % i for i in range(10))
+        chunks = list(iter_line_chunks(io.BytesIO(content), 100))
+
+        self.assertEqual(b"".join(chunks), content)
+        self.assertTrue(all(chunk.endswith(b"\n") for chunk in chunks))
+        self.assertEqual(sum(count_statements(chunk) for chunk in chunks), 10)
+
+    def test_missing_final_newline(self):
+        chunks = list(iter_line_chunks(io.BytesIO(b"# comment\n<a> <b> <c> ."), 4))
+
+        self.assertEqual(b"".join(chunks), b"# comment\n<a> <b> <c> .\n")
+        self.assertEqual(sum(count_statements(chunk) for chunk in chunks), 1)
@@ -0,0 +1,39 @@
+import time
+import unittest
+
+from app.triplestore.namespaceCache import NamespaceCache
+
+
+class NamespaceCache_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = NamespaceCache(ttl=60.0)
+
+    ## Unit test
+
+    def test_bind_in_place(self):
+        self.cache.set("db", {"owl": "http://www.w3.org/2002/07/owl#", "": "http://api.stardog.com/"})
+        self.cache.bind("db", "food", "http://onto-ns.com/ontologies/examples/food#")
+        self.cache.bind("db", "", None)
+
+        self.assertEqual(self.cache.get("db"), {"owl": "http://www.w3.org/2002/07/owl#", "food": "http://onto-ns.com/ontologies/examples/food#"})
+
+    def test_bind_uncached(self):
+        self.cache.bind("db", "food", "http://onto-ns.com/ontologies/examples/food#")
+
+        self.assertIsNone(self.cache.get("db"))
+
+    def test_copy_and_invalidate(self):
+        self.cache.set("db", {"owl": "http://www.w3.org/2002/07/owl#"})
+        self.cache.get("db")["rdf"] = "http://www.w3.org/1999/02/22-rdf-syntax-ns#" # type: ignore
+
+        self.assertEqual(self.cache.get("db"), {"owl": "http://www.w3.org/2002/07/owl#"})
+        self.cache.invalidate("db")
+        self.assertIsNone(self.cache.get("db"))
+
+    def test_ttl(self):
+        cache = NamespaceCache(ttl=0.01)
+        cache.set("db", {"owl": "http://www.w3.org/2002/07/owl#"})
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get("db"))
@@ -0,0 +1,65 @@
+import unittest
+
+import rdflib
+
+from app.triplestore.preparedQueries import PreparedQuery, PreparedQueryError, PreparedQueryNotFound, PreparedQueryRegistry, query_variables, where_group
+
+
+class PreparedQuery_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.prepared = PreparedQuery("label", 'SELECT ?o WHERE { ?s skos:prefLabel ?o ; ex:p "?x" } # ?y', {"s": "iri", "o": "literal"}, {"skos": "http://www.w3.org/2004/02/skos/core#", "ex": "http://ex/"})
+
+    ## Unit test
+
+    def test_variables(self):
+        self.assertEqual(query_variables('SELECT ?o WHERE { ?s <http://a/?b> "?c" ; $p ?o } # ?d'), ["o", "p", "s"])
+
+    def test_bind(self):
+        query = self.prepared.bind({"s": "http://a/s", "o": 'a "b"'})
+
+        self.assertTrue(query.startswith('SELECT ?o WHERE { VALUES (?s ?o) { (<http://a/s> "a \\"b\\"") }  ?s skos:prefLabel ?o'))
+
+    def test_where_group(self):
+        self.assertEqual(where_group('CONSTRUCT { ?s ?p "{" } WHERE { ?s ?p ?o }'), 31)
+        self.assertEqual(where_group("ASK { ?where ex:where ?o }"), 5)
+        self.assertIsNone(where_group("DESCRIBE <http://a/s>"))
+
+    def test_bind_filter_and_aggregate(self):
+        graph = rdflib.Graph()
+        graph.add((rdflib.URIRef("http://a/s"), rdflib.RDFS.label, rdflib.Literal("alpha")))
+
+        contains = PreparedQuery("contains", "SELECT ?s WHERE { ?s rdfs:label ?l FILTER(CONTAINS(?l, ?text)) }", {"text": "literal"}, {"rdfs": str(rdflib.RDFS)})
+        self.assertEqual(len(graph.query(contains.bind({"text": "lph"}))), 1)
+        self.assertEqual(len(graph.query(contains.bind({"text": "beta"}))), 0)
+
+        count = PreparedQuery("count", "SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }", {"s": "iri"})
+        self.assertEqual([int(row[0]) for row in graph.query(count.bind({"s": "http://a/s"}))], [1])
+        self.assertEqual([int(row[0]) for row in graph.query(count.bind({"s": "http://a/missing"}))], [0])
+
+    def test_bind_invalid(self):
+        with self.assertRaises(PreparedQueryError):
+            self.prepared.bind({"s": "http://a/s> } DELETE { ?s ?p ?o", "o": "a"})
+        with self.assertRaises(PreparedQueryError):
+            self.prepared.bind({"s": "http://a/s"})
+
+    def test_invalid_templates(self):
+        with self.assertRaises(PreparedQueryError):
+            PreparedQuery("insert", "INSERT DATA { <a> <b> <c> }", {})
+        with self.assertRaises(PreparedQueryError):
+            PreparedQuery("unknown", "SELECT ?o WHERE { ?s ?p ?o }", {"x": "iri"})
+        with self.assertRaises(PreparedQueryError):
+            PreparedQuery("prefix", "SELECT ?o WHERE { ?s ex:p ?o }", {"s": "iri"})
+
+    def test_registry(self):
+        registry = PreparedQueryRegistry(max_per_database=1)
+        registry.register("db", self.prepared)
+        registry.register("db", self.prepared)
+
+        self.assertIs(registry.get("db", "label"), self.prepared)
+        with self.assertRaises(PreparedQueryError):
+            registry.register("db", PreparedQuery("other", "ASK { ?s ?p ?o }", {}))
+
+        registry.remove("db", "label")
+        with self.assertRaises(PreparedQueryNotFound):
+            registry.get("db", "label")
@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+
+from app.triplestore.queryCache import MemoryCacheBackend, QueryCache, is_read_query, normalize_query, query_form
+
+
+class QueryCache_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QueryCache(MemoryCacheBackend(max_bytes=4096, ttl=60.0))
+
+    ## Unit test
+
+    def test_normalize_query(self):
+        query = """
+            # Subclasses
+            SELECT ?s   WHERE {
+                ?s <http://www.w3.org/2000/01/rdf-schema#subClassOf> ?o . FILTER(?o != "a  # b")
+            }
+        """
+        self.assertEqual(normalize_query(query), 'SELECT ?s WHERE { ?s <http://www.w3.org/2000/01/rdf-schema#subClassOf> ?o . FILTER(?o != "a  # b") }')
+
+    def test_is_read_query(self):
+        self.assertTrue(is_read_query("PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#> select ?s WHERE { ?s ?p ?o }"))
+        self.assertTrue(is_read_query("ASK { ?s ?p ?o }"))
+        self.assertFalse(is_read_query("INSERT DATA { <http://a> <http://b> <http://c> }"))
+        self.assertEqual(query_form("BASE <http://a/> describe <b>"), "DESCRIBE")
+        self.assertIsNone(query_form("DELETE WHERE { ?s ?p ?o }"))
+
+    def test_hit_and_invalidation(self):
+        async def run():
+            key, cached = await self.cache.get("db", "SELECT * WHERE { ?s ?p ?o }", False)
+            await self.cache.set(key, [["<http://a>", "<http://b>", "<http://c>"]])
+
+            _, hit = await self.cache.get("db", "SELECT *\n  WHERE { ?s ?p ?o }", False)
+            _, other_flag = await self.cache.get("db", "SELECT * WHERE { ?s ?p ?o }", True)
+            await self.cache.invalidate("db")
+            _, stale = await self.cache.get("db", "SELECT * WHERE { ?s ?p ?o }", False)
+            return cached, hit, other_flag, stale
+
+        cached, hit, other_flag, stale = asyncio.run(run())
+        self.assertIsNone(cached)
+        self.assertEqual(hit, [["<http://a>", "<http://b>", "<http://c>"]])
+        self.assertIsNone(other_flag)
+        self.assertIsNone(stale)
+
+    def test_memory_bound(self):
+        backend = MemoryCacheBackend(max_bytes=100, ttl=60.0)
+
+        async def run():
+            await backend.set("a", b"x" * 40)
+            await backend.set("b", b"x" * 40)
+            await backend.get("a")
+            await backend.set("c", b"x" * 40)
+            return await backend.get("a"), await backend.get("b")
+
+        a, b = asyncio.run(run())
+        self.assertIsNotNone(a)
+        self.assertIsNone(b)
+        self.assertLessEqual(backend.size, 100)
@@ -0,0 +1,96 @@
+import asyncio
+import time
+import unittest
+
+from app.triplestore.executor import backend_executor
+from app.triplestore.queryCache import normalize_query
+from app.triplestore.queryGuard import ClientDisconnected, QueryLimits, QueryTimeout, ResultTooLarge, limit_query, run_query, tagged_query
+
+
+class _Request:
+
+    def __init__(self, disconnected: bool = False):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+class QueryGuard_TestCase(unittest.TestCase):
+
+    ## Unit test
+
+    def test_limits_from_settings(self):
+        limits = QueryLimits(timeout=10 ** 6, max_rows=10)
+
+        self.assertLess(limits.timeout, 10 ** 6)
+        self.assertEqual(limits.max_rows, 10)
+        self.assertGreater(QueryLimits().max_rows, 10)
+
+    def test_truncate_rows(self):
+        rows = [("<a>", "<b>", None)] * 5
+        limits = QueryLimits(max_rows=3)
+
+        self.assertEqual(limits.limit_rows(rows), (rows[:3], True))
+        self.assertEqual(limits.limit_rows(rows[:2]), (rows[:2], False))
+
+    def test_truncate_bytes(self):
+        rows = [("<a>", "<b>", "<c>")] * 5
+        limits = QueryLimits()
+        limits.max_bytes = 50
+
+        self.assertEqual(limits.limit_rows(rows), (rows[:2], True))
+
+    def test_reject_rows(self):
+        limits = QueryLimits(max_rows=1, truncate=False)
+
+        with self.assertRaises(ResultTooLarge):
+            limits.limit_rows([("<a>",), ("<b>",)])
+
+    def test_read_chunks(self):
+        async def chunks():
+            for chunk in (b"a,b\n", b"c,d\n", b"e,f\n"):
+                yield chunk
+
+        async def read(limits, lines=False):
+            return await limits.read_chunks(chunks(), lines)
+
+        limits = QueryLimits()
+        self.assertEqual(asyncio.run(read(limits)), ([b"a,b\n", b"c,d\n", b"e,f\n"], False))
+
+        limits.max_bytes = 10
+        (body, truncated) = asyncio.run(read(limits))
+        self.assertEqual((b"".join(body), truncated), (b"a,b\nc,d\ne,", True))
+        (body, truncated) = asyncio.run(read(limits, lines=True))
+        self.assertEqual((b"".join(body), truncated), (b"a,b\nc,d\n", True))
+
+        limits.truncate = False
+        with self.assertRaises(ResultTooLarge):
+            asyncio.run(read(limits))
+
+    def test_limit_query(self):
+        self.assertEqual(limit_query("SELECT ?s WHERE { ?s ?p ?o } # LIMIT 1", 10), "SELECT ?s WHERE { ?s ?p ?o } # LIMIT 1\nLIMIT 10")
+        self.assertEqual(limit_query("SELECT ?s WHERE { { SELECT ?s WHERE { ?s ?p ?o } LIMIT 50 } } ORDER BY ?s", 10), "SELECT ?s WHERE { { SELECT ?s WHERE { ?s ?p ?o } LIMIT 50 } } ORDER BY ?s\nLIMIT 10")
+        self.assertEqual(limit_query("SELECT ?s WHERE { ?s ?p ?o } LIMIT 5 OFFSET 2", 10), "SELECT ?s WHERE { ?s ?p ?o } LIMIT 5 OFFSET 2")
+        self.assertEqual(limit_query("SELECT ?s WHERE { ?s ?p ?o } limit 50", 10), "SELECT ?s WHERE { ?s ?p ?o } limit 10")
+        self.assertEqual(limit_query("SELECT ?s WHERE { ?s ?p ?o } VALUES ?o { 1 2 }", 10), "SELECT ?s WHERE { ?s ?p ?o }\nLIMIT 10\nVALUES ?o { 1 2 }")
+        self.assertEqual(limit_query("ASK { ?s ?p ?o }", 10), "ASK { ?s ?p ?o }")
+
+    def test_tagged_query(self):
+        query = "PREFIX ex: <http://ex/> SELECT ?s WHERE { ?s ex:p ?o }"
+
+        self.assertNotEqual(tagged_query(query), tagged_query(query))
+        self.assertEqual(normalize_query(tagged_query(query)), query)
+
+    def test_run_query(self):
+        result = asyncio.run(run_query(_Request(), "db", "ASK {}", 5, backend_executor.run(lambda: 42)))
+
+        self.assertEqual(result, 42)
+
+    def test_timeout(self):
+        with self.assertRaises(QueryTimeout):
+            asyncio.run(run_query(_Request(), "db", "ASK {}", 0.05, backend_executor.run(time.sleep, 0.5)))
+
+    def test_client_disconnected(self):
+        with self.assertRaises(ClientDisconnected):
+            asyncio.run(run_query(_Request(disconnected=True), "db", "ASK {}", 5, backend_executor.run(time.sleep, 0.5)))
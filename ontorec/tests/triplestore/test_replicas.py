@@ -0,0 +1,75 @@
+import unittest
+
+from unittest import mock
+
+from app.triplestore import replicas
+from app.triplestore.backends import InMemoryBackend
+from app.triplestore.changeLog import ADD, BIND, REMOVE, RESET, ChangeLog
+from app.triplestore.replicas import ReplicaManager, replica_databases
+
+
+class Replicas_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = InMemoryBackend()
+        self.backend.create_database("db")
+        self.backend.open("db").add_triples([("<http://ex/a>", "<http://ex/b>", '"c"@en')])
+        self.change_log = ChangeLog(max_triples=100)
+        self.scheduled = []
+
+        patches = [
+            mock.patch.object(replicas, "triplestore_backend", self.backend),
+            mock.patch.object(replicas, "change_log", self.change_log),
+            mock.patch.object(replicas.connection_manager, "get", self.backend.open),
+            mock.patch.object(replicas.backend_executor, "spawn", lambda func, db_name: self.scheduled.append(db_name)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.manager = ReplicaManager(["db"], refresh_interval=0)
+
+    ## Unit test
+
+    def test_load(self):
+        self.assertIsNone(self.manager.get("other"))
+        self.assertIsNone(self.manager.get("db"))
+        self.assertEqual(self.scheduled, ["db"])
+
+        replica = self.manager.load("db")
+        self.assertIs(self.manager.get("db"), replica)
+        self.assertEqual(len(replica), 1)
+        self.assertEqual(replica.triplestore.query("ASK { <http://ex/a> <http://ex/b> ?o }")[0][0], "true")
+
+    def test_sync(self):
+        replica = self.manager.load("db")
+        self.change_log.append("db", ADD, triples=[("<http://ex/d>", "<http://ex/b>", '"e"')])
+        self.change_log.append("db", REMOVE, triples=[("<http://ex/a>", None, None)])
+        self.change_log.append("db", BIND, prefix="ex", iri="http://ex/")
+
+        self.assertIs(self.manager.sync(replica), replica)
+        self.assertEqual(replica.revision, 3)
+        self.assertEqual([str(row[0]) for row in replica.triplestore.query("SELECT ?o WHERE { ?s ex:b ?o }")], ["e"])
+
+    def test_reset(self):
+        replica = self.manager.load("db")
+        self.change_log.append("db", RESET, detail="import")
+
+        self.assertIsNone(self.manager.sync(replica))
+        self.assertEqual(self.manager.replicas(), [])
+        self.assertEqual(self.scheduled, ["db"])
+
+    def test_failed_load(self):
+        self.backend.remove_database("db")
+        self.assertIsNone(self.manager.load("db"))
+
+        self.manager.schedule("db")
+        self.assertEqual(self.scheduled, [])
+        self.change_log.append("db", RESET, detail="database created")
+        self.manager.schedule("db")
+        self.assertEqual(self.scheduled, ["db"])
+
+    def test_replica_databases(self):
+        self.assertEqual(replica_databases(""), [])
+        self.assertEqual(replica_databases("emmo| reference|"), ["emmo", "reference"])
+
@@ -0,0 +1,111 @@
+import gzip
+import unittest
+
+from unittest import mock
+
+import rdflib
+
+from tripper import Literal
+
+from app.triplestore import serialization
+from app.triplestore.backends import InMemoryBackend, SparqlBackend, StardogBackend
+from app.triplestore.serialization import compress_chunks, export_chunks, get_serialization_format, negotiate_encoding, negotiate_result_format, query_result_chunks, triples_pages, upload_format
+
+
+class Serialization_TestCase(unittest.TestCase):
+
+    ## Unit test
+
+    def test_format_aliases(self):
+        self.assertEqual(get_serialization_format("nt"), get_serialization_format("ntriples"))
+        self.assertEqual(get_serialization_format("turtle").media_type, "text/turtle")
+        self.assertIsNone(get_serialization_format("none"))
+
+    def test_upload_format(self):
+        self.assertEqual(upload_format("a.b.ttl"), (get_serialization_format("turtle"), None))
+        self.assertEqual(upload_format("data.nt.gz"), (get_serialization_format("ntriples"), "gzip"))
+        self.assertEqual(upload_format("emmo.owl"), (get_serialization_format("xml"), None))
+        self.assertEqual(upload_format("data"), (None, None))
+
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate"), "gzip")
+        self.assertIsNone(negotiate_encoding("gzip;q=0, identity"))
+        self.assertIsNone(negotiate_encoding(""))
+
+    def test_negotiate_result_format(self):
+        self.assertEqual(negotiate_result_format("text/csv"), "text/csv")
+        self.assertEqual(negotiate_result_format("application/json, Application/SPARQL-Results+JSON"), "application/sparql-results+json")
+        self.assertIsNone(negotiate_result_format("text/tab-separated-values;q=0, application/json"))
+        self.assertIsNone(negotiate_result_format("*/*"))
+
+    def test_gzip_chunks(self):
+        chunks = [b"<a> <b> <c> .\n", b"<d> <e> <f> .\n"]
+        compressed = b"".join(compress_chunks(iter(chunks), "gzip"))
+
+        self.assertEqual(gzip.decompress(compressed), b"".join(chunks))
+
+    @unittest.skipUnless(serialization.zstandard is not None, "zstandard is not installed")
+    def test_zstd_chunks(self):
+        chunks = [b"<a> <b> <c> .\n", b"<d> <e> <f> .\n"]
+        compressed = b"".join(compress_chunks(iter(chunks), "zstd"))
+
+        self.assertEqual(negotiate_encoding("gzip, zstd"), "zstd")
+        self.assertEqual(serialization.zstandard.ZstdDecompressor().decompressobj().decompress(compressed), b"".join(chunks))
+
+    def test_identity_chunks(self):
+        chunks = [b"<a> <b> <c> .\n"]
+
+        self.assertEqual(list(compress_chunks(iter(chunks), None)), chunks)
+
+    def test_export_lines(self):
+        backend = InMemoryBackend()
+        backend.create_database("db")
+        triplestore = backend.open("db")
+        triplestore.add_triples([
+            ("<http://ex/a>", "<http://ex/n>", Literal("1", datatype="http://www.w3.org/2001/XMLSchema#integer")),
+            ("<http://ex/a>", "<http://ex/label>", Literal('a "quoted"\nlabel', lang="en")),
+            ("_:b", "<http://ex/label>", Literal("b")),
+        ])
+
+        with mock.patch.object(serialization, "triplestore_backend", backend):
+            for format in ("ntriples", "nquads"):
+                serialization_format = get_serialization_format(format)
+                content = b"".join(export_chunks("db", serialization_format, None, lambda: triples_pages(triplestore, 2)))
+
+                graph = rdflib.Graph()
+                graph.parse(data=content, format=serialization_format.rdflib_format)
+                self.assertEqual(len(graph), 3)
+                self.assertIn(rdflib.Literal(1), graph.objects())
+                self.assertIn(rdflib.Literal('a "quoted"\nlabel', lang="en"), graph.objects())
+
+    def test_result_formats_of_query_forms(self):
+        backend = InMemoryBackend()
+        backend.create_database("db")
+        triplestore = backend.open("db")
+        triplestore.add_triples([("<http://ex/a>", "<http://ex/b>", Literal("c"))])
+
+        with mock.patch.object(serialization, "triplestore_backend", backend):
+            self.assertIn(b'"boolean": true', b"".join(query_result_chunks("db", triplestore, "ASK { ?s ?p ?o }", False, "application/sparql-results+json")))
+            self.assertTrue(b"".join(query_result_chunks("db", triplestore, "SELECT ?s WHERE { ?s ?p ?o }", False, "text/csv")).startswith(b"s\r\n"))
+            triplestore.add_triples([("<http://ex/d>", "<http://ex/b>", Literal("e"))])
+            self.assertEqual(b"".join(query_result_chunks("db", triplestore, "SELECT ?s WHERE { ?s ?p ?o }", False, "text/csv", max_rows=1)).count(b"\r\n"), 2)
+            for (query, media_type) in (("CONSTRUCT WHERE { ?s ?p ?o }", "text/csv"), ("DESCRIBE <http://ex/a>", "application/sparql-results+json"), ("ASK { ?s ?p ?o }", "text/tab-separated-values")):
+                with self.assertRaises(NotImplementedError):
+                    list(query_result_chunks("db", triplestore, query, False, media_type))
+            with self.assertRaises(NotImplementedError):
+                list(query_result_chunks("db", triplestore, "ASK { ?s ?p ?o }", True, "application/sparql-results+json"))
+
+    def test_raw_query_options(self):
+        backend = SparqlBackend()
+        response = mock.MagicMock()
+        response.__enter__.return_value.iter_content.return_value = [b"s\r\n"]
+
+        with mock.patch.object(serialization, "triplestore_backend", backend), mock.patch("app.triplestore.backends.requests.post", return_value=response) as post:
+            list(query_result_chunks("db", None, "SELECT ?s WHERE { ?s ?p ?o }", False, "text/csv", max_rows=5))
+            self.assertTrue(post.call_args.kwargs["data"]["query"].endswith("LIMIT 5"))
+            with self.assertRaises(NotImplementedError):
+                list(query_result_chunks("db", None, "SELECT ?s WHERE { ?s ?p ?o }", True, "text/csv"))
+
+        with mock.patch.object(serialization, "triplestore_backend", StardogBackend()), mock.patch("app.triplestore.backends.open_stardog_connection") as connection:
+            list(query_result_chunks("db", None, "SELECT ?s WHERE { ?s ?p ?o }", True, "text/csv"))
+            self.assertEqual(connection.return_value.__enter__.return_value.client.post.call_args.kwargs["data"]["reasoning"], "true")
@@ -0,0 +1,48 @@
+import unittest
+
+from unittest import mock
+
+from app.triplestore import templates
+from app.triplestore.templates import ManagedTemplate
+
+
+class ManagedTemplate_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.databases = ["emmo-template-000000000000", "emmo-template-mine", "other"]
+        self.digest = "1" * 64
+        self.populated = []
+        self.template = ManagedTemplate("emmo-template", lambda: self.digest, lambda db_name, triplestore: self.populated.append(db_name))
+        patches = [
+            mock.patch.object(templates, "list_databases", lambda: list(self.databases)),
+            mock.patch.object(templates, "create_database", self.databases.append),
+            mock.patch.object(templates, "remove_database", self.databases.remove),
+            mock.patch.object(templates.connection_manager, "get", lambda db_name: None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    ## Unit test
+
+    def test_lazy_creation(self):
+        db_name = self.template.database()
+
+        self.assertEqual(db_name, "emmo-template-111111111111")
+        self.assertEqual(self.populated, [db_name])
+        self.assertCountEqual(self.databases, [db_name, "emmo-template-mine", "other"])
+
+    def test_reuse(self):
+        self.template.database()
+        self.template.database()
+
+        self.assertEqual(len(self.populated), 1)
+
+    def test_refresh_on_source_change(self):
+        first = self.template.database()
+        self.digest = "2" * 64
+        second = self.template.database()
+
+        self.assertNotEqual(first, second)
+        self.assertNotIn(first, self.databases)
+        self.assertIn(second, self.databases)
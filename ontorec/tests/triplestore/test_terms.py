@@ -0,0 +1,40 @@
+import unittest
+
+from tripper import Literal
+
+from app.triplestore.terms import N3Converter
+
+
+class N3Converter_TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.converter = N3Converter(max_size=2)
+
+    ## Unit test
+
+    def test_value(self):
+        self.assertEqual(self.converter.value("http://emmo.info/emmo#EMMO"), "<http://emmo.info/emmo#EMMO>")
+        self.assertEqual(self.converter.value("<http://emmo.info/emmo#EMMO>"), "<http://emmo.info/emmo#EMMO>")
+        self.assertEqual(self.converter.value("_:b0"), "_:b0")
+        self.assertEqual(self.converter.value(Literal("EMMO", lang="en")), '"EMMO"@en')
+        self.assertIsNone(self.converter.value(None))
+
+    def test_rows(self):
+        rows = [
+            ("http://a/s", "http://a/p", "http://a/o"),
+            ("http://a/s", "http://a/p", Literal("http://a/o")),
+            ("_:b0", "http://a/p", None),
+        ]
+
+        self.assertEqual(self.converter.rows(iter(rows)), [
+            ("<http://a/s>", "<http://a/p>", "<http://a/o>"),
+            ("<http://a/s>", "<http://a/p>", '"http://a/o"'),
+            ("_:b0", "<http://a/p>", None),
+        ])
+        self.assertEqual(self.converter.rows([]), [])
+        self.assertEqual(self.converter.rows([(), ()]), [(), ()])
+
+    def test_literal_not_memoised_as_iri(self):
+        self.converter.value("http://a/o")
+
+        self.assertEqual(self.converter.row(["http://a/o", Literal("http://a/o")]), ("<http://a/o>", '"http://a/o"'))